@@ -0,0 +1,500 @@
+"""
+Scale Etiketlerinden YOLO Etiketi ve İndeks Maskesi Üretimi
+
+Bu script Scale segmentasyon görevlerinin JSON dosyalarını (orijinal
+görüntü ve 'combined' renkli maske adresleri, labelMapping renkleri) YOLO
+veri seti yapısına dönüştürür:
+    - images/<split>/   Orijinal görüntüler
+    - labels/<split>/   YOLO kutu (bbox) veya poligon (polygon) etiketleri
+    - masks/<split>/    İndeks maskeleri (0 = arka plan, sınıf indeksi + 1)
+
+MaskedenOzellikCikartma_DosyadaTekGoruntu.ipynb her renk için tüm maskeyi
+ayrı ayrı tarıyor ve etiketleri bir Python döngüsüyle eşliyordu. Burada
+maske tek geçişte 24 bitlik renk kodlarına paketlenir; toleranslı eşleşme
+önceden hesaplanmış 2^24 elemanlı bir lookup tablosundan tek bir indeksleme
+ile okunur. Görevler işçi süreçlere dağıtılır ve çıktıları güncel olan
+görevler tekrar işlenmez.
+
+Kullanım:
+    python annotation_converter.py scala_label/ --output data/annotations --workers 8
+"""
+
+import argparse
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from asset_fetcher import AssetFetcher
+from image_discovery import shard_of
+
+
+# Sınıf indeksleri train_model.py ve PhaseAnalyzer ile aynı sıradadır
+PHASE_CLASSES = ('Ferrit', 'Perlit', 'Austenit', 'Martenzit', 'Bainit')
+
+LABEL_FORMATS = ('bbox', 'polygon')
+
+SPLITS = ('train', 'val', 'test')
+
+# Süreç başına önbellek klasörüne göre açılmış indiriciler
+_fetchers: Dict[str, AssetFetcher] = {}
+
+
+def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
+    """'#rrggbb' biçimindeki rengi (R, G, B) demetine dönüştürür"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def pack_bgr(image: np.ndarray) -> np.ndarray:
+    """(H, W, 3) BGR görüntüyü (H, W) boyutlu 24 bitlik RGB kodlarına paketler"""
+    codes = image[..., 2].astype(np.uint32) << 16
+    codes |= image[..., 1].astype(np.uint32) << 8
+    codes |= image[..., 0]
+    return codes
+
+
+@functools.lru_cache(maxsize=4)
+def build_color_lut(colors: Tuple[Tuple[int, int, int], ...], values: Tuple[int, ...],
+                    tolerance: float) -> np.ndarray:
+    """
+    Renk kodundan etiket değerine lookup tablosu oluşturur
+    
+    Her renge Öklid uzaklığı tolerance'ı aşmayan tüm renk kodları o rengin
+    değerine eşlenir; eşleşmeyen kodların değeri 0'dır. Toleransları
+    örtüşen renklerde listede önce gelen renk kazanır (not defterindeki
+    find_closest_label ile aynı). Tablo 16 MB'tır ve aynı labelMapping için
+    süreç içinde bir kez hesaplanır.
+    
+    Args:
+        colors: (R, G, B) renkler
+        values: Renklerin tablodaki değerleri (1-255)
+        tolerance: Renk eşleşmesi için maksimum Öklid uzaklığı
+    
+    Returns:
+        np.ndarray: 2^24 elemanlı uint8 tablo
+    """
+    radius = int(tolerance)
+    axis = np.arange(-radius, radius + 1)
+    offsets = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    offsets = offsets[(offsets ** 2).sum(axis=1) <= tolerance ** 2]
+    
+    lut = np.zeros(1 << 24, dtype=np.uint8)
+    # Önce gelen renklerin kazanması için tablo sondan başa doldurulur
+    for color, value in reversed(list(zip(colors, values))):
+        points = np.asarray(color) + offsets
+        points = points[((points >= 0) & (points <= 255)).all(axis=1)]
+        lut[(points[:, 0] << 16) | (points[:, 1] << 8) | points[:, 2]] = value
+    return lut
+
+
+def mask_to_labels(index_mask: np.ndarray, num_classes: int, label_format: str = 'bbox',
+                   min_area: float = 10, epsilon_factor: float = 0.0001
+                   ) -> Tuple[List[str], np.ndarray]:
+    """
+    İndeks maskesinden YOLO etiket satırlarını üretir
+    
+    Her sınıfın bağlı bölgeleri ayrı birer nesnedir. 'bbox' biçiminde
+    bölgelerin kutuları connectedComponentsWithStats ile tek çağrıda,
+    'polygon' biçiminde dış konturları findContours ile bulunur.
+    
+    Args:
+        index_mask: (H, W) uint8 maske (0 = arka plan, sınıf indeksi + 1)
+        num_classes: Sınıf sayısı
+        label_format: 'bbox' (class xc yc w h) veya 'polygon' (class x1 y1 x2 y2 ...)
+        min_area: Bu alandan (piksel) küçük bölgeler atlanır
+        epsilon_factor: Poligon sadeleştirmesinde çevreye göre tolerans
+    
+    Returns:
+        Tuple: Etiket satırları ve sınıf başına nesne sayıları
+    """
+    import cv2
+    
+    height, width = index_mask.shape
+    counts = np.zeros(num_classes, dtype=np.int64)
+    lines = []
+    present = np.flatnonzero(np.bincount(index_mask.ravel(), minlength=num_classes + 1)[1:])
+    for class_id in present[present < num_classes]:
+        binary = (index_mask == class_id + 1).view(np.uint8)
+        
+        if label_format == 'bbox':
+            _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+            stats = stats[1:][stats[1:, cv2.CC_STAT_AREA] >= min_area]
+            x, y, w, h = (stats[:, i].astype(np.float64) for i in range(4))
+            boxes = np.stack([(x + w / 2) / width, (y + h / 2) / height,
+                              w / width, h / height], axis=1)
+            lines.extend(f"{class_id} " + " ".join(f"{v:.6f}" for v in box) for box in boxes)
+            counts[class_id] += len(boxes)
+            continue
+        
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            if cv2.contourArea(contour) < min_area:
+                continue
+            approx = cv2.approxPolyDP(contour, epsilon_factor * cv2.arcLength(contour, True), True)
+            points = approx.reshape(-1, 2) / (width, height)
+            if len(points) < 3:
+                continue
+            lines.append(f"{class_id} " + " ".join(f"{v:.6f}" for v in points.ravel()))
+            counts[class_id] += 1
+    return lines, counts
+
+
+def split_of(name: str, split_ratios: Sequence[float]) -> str:
+    """Dosya adının özetine göre her çalışmada aynı kalan train/val/test ataması"""
+    fraction = shard_of(name, 10000) / 10000.0
+    total = sum(split_ratios)
+    cumulative = 0.0
+    for split, ratio in zip(SPLITS, split_ratios):
+        cumulative += ratio / total
+        if fraction < cumulative:
+            return split
+    return SPLITS[len(split_ratios) - 1]
+
+
+def read_asset(source: str, download_dir: str = 'cache/assets') -> bytes:
+    """
+    Yerel dosyayı veya URL'yi okur
+    
+    URL'ler download_dir'deki önbellekten okunur; önbellekte yoksa indirilir
+    (bkz. asset_fetcher.AssetFetcher).
+    """
+    if not source.startswith(('http://', 'https://')):
+        with open(source, 'rb') as f:
+            return f.read()
+    
+    fetcher = _fetchers.get(download_dir)
+    if fetcher is None:
+        fetcher = _fetchers[download_dir] = AssetFetcher(download_dir)
+    return fetcher.fetch(source)
+
+
+def task_assets(task: Dict) -> Tuple[str, str]:
+    """Görevin orijinal görüntü ve birleşik maske adresleri"""
+    return (task['attachmentS3Downloads'][0]['s3URL'],
+            task['response']['annotations']['combined']['image'])
+
+
+def output_paths(task: Dict, output_dir: str,
+                 split_ratios: Sequence[float]) -> Tuple[str, Path, Path, Path]:
+    """Görevin split'i ile görüntü, etiket ve maske çıktılarının yolları"""
+    filename = task['metadata']['filename']
+    stem = Path(filename).stem
+    split = split_of(filename, split_ratios)
+    output_dir = Path(output_dir)
+    return (split, output_dir / 'images' / split / filename,
+            output_dir / 'labels' / split / f"{stem}.txt",
+            output_dir / 'masks' / split / f"{stem}.png")
+
+
+def _is_current(json_path: str, paths: Sequence[Path]) -> bool:
+    """Tüm çıktılar var ve etiket dosyası JSON'dan yeniyse True"""
+    # Etiket dosyası en son yazıldığından atlama kontrolü onun zamanına bakar
+    return (all(path.exists() for path in paths)
+            and paths[1].stat().st_mtime >= os.path.getmtime(json_path))
+
+
+def convert_task(json_path: str, output_dir: str, classes: Sequence[str] = PHASE_CLASSES,
+                 label_format: str = 'bbox', tolerance: float = 10, min_area: float = 10,
+                 epsilon_factor: float = 0.0001,
+                 split_ratios: Sequence[float] = (0.7, 0.2, 0.1),
+                 download_dir: str = 'cache/assets', force: bool = False) -> Dict:
+    """
+    Tek bir Scale görevini görüntü, etiket ve indeks maskesine dönüştürür
+    
+    Returns:
+        Dict: Görevin özeti (split, sınıf başına nesne sayıları, eşleşmeyen
+            renkler ve piksel sayısı; atlandıysa 'skipped': True)
+    """
+    import cv2
+    
+    with open(json_path, 'r', encoding='utf-8') as f:
+        task = json.load(f)
+    
+    split, image_path, label_path, mask_path = output_paths(task, output_dir, split_ratios)
+    summary = {'task': json_path, 'image': task['metadata']['filename'], 'split': split}
+    
+    # Çıktıları JSON'dan yeni olan görevler atlanır
+    if not force and _is_current(json_path, (image_path, label_path, mask_path)):
+        summary['skipped'] = True
+        return summary
+    
+    # labelMapping renkleri sınıf indeksine (+1) eşlenir
+    class_index = {name.casefold(): i for i, name in enumerate(classes)}
+    colors, values, unknown_labels = [], [], []
+    for name, info in task['response']['labelMapping'].items():
+        if name.casefold() not in class_index:
+            unknown_labels.append(name)
+            continue
+        colors.append(hex_to_rgb(info['color']))
+        values.append(class_index[name.casefold()] + 1)
+    lut = build_color_lut(tuple(colors), tuple(values), float(tolerance))
+    
+    image_url, mask_url = task_assets(task)
+    mask_data = read_asset(mask_url, download_dir)
+    image_data = read_asset(image_url, download_dir)
+    mask = cv2.imdecode(np.frombuffer(mask_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if mask is None:
+        raise ValueError(f"Maske çözülemedi: {json_path}")
+    
+    # Tek geçiş: renk kodları ve tablodan okunan etiketler
+    codes = pack_bgr(mask)
+    index_mask = lut[codes]
+    
+    # Siyah arka plan dışında hiçbir etikete eşlenmeyen renkler raporlanır
+    unmatched = codes[(index_mask == 0) & (codes != 0)]
+    unmatched_colors, unmatched_counts = np.unique(unmatched, return_counts=True)
+    top = np.argsort(-unmatched_counts)[:5]
+    
+    lines, counts = mask_to_labels(index_mask, len(classes), label_format,
+                                   min_area, epsilon_factor)
+    
+    for path in (image_path, label_path, mask_path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    image_path.write_bytes(image_data)
+    if not cv2.imwrite(str(mask_path), index_mask):
+        raise ValueError(f"Maske yazılamadı: {mask_path}")
+    # Etiket dosyası en son yazılır (bkz. _is_current)
+    label_path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding='utf-8')
+    
+    summary.update({
+        'instances': counts.tolist(),
+        'unmatched_pixels': int(len(unmatched)),
+        'unmatched_colors': ['#%06x' % unmatched_colors[i] for i in top],
+        'unknown_labels': unknown_labels
+    })
+    return summary
+
+
+def _convert_safely(json_path: str, **kwargs) -> Dict:
+    """İşçi süreçte görevi dönüştürür; hatayı özet olarak döndürür"""
+    try:
+        return convert_task(json_path, **kwargs)
+    except Exception as e:
+        return {'task': json_path, 'error': f"{type(e).__name__}: {e}"}
+
+
+def convert_annotations(input_dir: str, output_dir: str = 'data/annotations',
+                        classes: Sequence[str] = PHASE_CLASSES, label_format: str = 'bbox',
+                        tolerance: float = 10, min_area: float = 10,
+                        epsilon_factor: float = 0.0001,
+                        split_ratios: Sequence[float] = (0.7, 0.2, 0.1),
+                        workers: Optional[int] = None, download_dir: str = 'cache/assets',
+                        fetch_workers: int = 16, force: bool = False) -> Dict:
+    """
+    Klasördeki tüm Scale görevlerini paralel olarak dönüştürür
+    
+    Args:
+        input_dir: Görev JSON dosyalarının klasörü
+        output_dir: YOLO veri setinin yazılacağı klasör
+        classes: Sınıf adları (indeks sırasıyla, büyük/küçük harf duyarsız eşlenir)
+        label_format: 'bbox' veya 'polygon'
+        tolerance: Renk eşleşmesi için maksimum Öklid uzaklığı
+        min_area: Bu alandan (piksel) küçük bölgeler atlanır
+        epsilon_factor: Poligon sadeleştirmesinde çevreye göre tolerans
+        split_ratios: train/val/test oranları
+        workers: İşçi süreç sayısı (varsayılan CPU sayısı, 1 ise bu süreçte)
+        download_dir: İndirilen görüntü ve maskelerin önbellek klasörü
+        fetch_workers: Eşzamanlı indirme sayısı
+        force: True ise güncel görevler de yeniden dönüştürülür
+    
+    Returns:
+        Dict: Dönüştürülen/atlanan/başarısız görev sayıları ve sınıf başına nesne sayıları
+    """
+    if label_format not in LABEL_FORMATS:
+        raise ValueError(f"Bilinmeyen etiket biçimi: {label_format}")
+    if not 1 <= len(split_ratios) <= len(SPLITS):
+        raise ValueError(f"Geçersiz split oranları: {split_ratios}")
+    if len(classes) > 254:
+        raise ValueError("İndeks maskesi en fazla 254 sınıfı destekler")
+    
+    json_files = sorted(str(path) for path in Path(input_dir).glob('*.json'))
+    convert = functools.partial(
+        _convert_safely, output_dir=output_dir, classes=tuple(classes),
+        label_format=label_format, tolerance=tolerance, min_area=min_area,
+        epsilon_factor=epsilon_factor, split_ratios=tuple(split_ratios),
+        download_dir=download_dir, force=force
+    )
+    
+    totals = {
+        'tasks': len(json_files),
+        'converted': 0,
+        'skipped': 0,
+        'failed': 0,
+        'instances': {name: 0 for name in classes},
+        'unmatched_pixels': 0
+    }
+    
+    # Güncel olmayan görevlerin dosyaları dönüştürmeden önce eşzamanlı indirilir;
+    # işçi süreçler yalnızca yerel önbellekten okur
+    urls = []
+    for json_file in json_files:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                task = json.load(f)
+            if force or not _is_current(json_file, output_paths(task, output_dir,
+                                                                split_ratios)[1:]):
+                urls.extend(url for url in task_assets(task)
+                            if url.startswith(('http://', 'https://')))
+        except (OSError, ValueError, KeyError, IndexError):
+            # Hatalı görevler dönüştürme sırasında raporlanır
+            continue
+    if urls:
+        with AssetFetcher(download_dir, max_workers=fetch_workers) as fetcher:
+            errors = fetcher.prefetch(urls)
+            stats = fetcher.stats()
+        print(f"{stats['downloads']} dosya indirildi, {stats['hits']} dosya önbellekten "
+              f"okundu ({len(errors)} hata)")
+    
+    def record(summary: Dict):
+        name = os.path.basename(summary['task'])
+        if 'error' in summary:
+            totals['failed'] += 1
+            print(f"Hata ({name}): {summary['error']}")
+            return
+        if summary.get('skipped'):
+            totals['skipped'] += 1
+            return
+        
+        totals['converted'] += 1
+        for class_name, count in zip(classes, summary['instances']):
+            totals['instances'][class_name] += count
+        totals['unmatched_pixels'] += summary['unmatched_pixels']
+        print(f"Dönüştürüldü: {name} → {summary['split']} ({sum(summary['instances'])} nesne)")
+        if summary['unmatched_colors']:
+            print(f"  Eşleşmeyen renkler ({summary['unmatched_pixels']} piksel): "
+                  f"{', '.join(summary['unmatched_colors'])}")
+        if summary['unknown_labels']:
+            print(f"  Sınıf listesinde olmayan etiketler: {', '.join(summary['unknown_labels'])}")
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(json_files) <= 1:
+        for json_file in json_files:
+            record(convert(json_file))
+    else:
+        # Her işçi kendi lookup tablosunu bir kez oluşturur
+        chunksize = max(1, min(16, len(json_files) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for summary in pool.map(convert, json_files, chunksize=chunksize):
+                record(summary)
+    
+    print(f"\nToplam {totals['tasks']} görev: {totals['converted']} dönüştürüldü, "
+          f"{totals['skipped']} güncel görev atlandı, {totals['failed']} başarısız")
+    for class_name, count in totals['instances'].items():
+        print(f"  {class_name}: {count} nesne")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Scale etiketlerinden YOLO etiketi ve indeks maskesi üretimi'
+    )
+    
+    parser.add_argument(
+        'input_dir',
+        type=str,
+        help='Scale görev JSON dosyalarının klasörü'
+    )
+    
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='data/annotations',
+        help='YOLO veri setinin yazılacağı dizin'
+    )
+    
+    parser.add_argument(
+        '--format',
+        type=str,
+        default='bbox',
+        choices=LABEL_FORMATS,
+        help='Etiket biçimi (bbox = tespit, polygon = segmentasyon)'
+    )
+    
+    parser.add_argument(
+        '--classes',
+        type=str,
+        nargs='+',
+        default=list(PHASE_CLASSES),
+        help='Sınıf adları (indeks sırasıyla)'
+    )
+    
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=10,
+        help='Maske rengi ile etiket rengi arasındaki maksimum Öklid uzaklığı'
+    )
+    
+    parser.add_argument(
+        '--min-area',
+        type=float,
+        default=10,
+        help='Bu alandan (piksel) küçük bölgeleri atla'
+    )
+    
+    parser.add_argument(
+        '--epsilon-factor',
+        type=float,
+        default=0.0001,
+        help='Poligon sadeleştirme toleransı (kontur çevresine oranı)'
+    )
+    
+    parser.add_argument(
+        '--split-ratios',
+        type=float,
+        nargs='+',
+        default=[0.7, 0.2, 0.1],
+        help='train/val/test oranları'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='İşçi süreç sayısı (varsayılan CPU sayısı)'
+    )
+    
+    parser.add_argument(
+        '--download-dir',
+        type=str,
+        default='cache/assets',
+        help='İndirilen görüntü ve maskelerin önbellek dizini (tekrar indirilmez)'
+    )
+    
+    parser.add_argument(
+        '--fetch-workers',
+        type=int,
+        default=16,
+        help='Eşzamanlı indirme sayısı'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Güncel görevleri de yeniden dönüştür'
+    )
+    
+    args = parser.parse_args()
+    
+    convert_annotations(
+        args.input_dir,
+        output_dir=args.output,
+        classes=args.classes,
+        label_format=args.format,
+        tolerance=args.tolerance,
+        min_area=args.min_area,
+        epsilon_factor=args.epsilon_factor,
+        split_ratios=args.split_ratios,
+        workers=args.workers,
+        download_dir=args.download_dir,
+        fetch_workers=args.fetch_workers,
+        force=args.force
+    )
+
+
+if __name__ == "__main__":
+    main()
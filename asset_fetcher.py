@@ -0,0 +1,290 @@
+"""
+Etiketleme Görevi Dosyaları için Eşzamanlı, Önbellekli İndirici
+
+Bu modül Scale görevlerindeki orijinal görüntü ve maske dosyalarını
+indirmek için AssetFetcher sınıfını içerir:
+    - Tek bir bağlantı havuzlu oturum (requests kuruluysa) ve sınırlı
+      sayıda thread ile eşzamanlı indirme
+    - Bağlantı hatalarında ve 429/5xx yanıtlarında üstel bekleme
+      (backoff) ile yeniden deneme; Retry-After başlığına uyulur
+    - URL ve ETag ile anahtarlanan, içerik adresli yerel önbellek: dosyalar
+      içeriklerinin özetiyle saklanır, URL dizini SQLite'ta tutulur. Aynı
+      veri seti tekrar oluşturulurken yalnızca yeni görevlerin dosyaları
+      indirilir; revalidate=True ise değişip değişmedikleri ETag ile
+      (If-None-Match) sorulur
+
+İmzalı S3 adreslerinde her dışa aktarmada değişen imza parametreleri
+önbellek anahtarına dahil edilmez. Modül herhangi bir HTTP sunucusuyla
+çalıştığından yerel bir test sunucusuna karşı denenebilir.
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import requests
+except ImportError:  # requests opsiyoneldir, yoksa urllib ile (havuzsuz) indirilir
+    requests = None
+
+
+# Bu durum kodları geçici kabul edilir ve yeniden denenir
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+# İmzalı URL'lerde her dışa aktarmada değişen parametreler (anahtara dahil edilmez)
+SIGNATURE_PARAMS = (
+    'x-amz-algorithm', 'x-amz-credential', 'x-amz-date', 'x-amz-expires',
+    'x-amz-signedheaders', 'x-amz-signature', 'x-amz-security-token',
+    'awsaccesskeyid', 'signature', 'expires', 'key-pair-id', 'policy'
+)
+
+CHUNK_SIZE = 1 << 16
+
+
+def cache_key(url: str) -> str:
+    """URL'den imza parametreleri çıkarılmış önbellek anahtarı üretir"""
+    parts = urllib.parse.urlsplit(url)
+    query = [(key, value) for key, value
+             in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in SIGNATURE_PARAMS]
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path,
+                                    urllib.parse.urlencode(query), ''))
+
+
+class _RetryableError(Exception):
+    """Yeniden denenebilecek indirme hatası"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AssetFetcher:
+    """
+    Bağlantı havuzlu, yeniden denemeli ve içerik adresli önbellekli indirici
+    
+    Aynı nesne birden fazla thread tarafından paylaşılabilir; önbellek
+    birden fazla süreç tarafından da okunup yazılabilir.
+    """
+    
+    def __init__(self, cache_dir: str = 'cache/assets', max_workers: int = 16,
+                 retries: int = 4, backoff: float = 0.5, timeout: float = 60.0,
+                 revalidate: bool = False):
+        """
+        Args:
+            cache_dir: Önbellek klasörü (index.sqlite ve blobs/)
+            max_workers: prefetch() ile eşzamanlı indirme sayısı ve
+                bağlantı havuzunun boyutu
+            retries: Geçici hatalarda en fazla yeniden deneme sayısı
+            backoff: İlk bekleme süresi (saniye); her denemede iki katına
+                çıkar ve üzerine rastgele bir pay eklenir
+            timeout: Bağlantı ve okuma zaman aşımı (saniye)
+            revalidate: True ise önbellekteki dosyalar için sunucuya ETag /
+                Last-Modified ile koşullu istek gönderilir; False ise
+                önbellekteki dosya doğrudan kullanılır
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers en az 1 olmalı: {max_workers}")
+        
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.revalidate = revalidate
+        
+        self.counters = {'hits': 0, 'downloads': 0, 'not_modified': 0,
+                         'retries': 0, 'bytes_downloaded': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / 'index.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS assets ('
+            'key TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+            'digest TEXT NOT NULL, size INTEGER NOT NULL, fetched_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        
+        self._session = None
+        if requests is not None:
+            # Tüm thread'ler aynı havuzdaki kalıcı (keep-alive) bağlantıları kullanır
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers,
+                                                    pool_maxsize=max_workers)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+    
+    def fetch(self, url: str) -> bytes:
+        """URL'nin içeriğini (gerekirse indirerek) döndürür"""
+        return self.fetch_path(url).read_bytes()
+    
+    def fetch_path(self, url: str) -> Path:
+        """URL'nin önbellekteki dosyasının yolunu döndürür (gerekirse indirir)"""
+        key = cache_key(url)
+        entry = self._lookup(key)
+        if entry is not None and not self._blob_path(entry['digest']).exists():
+            # Dosyası silinmiş kayıt koşulsuz olarak (ETag gönderilmeden) yeniden indirilir
+            entry = None
+        if entry is not None and not self.revalidate:
+            self._count('hits')
+            return self._blob_path(entry['digest'])
+        
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download(url, key, entry)
+            except _RetryableError as e:
+                if attempt == self.retries:
+                    raise ValueError(f"İndirme başarısız ({e}): {url}") from e
+                delay = e.retry_after
+            except OSError:
+                # Bağlantı hataları ve zaman aşımları (requests hataları da OSError'dır)
+                if attempt == self.retries:
+                    raise
+                delay = None
+            if delay is None:
+                delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+            self._count('retries')
+            time.sleep(delay)
+    
+    def prefetch(self, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        URL'leri max_workers thread ile eşzamanlı olarak önbelleğe indirir
+        
+        Returns:
+            Dict[str, str]: İndirilemeyen URL'ler ve hata mesajları
+        """
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch_path, url): url
+                       for url in dict.fromkeys(urls)}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[futures[future]] = f"{type(e).__name__}: {e}"
+        return errors
+    
+    def stats(self) -> Dict:
+        """Sayaçları ve önbellekteki dosya sayısını döndürür"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM assets'
+            ).fetchone()
+            return dict(self.counters, entries=entries, size_bytes=size)
+    
+    def close(self):
+        """Oturumu ve veritabanı bağlantısını kapatır"""
+        if self._session is not None:
+            self._session.close()
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self) -> 'AssetFetcher':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _download(self, url: str, key: str, entry: Optional[Dict]) -> Path:
+        """Tek bir GET isteği yapar; 304 yanıtında önbellekteki dosyayı döndürür"""
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        status, response_headers, chunks, close = self._open(url, headers)
+        try:
+            if status == 304 and entry is not None:
+                self._count('not_modified')
+                return self._blob_path(entry['digest'])
+            if status in RETRY_STATUSES:
+                retry_after = response_headers.get('Retry-After')
+                raise _RetryableError(
+                    f"HTTP {status}",
+                    float(retry_after) if retry_after and retry_after.isdigit() else None
+                )
+            if status != 200:
+                raise ValueError(f"İndirme başarısız (HTTP {status}): {url}")
+            
+            # İçerik geçici dosyaya akıtılırken özeti hesaplanır
+            digest = hashlib.blake2b(digest_size=20)
+            size = 0
+            tmp_path = self.blob_dir / f".{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in chunks:
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            except BaseException:
+                # Yarıda kalan indirme önbellekte bırakılmaz
+                tmp_path.unlink(missing_ok=True)
+                raise
+        finally:
+            close()
+        
+        # Aynı içerik farklı URL'lerden gelse de tek kez saklanır
+        digest = digest.hexdigest()
+        path = self._blob_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO assets '
+                '(key, url, etag, last_modified, digest, size, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, url, response_headers.get('ETag'), response_headers.get('Last-Modified'),
+                 digest, size, time.time())
+            )
+            self._conn.commit()
+            self.counters['downloads'] += 1
+            self.counters['bytes_downloaded'] += size
+        return path
+    
+    def _open(self, url: str, headers: Dict[str, str]):
+        """GET isteği açar; (durum kodu, başlıklar, içerik parçaları, kapatma) döndürür"""
+        if self._session is not None:
+            response = self._session.get(url, headers=headers, timeout=self.timeout,
+                                         stream=True)
+            return (response.status_code, response.headers,
+                    response.iter_content(CHUNK_SIZE), response.close)
+        
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # 304 ve hata kodları da yanıt gibi işlenir
+            response = e
+        return (response.status, response.headers,
+                iter(lambda: response.read(CHUNK_SIZE), b''), response.close)
+    
+    def _lookup(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, digest FROM assets WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'digest': row[2]}
+    
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+    
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
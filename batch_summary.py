@@ -0,0 +1,323 @@
+"""
+Akışlı (Streaming) Batch Özeti
+
+Bu modül batch_analyze() sonuçlarını bellekte biriktirmeden özetlemek için
+gerekli sınıfları içerir. Her görüntü tamamlandığında sonucu JSONL/CSV
+(pyarrow kuruluysa Parquet) dosyalarına bir satır olarak eklenir ve genel
+toplamlar artımlı olarak güncellenir. batch_summary.txt bu toplamlardan ve
+diske akıtılan görüntü bazındaki satırlardan üretilir; böylece bellek
+kullanımı görüntü sayısından bağımsızdır.
+"""
+
+import csv
+import importlib.util
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+SUMMARY_FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+class SummaryTotals:
+    """Batch genelindeki toplamların artımlı olarak tutulması"""
+    
+    def __init__(self):
+        self.total_images = 0
+        self.total_detections = 0
+        self.phase_counts: Dict[str, int] = {}
+        self.phase_areas: Dict[str, float] = {}
+        # Alan oranları, çözümlenmiş faz piksellerinin toplam görüntü alanına oranıdır
+        self.phase_pixel_areas: Dict[str, float] = {}
+        self.total_image_area = 0.0
+        # batch_summary.txt'deki ortalama, tespiti olan görüntülerin ortalamasıdır
+        self.image_confidence_sum = 0.0
+        self.images_with_confidence = 0
+        self.detection_confidence_sum = 0.0
+        # Cascade ön taraması: aşama -> eleme gerekçesi -> görüntü sayısı
+        self.screened_images = 0
+        self.screen_rejections: Dict[str, Dict[str, int]] = {}
+    
+    def add(self, stats: Dict, image_shape: Optional[tuple] = None,
+            screen: Optional[Dict] = None):
+        """Bir görüntünün phase_statistics ve ön tarama sonucunu toplamlara ekler"""
+        self.total_images += 1
+        if screen is not None:
+            self.screened_images += 1
+            if not screen['passed']:
+                reasons = self.screen_rejections.setdefault(screen['stage'], {})
+                reasons[screen['reason']] = reasons.get(screen['reason'], 0) + 1
+        self.total_detections += stats['total_detections']
+        
+        for phase, count in stats['phase_counts'].items():
+            self.phase_counts[phase] = self.phase_counts.get(phase, 0) + count
+        for phase, area in stats['phase_areas'].items():
+            self.phase_areas[phase] = self.phase_areas.get(phase, 0.0) + area
+        if image_shape is not None and 'phase_area_fractions' in stats:
+            image_area = float(image_shape[0]) * float(image_shape[1])
+            self.total_image_area += image_area
+            for phase, fraction in stats['phase_area_fractions'].items():
+                self.phase_pixel_areas[phase] = \
+                    self.phase_pixel_areas.get(phase, 0.0) + fraction * image_area
+        
+        if stats['average_confidence'] > 0:
+            self.image_confidence_sum += stats['average_confidence']
+            self.images_with_confidence += 1
+        self.detection_confidence_sum += stats['average_confidence'] * stats['total_detections']
+    
+    @property
+    def average_confidence(self) -> float:
+        """Tespiti olan görüntülerin ortalama güven skorlarının ortalaması"""
+        if not self.images_with_confidence:
+            return 0.0
+        return self.image_confidence_sum / self.images_with_confidence
+    
+    @property
+    def mean_detection_confidence(self) -> float:
+        """Tüm tespitlerin ortalama güven skoru"""
+        if not self.total_detections:
+            return 0.0
+        return self.detection_confidence_sum / self.total_detections
+    
+    @property
+    def rejected_images(self) -> int:
+        """Ön taramanın herhangi bir aşamasında elenen görüntü sayısı"""
+        return sum(sum(reasons.values()) for reasons in self.screen_rejections.values())
+    
+    @property
+    def phase_area_fractions(self) -> Dict[str, float]:
+        """Tüm görüntüler birlikte düşünüldüğünde fazların alan oranları"""
+        if not self.total_image_area:
+            return {}
+        return {phase: area / self.total_image_area
+                for phase, area in self.phase_pixel_areas.items()}
+    
+    def to_dict(self) -> Dict:
+        """Toplamları JSON'a yazılabilir bir dictionary olarak döndürür"""
+        return {
+            'total_images': self.total_images,
+            'total_detections': self.total_detections,
+            'phase_counts': self.phase_counts,
+            'phase_areas': self.phase_areas,
+            'phase_area_fractions': self.phase_area_fractions,
+            'average_confidence': self.average_confidence,
+            'mean_detection_confidence': self.mean_detection_confidence,
+            'screen': {
+                'screened_images': self.screened_images,
+                'rejected_images': self.rejected_images,
+                'rejections': self.screen_rejections
+            }
+        }
+
+
+class BatchSummaryWriter:
+    """
+    Batch sonuçlarını görüntü görüntü diske yazan özet oluşturucu
+    
+    Satır dosyaları her görüntüden sonra diske boşaltıldığından çalışma
+    devam ederken okunabilir. Parquet dosyası satır grupları halinde yazılır
+    ve ancak close() sonrasında tam olarak okunabilir.
+    """
+    
+    def __init__(self, output_dir: str, formats: Iterable[str] = (),
+                 phase_names: Optional[List[str]] = None,
+                 parquet_row_group_size: int = 1000):
+        """
+        Args:
+            output_dir: Özet dosyalarının yazılacağı klasör
+            formats: Satır bazlı çıktı formatları ('jsonl', 'csv', 'parquet')
+            phase_names: CSV/Parquet sütunlarında yer alacak faz adları
+            parquet_row_group_size: Parquet satır grubu başına satır sayısı
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.formats = list(formats)
+        for fmt in self.formats:
+            if fmt not in SUMMARY_FORMATS:
+                raise ValueError(f"Bilinmeyen özet formatı: {fmt}")
+        
+        self.phase_names = list(phase_names or []) + ['Unknown']
+        self.totals = SummaryTotals()
+        self.parquet_row_group_size = parquet_row_group_size
+        
+        # Görüntü bazındaki metin bölümü, bellekte tutulmamak için diske yazılır
+        self._text_part_path = self.output_dir / 'batch_summary.txt.part'
+        self._text_part = open(self._text_part_path, 'w', encoding='utf-8')
+        
+        self._jsonl = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._parquet_writer = None
+        self._parquet_rows: List[Dict] = []
+        # pyarrow opsiyoneldir ve yalnızca ilk satır grubu yazılırken içe aktarılır
+        self._parquet = ('parquet' in self.formats
+                         and importlib.util.find_spec('pyarrow') is not None)
+        
+        if 'jsonl' in self.formats:
+            self._jsonl = open(self.output_dir / 'batch_results.jsonl', 'w', encoding='utf-8')
+        if 'csv' in self.formats:
+            self._csv_file = open(self.output_dir / 'batch_results.csv', 'w',
+                                  encoding='utf-8', newline='')
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=self._columns())
+            self._csv_writer.writeheader()
+            self._csv_file.flush()
+        if 'parquet' in self.formats and not self._parquet:
+            print("pyarrow kurulu değil, Parquet çıktısı atlanıyor.")
+    
+    def _columns(self) -> List[str]:
+        """Satır dosyalarındaki sütunlar"""
+        columns = ['image_path', 'image_name', 'width', 'height', 'total_detections',
+                   'average_confidence', 'screen_reason', 'timestamp']
+        columns += [f'count_{phase}' for phase in self.phase_names]
+        columns += [f'area_{phase}' for phase in self.phase_names]
+        columns += [f'fraction_{phase}' for phase in self.phase_names]
+        return columns
+    
+    def _row(self, results: Dict) -> Dict:
+        """Analiz sonucunu düz (flat) bir satıra dönüştürür"""
+        stats = results['phase_statistics']
+        row = {
+            'image_path': results['image_path'],
+            'image_name': Path(results['image_path']).name,
+            'width': int(results['image_shape'][1]),
+            'height': int(results['image_shape'][0]),
+            'total_detections': stats['total_detections'],
+            'average_confidence': stats['average_confidence'],
+            'screen_reason': _screen_reason(results.get('screen')),
+            'timestamp': results['timestamp']
+        }
+        for phase in self.phase_names:
+            row[f'count_{phase}'] = stats['phase_counts'].get(phase, 0)
+            row[f'area_{phase}'] = float(stats['phase_areas'].get(phase, 0.0))
+        fractions = stats.get('phase_area_fractions', {})
+        for phase in self.phase_names:
+            row[f'fraction_{phase}'] = float(fractions.get(phase, 0.0))
+        return row
+    
+    def add(self, results: Dict):
+        """Bir görüntünün sonucunu satır dosyalarına ve toplamlara ekler"""
+        stats = results['phase_statistics']
+        self.totals.add(stats, results['image_shape'], results.get('screen'))
+        
+        self._text_part.write(f"\n{self.totals.total_images}. {Path(results['image_path']).name}\n")
+        screen_reason = _screen_reason(results.get('screen'))
+        if screen_reason:
+            self._text_part.write(f"   Ön Taramada Elendi: {screen_reason}\n")
+        self._text_part.write(f"   Tespit Sayısı: {stats['total_detections']}\n")
+        if stats['phase_counts']:
+            self._text_part.write("   Faz Dağılımı:\n")
+            for phase, count in stats['phase_counts'].items():
+                self._text_part.write(f"      - {phase}: {count}\n")
+        
+        if not self.formats:
+            return
+        
+        row = self._row(results)
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+            self._csv_file.flush()
+        if self._parquet:
+            self._parquet_rows.append(row)
+            if len(self._parquet_rows) >= self.parquet_row_group_size:
+                self._flush_parquet()
+    
+    def _flush_parquet(self):
+        """Biriken satırları yeni bir Parquet satır grubu olarak yazar"""
+        if not self._parquet_rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        table = pa.Table.from_pylist(self._parquet_rows)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(
+                str(self.output_dir / 'batch_results.parquet'), table.schema)
+        self._parquet_writer.write_table(table)
+        self._parquet_rows = []
+    
+    def close(self, write_summary: bool = True):
+        """
+        Satır dosyalarını kapatır; batch_summary.txt ve batch_totals.json'ı yazar
+        
+        Args:
+            write_summary: False ise yalnızca dosyalar kapatılır, özet yazılmaz
+        """
+        if self._jsonl is not None:
+            self._jsonl.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+        if self._parquet:
+            self._flush_parquet()
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+        self._text_part.close()
+        
+        if write_summary:
+            self._write_text_summary()
+            self.write_totals()
+        os.remove(self._text_part_path)
+    
+    def write_totals(self):
+        """
+        Güncel toplamları batch_totals.json'a yazar
+        
+        Dosya geçici bir dosyaya yazılıp yerine taşındığından çalışma
+        sürerken okuyanlar yarım yazılmış bir dosya görmez.
+        """
+        totals_path = self.output_dir / 'batch_totals.json'
+        temp_path = self.output_dir / 'batch_totals.json.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.totals.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, totals_path)
+    
+    def _write_text_summary(self):
+        """Toplamlardan ve diske yazılmış görüntü bölümünden batch_summary.txt oluşturur"""
+        summary_path = str(self.output_dir / 'batch_summary.txt')
+        
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write("=" * 60 + "\n")
+            f.write("Metalik Malzeme Faz Analizi - Batch İşleme Özeti\n")
+            f.write("=" * 60 + "\n\n")
+            f.write(f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Toplam İşlenen Görüntü: {self.totals.total_images}\n\n")
+            
+            # Genel istatistikler
+            f.write(f"Toplam Tespit: {self.totals.total_detections}\n")
+            f.write(f"Ortalama Güven Skoru: {self.totals.average_confidence:.2%}\n\n")
+            
+            # Cascade ön taramasında aşama bazında elenen görüntüler
+            if self.totals.screened_images:
+                f.write(f"Ön Tarama: {self.totals.screened_images} görüntü tarandı, "
+                        f"{self.totals.rejected_images} görüntü elendi\n")
+                for stage, reasons in self.totals.screen_rejections.items():
+                    details = ", ".join(f"{reason}: {count}" for reason, count in reasons.items())
+                    f.write(f"   - {stage}: {sum(reasons.values())} ({details})\n")
+                f.write("\n")
+            
+            # Görüntü bazında sonuçlar
+            f.write("Görüntü Bazında Sonuçlar:\n")
+            f.write("-" * 60 + "\n")
+            
+            with open(self._text_part_path, 'r', encoding='utf-8') as part:
+                for line in part:
+                    f.write(line)
+        
+        print(f"\nÖzet rapor kaydedildi: {summary_path}")
+    
+    def __enter__(self) -> 'BatchSummaryWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _screen_reason(screen: Optional[Dict]) -> str:
+    """Ön taramada elenen görüntü için 'aşama/gerekçe', aksi halde boş metin"""
+    if screen is None or screen['passed']:
+        return ''
+    return f"{screen['stage']}/{screen['reason']}"
@@ -0,0 +1,417 @@
+"""
+Performans Ölçüm (Benchmark) Paketi
+
+Bu script analiz ve raporlama yolunun sıcak noktalarını sabit bir görüntü
+kümesi üzerinde CPU'da ölçer:
+    - analyze_image gecikmesi (p50 / p95), TTA açık ve kapalı
+    - Ön işleme (gürültü azaltma, CLAHE, normalizasyon) süresi
+    - batch_analyze işleme hızı (görüntü/saniye)
+    - Çok sayıda tespitle _process_results, _calculate_statistics ve WBF
+    - visualize_results ile görselleştirme
+    - Tepe bellek kullanımı (peak RSS)
+
+Eğitilmiş ağırlıklar gerekmez: sabit bir tohumla rastgele başlatılmış bir
+YOLOv8n (yolov8n.yaml) kullanılır. Görüntü kümesi de sabit tohumla
+üretildiğinden ölçümler her makinede tekrarlanabilir. Sonuçlar JSON olarak
+yazılır ve iki çalıştırma karşılaştırılabilir.
+
+Kullanım:
+    python benchmark.py run --output results/benchmark/baseline.json
+    python benchmark.py compare baseline.json candidate.json --threshold 0.10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+# Daha yüksek değeri daha iyi olan metrikler (diğerlerinde düşük olan iyidir)
+HIGHER_IS_BETTER = ('images_per_second',)
+
+
+def generate_corpus(corpus_dir: str, num_images: int = 32, width: int = 640,
+                    height: int = 480, seed: int = 0) -> List[Path]:
+    """
+    Sabit tohumla mikroyapıya benzeyen sentetik gri görüntüler üretir
+    
+    Var olan görüntüler yeniden üretilmez; aynı tohum her zaman aynı
+    görüntüleri verir.
+    """
+    import cv2
+    
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    
+    paths = []
+    for i in range(num_images):
+        noise = rng.random((height, width), dtype=np.float32)
+        path = corpus_dir / f"bench_{i:03d}.png"
+        paths.append(path)
+        if path.exists():
+            continue
+        
+        # Bulanıklaştırılmış gürültü eşiklenerek tane (grain) benzeri bölgeler oluşturulur
+        grains = cv2.GaussianBlur(noise, (0, 0), sigmaX=6)
+        grains = (grains - grains.min()) / max(float(grains.max() - grains.min()), 1e-6)
+        image = np.where(grains > 0.5, 170, 90).astype(np.float32)
+        image += cv2.GaussianBlur(noise, (0, 0), sigmaX=1) * 40
+        cv2.imwrite(str(path), image.clip(0, 255).astype(np.uint8))
+    return paths
+
+
+def create_random_model(model_path: str, seed: int = 0) -> str:
+    """Sabit tohumla rastgele başlatılmış bir YOLOv8n oluşturup kaydeder"""
+    if os.path.exists(model_path):
+        return model_path
+    
+    import torch
+    from ultralytics import YOLO
+    
+    torch.manual_seed(seed)
+    Path(model_path).parent.mkdir(parents=True, exist_ok=True)
+    YOLO('yolov8n.yaml').save(model_path)
+    return model_path
+
+
+def synthetic_detections(num_detections: int, width: int = 640, height: int = 480,
+                         num_classes: int = 5, seed: int = 0):
+    """Rastgele kutu, güven ve sınıf dizileri üretir"""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, [width - 20, height - 20], size=(num_detections, 2))
+    wh = rng.uniform(5, 60, size=(num_detections, 2))
+    boxes = np.hstack([xy, np.minimum(xy + wh, [width, height])]).astype(np.float32)
+    confidences = rng.uniform(0.25, 1.0, num_detections).astype(np.float32)
+    class_ids = rng.integers(0, num_classes, num_detections)
+    return boxes, confidences, class_ids
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Fonksiyonu repeat kez çalıştırıp süre istatistiklerini (ms) döndürür"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000.0)
+    
+    values = np.asarray(durations)
+    return {
+        'n': repeat,
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'mean_ms': float(values.mean()),
+        'min_ms': float(values.min())
+    }
+
+
+def peak_rss_mb() -> float:
+    """Sürecin tepe bellek kullanımı (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt cinsindendir
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def environment_info() -> Dict:
+    """Karşılaştırma için sürüm ve donanım bilgileri"""
+    versions = {}
+    for package in ('numpy', 'opencv-python', 'opencv-python-headless', 'torch', 'ultralytics'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            continue
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions
+    }
+
+
+def run_benchmarks(work_dir: str = 'results/benchmark', num_images: int = 32,
+                   repeat: int = 50, num_detections: int = 10000,
+                   batch_modes: tuple = ('sequential', 'pipeline'),
+                   batch_size: int = 8, seed: int = 0) -> Dict:
+    """
+    Tüm ölçümleri çalıştırır
+    
+    Args:
+        work_dir: Görüntü kümesi, rastgele model ve geçici çıktıların klasörü
+        num_images: Görüntü kümesindeki görüntü sayısı
+        repeat: Gecikme ölçümlerinde tekrar sayısı
+        num_detections: İstatistik ölçümlerindeki sentetik tespit sayısı
+        batch_modes: Ölçülecek batch_analyze modları
+        batch_size: batch_analyze mini-batch boyutu
+        seed: Görüntü kümesi, model ve sentetik tespitler için tohum
+    
+    Returns:
+        Dict: Ortam bilgisi, ayarlar ve ölçüm sonuçları
+    """
+    from phase_analysis import PhaseAnalyzer
+    
+    work_dir = Path(work_dir)
+    corpus_dir = work_dir / f'corpus_{num_images}_{seed}'
+    corpus = generate_corpus(str(corpus_dir), num_images, seed=seed)
+    model_path = create_random_model(str(work_dir / f'yolov8n_random_{seed}.pt'), seed)
+    
+    # Rastgele ağırlıklarla tespit çıkması için düşük bir güven eşiği kullanılır
+    analyzer = PhaseAnalyzer(model_path=model_path, confidence_threshold=0.01)
+    results: Dict[str, Dict] = {}
+    
+    results['warmup'] = {'seconds': analyzer.warmup(batch_size)}
+    
+    # analyze_image gecikmesi
+    calls = iter(range(repeat))
+    results['analyze_image'] = time_calls(
+        lambda: analyzer.analyze_image(str(corpus[next(calls) % len(corpus)])), repeat
+    )
+    
+    # Ön işleme (okuma thread'inde çalışır, çıkarımdan önce biter)
+    from preprocessing import Preprocessor
+    preprocessor = Preprocessor.from_config('methodology')
+    decoded = analyzer._read_image(str(corpus[0]))
+    results['preprocess_methodology'] = time_calls(lambda: preprocessor.apply(decoded), repeat)
+    
+    # TTA'nın gecikme maliyeti (3 kopya tek batch'te)
+    tta_analyzer = PhaseAnalyzer(model_path=model_path, confidence_threshold=0.01, tta='flips')
+    tta_repeat = max(1, repeat // 5)
+    calls = iter(range(tta_repeat))
+    results['analyze_image_tta_flips'] = time_calls(
+        lambda: tta_analyzer.analyze_image(str(corpus[next(calls) % len(corpus)])), tta_repeat
+    )
+    
+    # batch_analyze işleme hızı
+    for mode in batch_modes:
+        with tempfile.TemporaryDirectory(dir=str(work_dir)) as output_dir:
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                analyzer.batch_analyze(str(corpus_dir), output_dir,
+                                       batch_size=batch_size, mode=mode)
+                elapsed = time.perf_counter() - started
+        results[f'batch_analyze_{mode}'] = {
+            'images': len(corpus),
+            'seconds': elapsed,
+            'images_per_second': len(corpus) / elapsed
+        }
+    
+    # Çok sayıda tespitle son işleme ve istatistikler
+    import torch
+    
+    boxes, confidences, class_ids = synthetic_detections(num_detections, seed=seed)
+    fake_result = SimpleNamespace(boxes=SimpleNamespace(
+        xyxy=torch.from_numpy(boxes), conf=torch.from_numpy(confidences),
+        cls=torch.from_numpy(class_ids.astype(np.float32))
+    ))
+    image_shape = (480, 640, 3)
+    detections = analyzer._process_results(fake_result, image_shape)
+    
+    results['process_results'] = time_calls(
+        lambda: analyzer._process_results(fake_result, image_shape), repeat)
+    results['process_results']['detections'] = num_detections
+    results['calculate_statistics'] = time_calls(
+        lambda: analyzer._calculate_statistics(detections), repeat)
+    results['calculate_statistics']['detections'] = num_detections
+    results['calculate_area_fractions'] = time_calls(
+        lambda: analyzer._calculate_area_fractions(detections, image_shape), repeat)
+    results['calculate_area_fractions']['detections'] = num_detections
+    
+    from tta import weighted_box_fusion
+    # WBF kümeleme döngüsü kutu sayısıyla büyür; tek görüntüdeki gerçekçi sayıyla ölçülür
+    fusion_count = min(num_detections, 2000)
+    results['weighted_box_fusion'] = time_calls(
+        lambda: weighted_box_fusion(boxes[:fusion_count], confidences[:fusion_count],
+                                    class_ids[:fusion_count], num_views=3),
+        max(1, repeat // 5))
+    results['weighted_box_fusion']['detections'] = fusion_count
+    
+    # Görselleştirme (500 tespit, diske yazma dahil)
+    render_results = analyzer._build_result(
+        str(corpus[0]), image_shape,
+        analyzer._detections_from_arrays(boxes[:500], confidences[:500], class_ids[:500])
+    )
+    image = analyzer._read_image(str(corpus[0]))
+    with tempfile.TemporaryDirectory(dir=str(work_dir)) as output_dir:
+        save_path = str(Path(output_dir) / 'render.jpg')
+        with contextlib.redirect_stdout(io.StringIO()):
+            results['visualize_results'] = time_calls(
+                lambda: analyzer.visualize_results(render_results, save_path=save_path,
+                                                   show=False, image=image.copy()),
+                max(1, repeat // 2))
+    results['visualize_results']['detections'] = 500
+    
+    results['memory'] = {'peak_rss_mb': peak_rss_mb()}
+    
+    return {
+        'environment': environment_info(),
+        'settings': {
+            'num_images': num_images,
+            'repeat': repeat,
+            'num_detections': num_detections,
+            'batch_modes': list(batch_modes),
+            'batch_size': batch_size,
+            'seed': seed
+        },
+        'results': results
+    }
+
+
+def compare_runs(baseline: Dict, candidate: Dict, threshold: float = 0.10) -> List[Dict]:
+    """
+    İki çalıştırmanın ortak metriklerini karşılaştırır
+    
+    Args:
+        baseline: Referans çalıştırmanın JSON içeriği
+        candidate: Karşılaştırılacak çalıştırmanın JSON içeriği
+        threshold: Bu orandan daha fazla kötüleşme gerileme sayılır
+    
+    Returns:
+        List[Dict]: Metrik başına eski/yeni değer, değişim oranı ve gerileme bilgisi
+    """
+    rows = []
+    for name, metrics in baseline['results'].items():
+        other = candidate['results'].get(name)
+        if other is None:
+            continue
+        
+        for metric, old in metrics.items():
+            new = other.get(metric)
+            if (metric == 'n' or not isinstance(old, (int, float)) or
+                    not isinstance(new, (int, float)) or not old):
+                continue
+            if metric not in HIGHER_IS_BETTER and not metric.endswith(('_ms', '_mb', 'seconds')):
+                continue
+            
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append({
+                'benchmark': name,
+                'metric': metric,
+                'baseline': old,
+                'candidate': new,
+                'change': change,
+                'regression': worse > threshold
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Faz analizi performans ölçümü'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = subparsers.add_parser('run', help='Ölçümleri çalıştır')
+    run_parser.add_argument(
+        '--output',
+        type=str,
+        default='results/benchmark/benchmark.json',
+        help='Sonuçların yazılacağı JSON dosyası'
+    )
+    run_parser.add_argument(
+        '--work-dir',
+        type=str,
+        default='results/benchmark',
+        help='Görüntü kümesi ve rastgele modelin tutulacağı klasör'
+    )
+    run_parser.add_argument(
+        '--num-images',
+        type=int,
+        default=32,
+        help='Görüntü kümesindeki görüntü sayısı'
+    )
+    run_parser.add_argument(
+        '--repeat',
+        type=int,
+        default=50,
+        help='Gecikme ölçümlerinde tekrar sayısı'
+    )
+    run_parser.add_argument(
+        '--num-detections',
+        type=int,
+        default=10000,
+        help='İstatistik ölçümlerindeki sentetik tespit sayısı'
+    )
+    run_parser.add_argument(
+        '--batch-modes',
+        type=str,
+        nargs='+',
+        default=['sequential', 'pipeline'],
+        choices=['sequential', 'pipeline', 'process'],
+        help='Ölçülecek batch_analyze modları'
+    )
+    run_parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Görüntü kümesi ve model tohumu'
+    )
+    
+    compare_parser = subparsers.add_parser('compare', help='İki çalıştırmayı karşılaştır')
+    compare_parser.add_argument('baseline', type=str, help='Referans JSON dosyası')
+    compare_parser.add_argument('candidate', type=str, help='Karşılaştırılacak JSON dosyası')
+    compare_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.10,
+        help='Gerileme sayılacak kötüleşme oranı'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.command == 'run':
+        # Ölçümler CPU'da ve ultralytics günlükleri kapalıyken yapılır
+        os.environ['CUDA_VISIBLE_DEVICES'] = ''
+        os.environ.setdefault('YOLO_VERBOSE', 'False')
+        
+        report = run_benchmarks(args.work_dir, args.num_images, args.repeat,
+                                args.num_detections, tuple(args.batch_modes), seed=args.seed)
+        
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        
+        for name, metrics in report['results'].items():
+            values = ', '.join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                               for key, value in metrics.items())
+            print(f"{name}: {values}")
+        print(f"\nSonuçlar kaydedildi: {args.output}")
+        return
+    
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, 'r', encoding='utf-8') as f:
+        candidate = json.load(f)
+    
+    rows = compare_runs(baseline, candidate, args.threshold)
+    print(f"{'Ölçüm':<40} {'Referans':>12} {'Yeni':>12} {'Değişim':>9}")
+    print("-" * 76)
+    for row in rows:
+        mark = '  GERİLEME' if row['regression'] else ''
+        print(f"{row['benchmark'] + '.' + row['metric']:<40} {row['baseline']:>12.3f} "
+              f"{row['candidate']:>12.3f} {row['change']:>+8.1%}{mark}")
+    
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} ölçümde %{args.threshold * 100:.0f}'dan fazla gerileme var.")
+        sys.exit(1)
+    print("\nGerileme bulunmadı.")
+
+
+if __name__ == "__main__":
+    main()
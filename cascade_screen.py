@@ -0,0 +1,126 @@
+"""
+İki Aşamalı (Cascade) Ön Tarama
+
+Bu modül arşivlerdeki boş, odak dışı veya kalibrasyon görüntülerinin tam
+çözünürlüklü YOLO analizine girmeden elenmesi için CascadeScreen sınıfını
+içerir. Ön tarama iki aşamadan oluşur:
+
+1. 'statistics': Görüntünün küçültülmüş gri tonlu kopyasında kontrast
+   (standart sapma) ve odak ölçüsü (Laplace varyansı) hesaplanır; eşiğin
+   altında kalan görüntüler 'blank' veya 'out_of_focus' gerekçesiyle elenir.
+2. 'low_res' (opsiyonel): Model küçük bir imgsz ile çalıştırılır; hiç
+   tespit üretmeyen görüntüler 'no_detections' gerekçesiyle elenir.
+   candidate_regions açıksa döşemeli analizde yalnızca bu aşamanın
+   bulduğu kutulara denk gelen döşemeler tam çözünürlükte işlenir.
+
+Elenen görüntülerin sonuçlarında tespit listesi boştur; 'screen' anahtarı
+görüntünün hangi aşamada, hangi gerekçeyle elendiğini ve ölçülen değerleri
+içerir.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+SCREEN_STAGES = ('statistics', 'low_res')
+
+
+class CascadeScreen:
+    """Görüntüleri tam analizden önce ucuz ölçütlerle eleyen ön tarama"""
+    
+    def __init__(self, min_contrast: float = 5.0, min_focus: float = 0.0,
+                 statistics_size: int = 256, low_res_size: Optional[int] = None,
+                 low_res_confidence: float = 0.25, candidate_regions: bool = False,
+                 region_margin: int = 32):
+        """
+        Args:
+            min_contrast: Gri ton standart sapması bu değerin altındaki
+                görüntüler boş kabul edilir (0-255 ölçeğinde)
+            min_focus: Laplace varyansı bu değerin altındaki görüntüler odak
+                dışı kabul edilir. Büyütmeye bağlı olduğundan varsayılan
+                olarak kapalıdır (0); birkaç iyi görüntüde ölçülen değerlerin
+                altında bir eşik seçilmelidir
+            statistics_size: İstatistiklerin hesaplandığı küçültülmüş
+                görüntünün uzun kenarı
+            low_res_size: Verilirse model bu imgsz ile ön taramada çalıştırılır
+            low_res_confidence: Düşük çözünürlüklü taramada aday sayılacak
+                tespitlerin güven eşiği (eleme oranı ile kaçırma riski
+                arasındaki dengeyi bu eşik belirler)
+            candidate_regions: True ise döşemeli analizde yalnızca aday
+                kutulara denk gelen döşemeler işlenir
+            region_margin: Aday kutuların döşeme seçiminde genişletileceği
+                piksel payı
+        """
+        if statistics_size < 8:
+            raise ValueError(f"statistics_size en az 8 olmalı: {statistics_size}")
+        if candidate_regions and not low_res_size:
+            raise ValueError("candidate_regions için low_res_size verilmeli")
+        
+        self.min_contrast = min_contrast
+        self.min_focus = min_focus
+        self.statistics_size = statistics_size
+        self.low_res_size = low_res_size
+        self.low_res_confidence = low_res_confidence
+        self.candidate_regions = candidate_regions
+        self.region_margin = region_margin
+    
+    def settings(self) -> Dict:
+        """Sonuçları etkileyen ayarlar (önbellek anahtarı ve işçi süreçler için)"""
+        return {
+            'min_contrast': self.min_contrast,
+            'min_focus': self.min_focus,
+            'statistics_size': self.statistics_size,
+            'low_res_size': self.low_res_size,
+            'low_res_confidence': self.low_res_confidence,
+            'candidate_regions': self.candidate_regions,
+            'region_margin': self.region_margin
+        }
+    
+    def measure(self, image: np.ndarray) -> Dict[str, float]:
+        """Küçültülmüş gri tonlu görüntüde kontrast ve odak ölçülerini hesaplar"""
+        import cv2
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape[:2]
+        scale = self.statistics_size / max(height, width)
+        if scale < 1:
+            gray = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return {
+            'contrast': float(gray.std()),
+            'focus': float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        }
+    
+    def screen_statistics(self, image: np.ndarray) -> Dict:
+        """İlk aşama: görüntü istatistiklerine göre eleme"""
+        measures = self.measure(image)
+        if measures['contrast'] < self.min_contrast:
+            return _rejected('statistics', 'blank', measures)
+        if measures['focus'] < self.min_focus:
+            return _rejected('statistics', 'out_of_focus', measures)
+        return {'passed': True, 'measures': measures}
+    
+    def screen_low_res(self, screen: Dict, boxes: np.ndarray) -> Dict:
+        """İkinci aşama: düşük çözünürlüklü tespitlere göre eleme"""
+        if len(boxes) == 0:
+            return _rejected('low_res', 'no_detections', screen['measures'])
+        return dict(screen, candidates=int(len(boxes)))
+    
+    def candidate_tiles(self, tiles: List[Tuple[int, int, int, int]],
+                        boxes: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Genişletilmiş aday kutulardan en az biriyle kesişen döşemeleri döndürür"""
+        if len(boxes) == 0 or not tiles:
+            return []
+        tile_array = np.asarray(tiles, dtype=np.float32)
+        regions = np.asarray(boxes, dtype=np.float32)
+        margin = self.region_margin
+        # (döşeme sayısı, kutu sayısı) boyutlu kesişim matrisi
+        overlaps = ((tile_array[:, None, 0] < regions[None, :, 2] + margin) &
+                    (tile_array[:, None, 2] > regions[None, :, 0] - margin) &
+                    (tile_array[:, None, 1] < regions[None, :, 3] + margin) &
+                    (tile_array[:, None, 3] > regions[None, :, 1] - margin))
+        return [tile for tile, keep in zip(tiles, overlaps.any(axis=1)) if keep]
+
+
+def _rejected(stage: str, reason: str, measures: Dict[str, float]) -> Dict:
+    return {'passed': False, 'stage': stage, 'reason': reason, 'measures': measures}
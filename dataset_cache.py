@@ -0,0 +1,475 @@
+"""
+Eğitim Veri Seti Önbelleği
+
+Bu modül eğitim görüntülerini ve maskelerini bir kez çözüp (decode)
+boyutlandırarak tek bir uint8 shard dosyasına yazar ve bu dosyayı bellek
+eşlemeli (memory-mapped) okuyan ShardDataset sınıfını içerir. Unet_v1
+defterindeki MetalDataset her epoch'ta her örnek için PNG çözüp
+boyutlandırır; CPU ile eğitimde darboğaz model değil bu veri yüklemesidir.
+Shard'dan okunan örnekler dosyadaki baytların kopyasız görünümleridir.
+
+Shard yapısı (her split için):
+    <split>.bin   Örnek başına art arda yazılmış RGB görüntü (H×W×3) ve
+                  maske (H×W) baytları
+    <split>.json  İndeks: boyut, ön işleme ayarları ve örnek başına ad,
+                  bayt konumu ve kaynak dosyaların değişiklik zamanları
+
+Ayrıca YOLO eğitiminin görüntü önbelleği için (ultralytics cache='ram' /
+'disk') kullanılabilir belleğe göre seçim yapan ve disk önbelleğini
+eğitimden önce bir kez oluşturan yardımcılar içerir.
+
+Kullanım:
+    python dataset_cache.py data/annotations --output data/shards --img-size 256
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from image_discovery import IMAGE_EXTENSIONS, iter_image_files
+from preprocessing import Preprocessor
+
+try:
+    import psutil
+except ImportError:  # psutil opsiyoneldir, yoksa /proc/meminfo okunur
+    psutil = None
+
+
+SPLITS = ('train', 'val', 'test')
+
+SHARD_VERSION = 1
+
+
+def _shard_size(img_size: Union[int, Sequence[int]]) -> Tuple[int, int]:
+    """img_size'ı (yükseklik, genişlik) çiftine çevirir"""
+    if isinstance(img_size, int):
+        return img_size, img_size
+    height, width = img_size
+    return int(height), int(width)
+
+
+def _source_entries(image_dir: Path, mask_dir: Optional[Path]) -> List[Dict]:
+    """Split'teki görüntüleri ve (varsa) maskelerini sıralı olarak listeler"""
+    # iter_image_files mutlak yollar döndürür
+    image_dir = Path(os.path.abspath(image_dir))
+    entries = []
+    for image_file in sorted(iter_image_files(str(image_dir))):
+        entry = {
+            'name': str(image_file.relative_to(image_dir)),
+            'image': str(image_file),
+            'image_mtime_ns': image_file.stat().st_mtime_ns
+        }
+        if mask_dir is not None:
+            # annotation_converter maskeleri görüntüyle aynı adla PNG olarak yazar
+            mask_file = mask_dir / image_file.relative_to(image_dir).with_suffix('.png')
+            if not mask_file.exists():
+                raise ValueError(f"Maske bulunamadı: {mask_file}")
+            entry['mask'] = str(mask_file)
+            entry['mask_mtime_ns'] = mask_file.stat().st_mtime_ns
+        entries.append(entry)
+    return entries
+
+
+def pack_split(image_dir: str, output_path: str, mask_dir: Optional[str] = None,
+               img_size: Union[int, Sequence[int]] = 256,
+               preprocessor: Optional[Preprocessor] = None,
+               num_workers: Optional[int] = None, force: bool = False) -> Dict:
+    """
+    Bir klasördeki görüntüleri (ve maskeleri) tek bir shard dosyasına yazar
+    
+    Görüntüler RGB olarak INTER_AREA ile, maskeler sınıf değerleri
+    bozulmasın diye INTER_NEAREST ile boyutlandırılır. İndeksteki ayarlar ve
+    kaynak dosyaların değişiklik zamanları aynıysa shard yeniden yazılmaz.
+    
+    Args:
+        image_dir: Görüntü klasörü (alt klasörler dahil)
+        output_path: Shard dosyası (.bin); indeks aynı adla .json olarak yazılır
+        mask_dir: Görüntülerle aynı göreli yollarda PNG maskeler (indeks veya
+            ikili maske); None ise yalnızca görüntüler yazılır
+        img_size: Hedef boyut (kare için tek sayı veya (yükseklik, genişlik))
+        preprocessor: Verilirse görüntüler boyutlandırılmadan önce bu ön
+            işlemeden geçirilir (bkz. preprocessing.Preprocessor)
+        num_workers: Çözme thread sayısı (varsayılan CPU sayısı)
+        force: True ise shard güncel olsa da yeniden yazılır
+    
+    Returns:
+        Dict: Shard indeksi
+    """
+    import cv2
+    
+    height, width = _shard_size(img_size)
+    output_path = Path(output_path)
+    index_path = output_path.with_suffix('.json')
+    entries = _source_entries(Path(image_dir), Path(mask_dir) if mask_dir else None)
+    if not entries:
+        raise ValueError(f"Görüntü bulunamadı: {image_dir}")
+    
+    image_bytes = height * width * 3
+    mask_bytes = height * width if mask_dir else 0
+    record_bytes = image_bytes + mask_bytes
+    index = {
+        'version': SHARD_VERSION,
+        'height': height,
+        'width': width,
+        'has_masks': bool(mask_dir),
+        'record_bytes': record_bytes,
+        'preprocessing': preprocessor.settings() if preprocessor is not None else None,
+        'samples': []
+    }
+    for i, entry in enumerate(entries):
+        index['samples'].append(dict(entry, offset=i * record_bytes))
+    
+    # Ayarlar ve kaynaklar değişmediyse mevcut shard kullanılır
+    if not force and index_path.exists() and output_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == index:
+                print(f"Shard güncel: {output_path} ({len(entries)} örnek)")
+                return index
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    data = np.memmap(tmp_path, dtype=np.uint8, mode='w+',
+                     shape=(len(entries) * record_bytes,))
+    
+    def pack(sample: Dict):
+        image = cv2.imread(sample['image'], cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Görüntü okunamadı: {sample['image']}")
+        if preprocessor is not None:
+            image = preprocessor.apply(image, inplace=True)
+        record = data[sample['offset']:sample['offset'] + record_bytes]
+        
+        # Boyutlandırma ve renk dönüşümü doğrudan shard'daki yerine yazılır
+        resized = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(resized, cv2.COLOR_BGR2RGB,
+                     dst=record[:image_bytes].reshape(height, width, 3))
+        if mask_bytes:
+            mask = cv2.imread(sample['mask'], cv2.IMREAD_GRAYSCALE)
+            if mask is None:
+                raise ValueError(f"Maske okunamadı: {sample['mask']}")
+            record[image_bytes:] = cv2.resize(
+                mask, (width, height), interpolation=cv2.INTER_NEAREST
+            ).reshape(-1)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count()) as pool:
+            list(pool.map(pack, index['samples']))
+        data.flush()
+    except BaseException:
+        data = None
+        tmp_path.unlink(missing_ok=True)
+        raise
+    # Bellek eşlemesi dosya taşınmadan önce kapatılır (pack da aynı değişkeni görür)
+    data = None
+    
+    # İndeks shard'dan sonra yazıldığından yarım kalan shard güncel sayılmaz
+    index_path.unlink(missing_ok=True)
+    os.replace(tmp_path, output_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    print(f"Shard yazıldı: {output_path} ({len(entries)} örnek, "
+          f"{output_path.stat().st_size / 1e6:.1f} MB)")
+    return index
+
+
+def pack_dataset(data_dir: str, output_dir: str = 'data/shards',
+                 splits: Sequence[str] = SPLITS,
+                 img_size: Union[int, Sequence[int]] = 256,
+                 preprocessor: Optional[Preprocessor] = None,
+                 num_workers: Optional[int] = None, force: bool = False) -> Dict[str, str]:
+    """
+    Veri setinin her split'ini output_dir/<split>.bin shard'ına yazar
+    
+    data_dir/images/<split> altındaki görüntüler, varsa data_dir/masks/<split>
+    altındaki maskeleriyle (annotation_converter çıktısı) birlikte paketlenir.
+    Görüntüsü olmayan split'ler atlanır.
+    
+    Returns:
+        Dict[str, str]: Split adı → shard dosyası
+    """
+    data_dir = Path(data_dir)
+    shards = {}
+    for split in splits:
+        image_dir = data_dir / 'images' / split
+        if not image_dir.is_dir():
+            continue
+        mask_dir = data_dir / 'masks' / split
+        shard_path = Path(output_dir) / f"{split}.bin"
+        pack_split(str(image_dir), str(shard_path),
+                   mask_dir=str(mask_dir) if mask_dir.is_dir() else None,
+                   img_size=img_size, preprocessor=preprocessor,
+                   num_workers=num_workers, force=force)
+        shards[split] = str(shard_path)
+    return shards
+
+
+class ShardDataset(Dataset):
+    """
+    pack_split ile yazılmış shard'ı okuyan PyTorch veri seti
+    
+    Örnekler (görüntü, maske) çifti olarak döner: görüntü 3×H×W, maske H×W
+    uint8 tensördür ve shard'daki baytların kopyasız görünümleridir. Float'a
+    çevirme ve normalizasyon batch üzerinde (ör. images.float().div_(255))
+    yapılmalıdır. Maskesiz shard'larda yalnızca görüntü döner.
+    """
+    
+    def __init__(self, shard_path: str, in_memory: bool = False,
+                 transform: Optional[Callable] = None, binary_masks: bool = False):
+        """
+        Args:
+            shard_path: Shard dosyası (.bin)
+            in_memory: True ise shard tamamen belleğe okunur; False ise
+                bellek eşlemeli okunur ve sayfalar işletim sistemince
+                önbelleklenir (bkz. choose_cache_mode)
+            transform: Verilirse (görüntü, maske) çiftine uygulanır
+                (maskesiz shard'larda yalnızca görüntüye)
+            binary_masks: True ise maske 0/1 değerlerine çevrilir (Unet_v1
+                defterindeki ikili segmentasyon için)
+        """
+        self.shard_path = str(shard_path)
+        with open(Path(shard_path).with_suffix('.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != SHARD_VERSION:
+            raise ValueError(f"Desteklenmeyen shard sürümü: {shard_path}")
+        
+        self.height = index['height']
+        self.width = index['width']
+        self.has_masks = index['has_masks']
+        self.names = [sample['name'] for sample in index['samples']]
+        self.offsets = [sample['offset'] for sample in index['samples']]
+        self.in_memory = in_memory
+        self.transform = transform
+        self.binary_masks = binary_masks
+        self._image_bytes = self.height * self.width * 3
+        self._record_bytes = index['record_bytes']
+        
+        # Bellek eşlemesi DataLoader işçilerinde ilk erişimde açılır
+        self._data = np.fromfile(self.shard_path, dtype=np.uint8) if in_memory else None
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def __getitem__(self, idx: int):
+        if self._data is None:
+            # 'c' (copy-on-write) kipi tensörlerin yazılabilir olmasını sağlar,
+            # shard dosyası değişmez
+            self._data = np.memmap(self.shard_path, dtype=np.uint8, mode='c')
+        
+        offset = self.offsets[idx]
+        record = self._data[offset:offset + self._record_bytes]
+        image = torch.from_numpy(
+            record[:self._image_bytes].reshape(self.height, self.width, 3)
+        ).permute(2, 0, 1)
+        if not self.has_masks:
+            return self.transform(image) if self.transform else image
+        
+        mask = torch.from_numpy(record[self._image_bytes:].reshape(self.height, self.width))
+        if self.binary_masks:
+            mask = (mask > 0).to(torch.uint8)
+        if self.transform:
+            return self.transform(image, mask)
+        return image, mask
+    
+    def __getstate__(self) -> Dict:
+        # Bellek eşlemesi süreçler arasında kopyalanmaz, yeniden açılır
+        state = self.__dict__.copy()
+        if not self.in_memory:
+            state['_data'] = None
+        return state
+
+
+def available_memory() -> Optional[int]:
+    """Kullanılabilir fiziksel bellek (bayt); belirlenemezse None"""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def choose_cache_mode(required_bytes: int, memory_fraction: float = 0.5) -> str:
+    """
+    Önbelleğin RAM'de mi diskte mi tutulacağını seçer
+    
+    Gereken bellek kullanılabilir belleğin memory_fraction kadarına
+    sığıyorsa 'ram', aksi halde 'disk' döner. Kalan pay model, DataLoader
+    işçileri ve işletim sisteminin sayfa önbelleği için bırakılır.
+    """
+    memory = available_memory()
+    if memory is not None and required_bytes <= memory * memory_fraction:
+        return 'ram'
+    return 'disk'
+
+
+def estimate_yolo_cache_bytes(data_dir: str, img_size: int,
+                              splits: Sequence[str] = ('train', 'val')) -> int:
+    """
+    YOLO eğitiminin görüntü önbelleği için gereken belleği tahmin eder
+    
+    ultralytics görüntüleri uzun kenarı img_size olacak şekilde
+    boyutlandırıp önbelleğe aldığından görüntü başına en fazla
+    img_size × img_size × 3 bayt sayılır.
+    """
+    count = 0
+    for split in splits:
+        split_dir = Path(data_dir) / 'images' / split
+        if split_dir.is_dir():
+            count += sum(1 for _ in iter_image_files(str(split_dir), IMAGE_EXTENSIONS))
+    return count * img_size * img_size * 3
+
+
+def resolve_cache_mode(cache: str, data_dir: str, img_size: int,
+                       copies: int = 1) -> Union[str, bool]:
+    """
+    Eğitimdeki --cache seçeneğini ultralytics'in cache parametresine çevirir
+    
+    'auto' seçeneğinde gereken bellek tahmin edilip choose_cache_mode ile
+    'ram' veya 'disk' seçilir; 'none' önbelleği kapatır (False). Aynı anda
+    çalışan copies eğitim sürecinin her biri kendi RAM önbelleğini tuttuğundan
+    gereken bellek copies ile çarpılır.
+    """
+    if cache == 'none':
+        return False
+    if cache != 'auto':
+        return cache
+    required = estimate_yolo_cache_bytes(data_dir, img_size) * copies
+    mode = choose_cache_mode(required)
+    memory = available_memory()
+    memory_text = f"{memory / 1e9:.1f} GB" if memory is not None else "bilinmiyor"
+    print(f"Görüntü önbelleği: {mode} (gereken ~{required / 1e9:.2f} GB, "
+          f"kullanılabilir bellek {memory_text})")
+    return mode
+
+
+def prepare_yolo_disk_cache(data_dir: str, splits: Sequence[str] = ('train', 'val'),
+                            num_workers: Optional[int] = None) -> int:
+    """
+    ultralytics'in disk önbelleğini (görüntülerin yanındaki .npy dosyaları) oluşturur
+    
+    ultralytics cache='disk' ile her görüntüyü ilk epoch'ta çözüp aynı adlı
+    .npy dosyasına yazar. Aynı veri setiyle eşzamanlı başlayan eğitimler
+    (ör. sweep denemeleri) aynı dosyaları birlikte yazmasın diye önbellek
+    önceden, atomik olarak (geçici dosya + os.replace) yazılır. Sonraki
+    eğitimler bu dosyaları okur ve işletim sisteminin sayfa önbelleği
+    süreçler arasında paylaşılır.
+    
+    Returns:
+        int: Yazılan (eksik veya görüntüden eski) .npy dosyası sayısı
+    """
+    import cv2
+    
+    stale = []
+    for split in splits:
+        split_dir = Path(data_dir) / 'images' / split
+        if not split_dir.is_dir():
+            continue
+        for image_file in iter_image_files(str(split_dir), IMAGE_EXTENSIONS):
+            image_file = Path(image_file)
+            npy_file = image_file.with_suffix('.npy')
+            if not npy_file.exists() or npy_file.stat().st_mtime < image_file.stat().st_mtime:
+                stale.append((image_file, npy_file))
+    
+    def write(paths: Tuple[Path, Path]) -> bool:
+        image_file, npy_file = paths
+        image = cv2.imread(str(image_file))
+        if image is None:
+            return False
+        tmp_path = npy_file.with_name(f".{npy_file.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, image, allow_pickle=False)
+        os.replace(tmp_path, npy_file)
+        return True
+    
+    with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count() or 1) as pool:
+        written = sum(pool.map(write, stale))
+    if stale:
+        print(f"Disk önbelleği: {written} görüntü .npy olarak yazıldı")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Eğitim görüntülerini ve maskelerini bellek eşlemeli shard dosyalarına yaz'
+    )
+    
+    parser.add_argument(
+        'data_dir',
+        type=str,
+        help='images/<split> ve masks/<split> klasörlerini içeren veri seti'
+    )
+    
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='data/shards',
+        help='Shard dosyalarının yazılacağı dizin'
+    )
+    
+    parser.add_argument(
+        '--img-size',
+        type=int,
+        nargs='+',
+        default=[256],
+        help='Hedef boyut: kare için tek değer veya yükseklik genişlik'
+    )
+    
+    parser.add_argument(
+        '--splits',
+        type=str,
+        nargs='+',
+        default=list(SPLITS),
+        help='Paketlenecek split\'ler'
+    )
+    
+    parser.add_argument(
+        '--preprocess',
+        type=str,
+        help='Ön işleme hazır ayarı (methodology, clahe) veya JSON dosyası'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Çözme thread sayısı (varsayılan CPU sayısı)'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Güncel shard\'ları da yeniden yaz'
+    )
+    
+    args = parser.parse_args()
+    
+    if len(args.img_size) not in (1, 2):
+        parser.error('--img-size bir veya iki değer almalı')
+    img_size = args.img_size[0] if len(args.img_size) == 1 else tuple(args.img_size)
+    
+    preprocessor = None
+    if args.preprocess:
+        preprocessor = Preprocessor.from_config(args.preprocess)
+    
+    shards = pack_dataset(args.data_dir, args.output, splits=args.splits,
+                          img_size=img_size, preprocessor=preprocessor,
+                          num_workers=args.workers, force=args.force)
+    if not shards:
+        print(f"Görüntü bulunamadı: {args.data_dir}/images/<split>")
+
+
+if __name__ == "__main__":
+    main()
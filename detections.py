@@ -0,0 +1,119 @@
+"""
+Sütunlu (Columnar) Tespit Gösterimi
+
+Bu modül tespitleri kutu başına bir Python dictionary'si yerine NumPy
+dizilerinde tutan Detections sınıfını içerir. Faz istatistikleri
+np.bincount ile vektörel olarak hesaplanır. Eski kodla uyumluluk için
+nesne, dictionary listesi gibi gezilebilir ve indekslenebilir; liste
+görünümü yalnızca ihtiyaç duyulduğunda oluşturulur.
+"""
+
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class Detections(Sequence):
+    """Bir görüntüdeki tespitlerin sütunlu gösterimi"""
+    
+    def __init__(self, boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray,
+                 phase_names: Dict[int, str]):
+        """
+        Args:
+            boxes: (N, 4) boyutlu xyxy kutular
+            confidences: (N,) güven skorları
+            class_ids: (N,) sınıf indeksleri
+            phase_names: Sınıf indeksi -> faz adı eşlemesi
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        self.class_ids = np.asarray(class_ids, dtype=np.int64).reshape(-1)
+        self.phase_names = phase_names
+        self.areas = ((self.boxes[:, 2] - self.boxes[:, 0]) *
+                      (self.boxes[:, 3] - self.boxes[:, 1]))
+        self._records: Optional[List[Dict]] = None
+    
+    @classmethod
+    def from_records(cls, records: List[Dict], phase_names: Dict[int, str]) -> 'Detections':
+        """Dictionary listesinden (ör. JSON'dan okunmuş) Detections oluşturur"""
+        if not records:
+            return cls(np.empty((0, 4)), np.empty(0), np.empty(0), phase_names)
+        return cls(np.array([record['bbox'] for record in records]),
+                   np.array([record['confidence'] for record in records]),
+                   np.array([record['class_id'] for record in records]),
+                   phase_names)
+    
+    @property
+    def class_names(self) -> List[str]:
+        """Her tespitin faz adı"""
+        return [self.phase_names.get(cls_id, 'Unknown') for cls_id in self.class_ids.tolist()]
+    
+    def tolist(self) -> List[Dict]:
+        """
+        Tespitleri eski formatta dictionary listesi olarak döndürür
+        
+        Liste ilk çağrıda oluşturulur ve sonraki çağrılarda yeniden kullanılır.
+        """
+        if self._records is None:
+            self._records = [
+                {
+                    'bbox': box,
+                    'confidence': confidence,
+                    'class_id': cls_id,
+                    'class_name': class_name,
+                    'area': area
+                }
+                for box, confidence, cls_id, class_name, area in zip(
+                    self.boxes.tolist(), self.confidences.tolist(), self.class_ids.tolist(),
+                    self.class_names, self.areas.tolist())
+            ]
+        return self._records
+    
+    def __len__(self) -> int:
+        return len(self.class_ids)
+    
+    def __getitem__(self, index):
+        return self.tolist()[index]
+    
+    def __iter__(self):
+        return iter(self.tolist())
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Detections, list)):
+            return self.tolist() == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"Detections(n={len(self)})"
+    
+    def statistics(self) -> Dict:
+        """
+        Faz sayılarını, alanlarını ve ortalama güven skorunu vektörel hesaplar
+        
+        Sözlüklerdeki fazlar, tespit listesinde ilk göründükleri sırayla yer alır.
+        """
+        stats = {
+            'total_detections': len(self),
+            'phase_counts': {},
+            'phase_areas': {},
+            'average_confidence': 0.0
+        }
+        
+        if len(self) == 0:
+            return stats
+        
+        # Sınıf indeksleri küçük ve negatif olmadığı için bincount ile toplanır
+        counts = np.bincount(self.class_ids)
+        areas = np.bincount(self.class_ids, weights=self.areas)
+        unique_ids, first_index = np.unique(self.class_ids, return_index=True)
+        
+        for cls_id in unique_ids[np.argsort(first_index)].tolist():
+            phase_name = self.phase_names.get(cls_id, 'Unknown')
+            stats['phase_counts'][phase_name] = \
+                stats['phase_counts'].get(phase_name, 0) + int(counts[cls_id])
+            stats['phase_areas'][phase_name] = \
+                stats['phase_areas'].get(phase_name, 0.0) + float(areas[cls_id])
+        
+        stats['average_confidence'] = float(np.mean(self.confidences.astype(np.float64)))
+        return stats
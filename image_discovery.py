@@ -0,0 +1,116 @@
+"""
+Görüntü Dosyalarının Akışlı Keşfi
+
+Bu modül büyük arşiv ağaçlarındaki görüntüleri os.scandir ile klasör
+klasör dolaşan ve dosyaları bulundukça döndüren iter_image_files()
+fonksiyonunu içerir. Tüm liste bellekte oluşturulmadığından işleme ilk
+dosya bulunur bulunmaz başlayabilir; bellekte aynı anda yalnızca dolaşılan
+klasörlerin listeleri tutulur.
+
+Sıralama her çalışmada aynıdır (klasör içi ada göre, derinlik öncelikli).
+Parçalama (sharding) dosyanın köke göre göreli yolunun özetiyle yapılır;
+böylece aynı ağacı farklı yollara bağlamış makineler haberleşmeden işi
+bölüşebilir.
+"""
+
+import fnmatch
+import os
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+
+
+def shard_of(relative_path: str, num_shards: int) -> int:
+    """Göreli yolun (POSIX biçiminde) atandığı parça indeksi"""
+    return zlib.crc32(relative_path.encode('utf-8')) % num_shards
+
+
+def iter_image_files(root: str, extensions: Iterable[str] = IMAGE_EXTENSIONS,
+                     include: Optional[Iterable[str]] = None,
+                     exclude: Optional[Iterable[str]] = None,
+                     recursive: bool = True, shard_index: int = 0,
+                     num_shards: int = 1,
+                     skip_dirs: Iterable[str] = ()) -> Iterator[Path]:
+    """
+    Klasördeki görüntü dosyalarını bulundukça döndürür
+    
+    Args:
+        root: Taranacak klasör
+        extensions: Görüntü uzantıları (büyük/küçük harf duyarsız)
+        include: Verilirse yalnızca göreli yolu bu kalıplardan birine uyan
+            dosyalar döndürülür (fnmatch, büyük/küçük harf duyarsız,
+            ör. '*.tif', 'numune_*/*')
+        exclude: Göreli yolu bu kalıplardan birine uyan dosyalar atlanır;
+            uyan klasörlere hiç girilmez (ör. 'eski/*', '*_thumb.jpg')
+        recursive: False ise yalnızca root'un kendisi taranır
+        shard_index: Bu makinenin/sürecin parça indeksi
+        num_shards: Toplam parça sayısı
+        skip_dirs: Girilmeyecek klasörler (ör. root içindeki çıktı klasörü)
+    
+    Returns:
+        Iterator[Path]: Görüntü dosyaları (gizli dosya ve klasörler hariç)
+    """
+    if num_shards < 1 or not 0 <= shard_index < num_shards:
+        raise ValueError(f"Geçersiz parça: {shard_index}/{num_shards}")
+    if not os.path.isdir(root):
+        raise ValueError(f"Klasör bulunamadı: {root}")
+    
+    extensions = tuple(ext.lower() for ext in extensions)
+    include = [pattern.lower() for pattern in include or []]
+    exclude = [pattern.lower() for pattern in exclude or []]
+    skip_dirs = {os.path.abspath(path) for path in skip_dirs}
+    # Parametre hataları ilk dosya istendiğinde değil, çağrı anında bildirilir
+    return _walk(os.path.abspath(root), extensions, include, exclude, recursive,
+                 shard_index, num_shards, skip_dirs)
+
+
+def _walk(root: str, extensions: tuple, include: list, exclude: list, recursive: bool,
+          shard_index: int, num_shards: int, skip_dirs: set) -> Iterator[Path]:
+    """iter_image_files() için derinlik öncelikli scandir dolaşımı"""
+    # Yığında (klasör yolu, göreli yol) çiftleri tutulur
+    stack = [(root, '')]
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Klasör okunamadı ({directory}): {e}")
+            continue
+        
+        subdirs = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            relative_path = f"{relative_dir}{entry.name}"
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            
+            if is_dir:
+                if (recursive and entry.path not in skip_dirs
+                        and not _matches(relative_path, exclude)):
+                    subdirs.append((entry.path, relative_path + '/'))
+                continue
+            if not entry.name.lower().endswith(extensions):
+                continue
+            if include and not _matches(relative_path, include):
+                continue
+            if _matches(relative_path, exclude):
+                continue
+            if num_shards > 1 and shard_of(relative_path, num_shards) != shard_index:
+                continue
+            yield Path(entry.path)
+        
+        # Alt klasörler ada göre sırayla dolaşılır
+        stack.extend(reversed(subdirs))
+
+
+def _matches(relative_path: str, patterns: Iterable[str]) -> bool:
+    """Göreli yol kalıplardan birine uyuyorsa True döndürür"""
+    relative_path = relative_path.lower()
+    return any(fnmatch.fnmatchcase(relative_path, pattern) for pattern in patterns)
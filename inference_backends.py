@@ -0,0 +1,340 @@
+"""
+CPU Çıkarım Backend'leri
+
+Bu modül train_model.export_model ile dışa aktarılmış YOLO modellerini
+ultralytics'e ihtiyaç duymadan ONNX Runtime veya OpenVINO üzerinde
+çalıştırmak için gerekli sınıfları içerir. Backend'ler kendi letterbox ön
+işlemesini ve NMS son işlemesini yapar ve görüntü başına
+(kutular, güven skorları, sınıflar) dizileri döndürür.
+"""
+
+import abc
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from tiled_inference import non_max_suppression
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnxruntime opsiyoneldir
+    ort = None
+
+try:
+    import openvino as ov
+except ImportError:  # openvino opsiyoneldir
+    ov = None
+
+
+# Görüntü başına ham (kutular, skorlar, sınıflar) dizileri; detections.Detections
+# sınıfıyla karışmaması için ayrı adlandırılmıştır
+DetectionArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Desteklenen backend isimleri
+BACKENDS = ('ultralytics', 'onnxruntime', 'openvino')
+
+
+def letterbox(image: np.ndarray, new_size: int = 640,
+              color: Tuple[int, int, int] = (114, 114, 114)
+              ) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Görüntüyü en-boy oranını koruyarak kare bir tuvale yerleştirir
+    
+    Args:
+        image: BGR görüntü
+        new_size: Hedef kare kenar uzunluğu
+        color: Dolgu rengi (ultralytics ile aynı gri)
+    
+    Returns:
+        Tuple: (dolgulu görüntü, ölçek oranı, (x dolgusu, y dolgusu))
+    """
+    height, width = image.shape[:2]
+    ratio = min(new_size / height, new_size / width)
+    resized_w, resized_h = int(round(width * ratio)), int(round(height * ratio))
+    
+    pad_x = (new_size - resized_w) / 2
+    pad_y = (new_size - resized_h) / 2
+    
+    if (resized_w, resized_h) != (width, height):
+        image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+    
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(image, top, bottom, left, right,
+                                cv2.BORDER_CONSTANT, value=color)
+    return padded, ratio, (left, top)
+
+
+def preprocess_batch(images: List[np.ndarray], imgsz: int
+                     ) -> Tuple[np.ndarray, List[Tuple[float, Tuple[float, float]]]]:
+    """BGR görüntüleri (N, 3, imgsz, imgsz) float32 tensörüne dönüştürür"""
+    batch = np.empty((len(images), 3, imgsz, imgsz), dtype=np.float32)
+    transforms = []
+    for i, image in enumerate(images):
+        padded, ratio, pad = letterbox(image, imgsz)
+        # BGR -> RGB, HWC -> CHW, [0, 255] -> [0, 1]
+        batch[i] = padded[:, :, ::-1].transpose(2, 0, 1)
+        transforms.append((ratio, pad))
+    batch /= 255.0
+    return batch, transforms
+
+
+def postprocess(output: np.ndarray, transforms: List[Tuple[float, Tuple[float, float]]],
+                image_shapes: List[Tuple], conf_threshold: float,
+                iou_threshold: float = 0.7, max_det: int = 300) -> List[DetectionArrays]:
+    """
+    YOLOv8 ham çıktısını görüntü koordinatlarındaki tespitlere dönüştürür
+    
+    Args:
+        output: (N, 4 + sınıf sayısı, aday sayısı) boyutlu model çıktısı
+        transforms: preprocess_batch() tarafından döndürülen letterbox bilgileri
+        image_shapes: Orijinal görüntü boyutları
+        conf_threshold: Minimum güven eşiği
+        iou_threshold: NMS IoU eşiği (ultralytics varsayılanı 0.7)
+        max_det: Görüntü başına maksimum tespit sayısı
+    
+    Returns:
+        List[DetectionArrays]: Görüntü başına (kutular, skorlar, sınıflar)
+    """
+    detections = []
+    for prediction, (ratio, (pad_x, pad_y)), shape in zip(output, transforms, image_shapes):
+        prediction = prediction.T
+        class_scores = prediction[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_scores)), class_ids]
+        
+        mask = scores > conf_threshold
+        xywh, scores, class_ids = prediction[mask, :4], scores[mask], class_ids[mask]
+        
+        boxes = np.empty_like(xywh)
+        boxes[:, 0] = xywh[:, 0] - xywh[:, 2] / 2
+        boxes[:, 1] = xywh[:, 1] - xywh[:, 3] / 2
+        boxes[:, 2] = xywh[:, 0] + xywh[:, 2] / 2
+        boxes[:, 3] = xywh[:, 1] + xywh[:, 3] / 2
+        
+        keep = non_max_suppression(boxes, scores, class_ids, iou_threshold)[:max_det]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+        
+        # Letterbox dönüşümünü geri al
+        boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=boxes.dtype)
+        boxes /= ratio
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+        
+        detections.append((boxes.astype(np.float32), scores.astype(np.float32),
+                           class_ids.astype(int)))
+    return detections
+
+
+class ExportedModelBackend(abc.ABC):
+    """Dışa aktarılmış YOLO modelleri için ortak ön/son işleme mantığı"""
+    
+    def __init__(self, imgsz: int = 640, iou_threshold: float = 0.7,
+                 max_det: int = 300):
+        self.imgsz = imgsz
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+        # Model sabit batch boyutuyla dışa aktarıldıysa bu değer ayarlanır
+        self.fixed_batch_size: Optional[int] = None
+        # Son predict çağrısında görüntü başına süreler (ms, ultralytics ile aynı anahtarlar)
+        self.speed = {'preprocess': 0.0, 'inference': 0.0, 'postprocess': 0.0}
+    
+    def predict(self, images: List[np.ndarray], conf: float) -> List[DetectionArrays]:
+        """
+        Görüntüler üzerinde tespit yapar
+        
+        Args:
+            images: BGR görüntüler
+            conf: Minimum güven eşiği
+        
+        Returns:
+            List[DetectionArrays]: Görüntü başına (kutular, skorlar, sınıflar)
+        """
+        step = self.fixed_batch_size or max(len(images), 1)
+        detections = []
+        elapsed = {'preprocess': 0.0, 'inference': 0.0, 'postprocess': 0.0}
+        for start in range(0, len(images), step):
+            chunk = images[start:start + step]
+            started = time.perf_counter()
+            batch, transforms = preprocess_batch(chunk, self.imgsz)
+            if self.fixed_batch_size and len(chunk) < self.fixed_batch_size:
+                # Sabit batch boyutlu modellerde son eksik parça sıfırlarla doldurulur
+                padding = np.zeros((self.fixed_batch_size - len(chunk),) + batch.shape[1:],
+                                   dtype=batch.dtype)
+                batch = np.concatenate([batch, padding])
+            preprocessed = time.perf_counter()
+            output = self._run(batch)[:len(chunk)]
+            inferred = time.perf_counter()
+            detections.extend(postprocess(output, transforms, [image.shape for image in chunk],
+                                          conf, self.iou_threshold, self.max_det))
+            elapsed['preprocess'] += preprocessed - started
+            elapsed['inference'] += inferred - preprocessed
+            elapsed['postprocess'] += time.perf_counter() - inferred
+        
+        count = max(len(images), 1)
+        self.speed = {stage: seconds * 1000.0 / count for stage, seconds in elapsed.items()}
+        return detections
+    
+    @abc.abstractmethod
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """Ön işlenmiş batch'i modelden geçirir"""
+
+
+class OnnxRuntimeBackend(ExportedModelBackend):
+    """ONNX Runtime üzerinde CPU çıkarımı"""
+    
+    def __init__(self, model_path: str, imgsz: int = 640, num_threads: Optional[int] = None,
+                 providers: Optional[List[str]] = None, **kwargs):
+        """
+        Args:
+            model_path: .onnx model dosyası
+            imgsz: Model dinamik giriş boyutluysa kullanılacak görüntü boyutu
+            num_threads: ONNX Runtime intra-op thread sayısı
+            providers: Execution provider listesi (varsayılan: CPU)
+        """
+        if ort is None:
+            raise ImportError("onnxruntime kurulu değil: pip install onnxruntime")
+        super().__init__(imgsz=imgsz, **kwargs)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options,
+            providers=providers or ['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        
+        batch_dim, _, height, _ = self.session.get_inputs()[0].shape
+        if isinstance(batch_dim, int):
+            self.fixed_batch_size = batch_dim
+        if isinstance(height, int):
+            self.imgsz = height
+    
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(ExportedModelBackend):
+    """OpenVINO üzerinde CPU çıkarımı"""
+    
+    def __init__(self, model_path: str, imgsz: int = 640, num_threads: Optional[int] = None,
+                 device: str = 'CPU', **kwargs):
+        """
+        Args:
+            model_path: .onnx veya OpenVINO IR (.xml) model dosyası ya da
+                ultralytics'in oluşturduğu *_openvino_model klasörü
+            imgsz: Model dinamik giriş boyutluysa kullanılacak görüntü boyutu
+            num_threads: OpenVINO çıkarım thread sayısı
+            device: OpenVINO cihazı
+        """
+        if ov is None:
+            raise ImportError("openvino kurulu değil: pip install openvino")
+        super().__init__(imgsz=imgsz, **kwargs)
+        
+        path = Path(model_path)
+        if path.is_dir():
+            path = next(path.glob('*.xml'))
+        
+        config = {'PERFORMANCE_HINT': 'THROUGHPUT'}
+        if num_threads:
+            config['INFERENCE_NUM_THREADS'] = num_threads
+        
+        core = ov.Core()
+        model = core.read_model(str(path))
+        self.compiled_model = core.compile_model(model, device, config)
+        self.output = self.compiled_model.output(0)
+        
+        input_shape = model.input(0).get_partial_shape()
+        if input_shape[0].is_static:
+            self.fixed_batch_size = input_shape[0].get_length()
+        if input_shape[2].is_static:
+            self.imgsz = input_shape[2].get_length()
+    
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled_model([batch])[self.output]
+
+
+def create_backend(name: str, model_path: str, **options) -> ExportedModelBackend:
+    """
+    İsmi verilen dışa aktarılmış model backend'ini oluşturur
+    
+    Args:
+        name: 'onnxruntime' veya 'openvino'
+        model_path: Dışa aktarılmış model yolu
+        **options: Backend'e iletilecek ek parametreler (imgsz, num_threads, ...)
+    """
+    if name == 'onnxruntime':
+        return OnnxRuntimeBackend(model_path, **options)
+    if name == 'openvino':
+        return OpenVINOBackend(model_path, **options)
+    raise ValueError(f"Bilinmeyen backend: {name}")
+
+
+def _calibration_images(calibration_dir: str, max_images: int) -> List[Path]:
+    """Kalibrasyon klasöründeki görüntüleri listeler"""
+    extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
+    files = sorted(p for p in Path(calibration_dir).iterdir()
+                   if p.suffix.lower() in extensions)
+    if not files:
+        raise ValueError(f"Kalibrasyon görüntüsü bulunamadı: {calibration_dir}")
+    return files[:max_images]
+
+
+def quantize_onnx_model(model_path: str, calibration_dir: str,
+                        output_path: Optional[str] = None, imgsz: int = 640,
+                        max_images: int = 200) -> str:
+    """
+    ONNX modeline INT8 statik (post-training) kuantizasyon uygular
+    
+    Aktivasyon aralıkları kalibrasyon klasöründeki görüntüler, çıkarımda
+    kullanılan letterbox ön işlemesiyle modelden geçirilerek belirlenir.
+    
+    Args:
+        model_path: FP32 .onnx model dosyası
+        calibration_dir: Temsili mikroyapı görüntülerinin bulunduğu klasör
+        output_path: INT8 modelin kaydedileceği yol (varsayılan: *_int8.onnx)
+        imgsz: Modelin giriş boyutu
+        max_images: Kalibrasyonda kullanılacak maksimum görüntü sayısı
+    
+    Returns:
+        str: Kuantize edilmiş modelin yolu
+    """
+    if ort is None:
+        raise ImportError("onnxruntime kurulu değil: pip install onnxruntime")
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          QuantType, quantize_static)
+    
+    output_path = output_path or str(Path(model_path).with_name(
+        f"{Path(model_path).stem}_int8.onnx"))
+    input_name = ort.InferenceSession(
+        model_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    files = _calibration_images(calibration_dir, max_images)
+    
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            self._batches: Iterator[Dict[str, np.ndarray]] = self._iterate()
+        
+        def _iterate(self) -> Iterator[Dict[str, np.ndarray]]:
+            for file in files:
+                image = cv2.imread(str(file))
+                if image is None:
+                    print(f"Kalibrasyon görüntüsü okunamadı: {file}")
+                    continue
+                batch, _ = preprocess_batch([image], imgsz)
+                yield {input_name: batch}
+        
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            return next(self._batches, None)
+    
+    print(f"INT8 kalibrasyonu {len(files)} görüntü ile yapılıyor...")
+    quantize_static(model_path, output_path, _Reader(),
+                    quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    print(f"INT8 model kaydedildi: {output_path}")
+    return output_path
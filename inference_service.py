@@ -0,0 +1,422 @@
+"""
+Yerel Çıkarım Servisi (HTTP)
+
+Bu modül PhaseAnalyzer'ı uzun süre çalışan bir HTTP servisi olarak sunar.
+Model bir kez yüklenir ve sıcak tutulur; eşzamanlı gelen istekler bir
+asyncio kuyruğunda toplanır ve kısa bir gecikme penceresi içinde gelenler
+tek bir model çağrısında (micro-batch) işlenir. Böylece her laboratuvar
+istasyonunun kendi Python sürecini ve modelini yüklemesine gerek kalmaz.
+
+Uç noktalar:
+    POST /analyze   Ham görüntü baytları (isteğe bağlı ?name=dosya.png) veya
+                    {"image_path": "..."} JSON gövdesi; analyze_image() çıktısı döner
+    GET  /metrics   Kuyruk derinliği, batch boyutları ve gecikme yüzdelikleri
+    GET  /health    Servis durumu
+
+Kullanım:
+    python inference_service.py --model models/yolov8_phase_detection.pt --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from phase_analysis import PhaseAnalyzer
+from result_cache import bytes_digest, json_default
+
+
+HTTP_STATUS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class MicroBatcher:
+    """
+    Eşzamanlı analiz isteklerini gecikme penceresi içinde gruplayan kuyruk
+    
+    İlk istek geldiğinde en fazla max_wait_ms kadar beklenir; bu süre içinde
+    gelen istekler (en fazla max_batch_size) aynı model çağrısına eklenir.
+    Model tek bir thread'de çalıştırılır, görüntü çözme ve önbellek kontrolü
+    ise istek başına varsayılan thread havuzunda yapılır.
+    """
+    
+    def __init__(self, analyzer: PhaseAnalyzer, max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, max_queue_size: int = 256,
+                 latency_window: int = 1000):
+        """
+        Args:
+            analyzer: Modeli yüklenmiş PhaseAnalyzer
+            max_batch_size: Tek model çağrısındaki maksimum görüntü sayısı
+            max_wait_ms: İlk istekten sonra batch'in doldurulması için beklenecek süre
+            max_queue_size: Kuyruktaki maksimum istek sayısı (dolunca istekler bekler)
+            latency_window: Gecikme yüzdelikleri için tutulan son istek sayısı
+        """
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Model çağrıları sırayla yapılır (tek sıcak model)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        
+        self.requests_total = 0
+        self.errors_total = 0
+        self.cache_hits = 0
+        self.batches_total = 0
+        self.batched_images = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_latencies = deque(maxlen=latency_window)
+    
+    async def start(self):
+        """Batch döngüsünü çalışan event loop üzerinde başlatır"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Batch döngüsünü durdurur"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+    
+    async def submit(self, image_path: str, data: Optional[bytes] = None) -> Dict:
+        """
+        Bir görüntüyü analiz ettirir ve sonucunu döndürür
+        
+        Args:
+            image_path: Görüntü yolu; data verilirse yalnızca sonuçta görünen ad
+            data: HTTP ile yüklenmiş kodlanmış görüntü baytları
+        
+        Returns:
+            Dict: analyze_image() ile aynı formatta analiz sonucu
+        """
+        started = time.perf_counter()
+        self.requests_total += 1
+        loop = asyncio.get_running_loop()
+        
+        try:
+            key, cached, image = await loop.run_in_executor(None, self._prepare, image_path, data)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            
+            future = loop.create_future()
+            await self._queue.put((image_path, image, key, future))
+            return await future
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+    
+    def _prepare(self, image_path: str, data: Optional[bytes]
+                 ) -> Tuple[Optional[str], Optional[Dict], Optional[np.ndarray]]:
+        """Önbelleği kontrol eder, bulunamazsa görüntüyü çözer"""
+        if data is None:
+            key, cached = self.analyzer._lookup_cache(image_path)
+            image = self.analyzer._read_image(image_path) if cached is None else None
+            return key, cached, image
+        
+        digest = bytes_digest(data) if self.analyzer.result_cache is not None else None
+        key, cached = self.analyzer._lookup_cache(image_path, digest)
+        if cached is not None:
+            return key, cached, None
+        
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Görüntü çözülemedi: {image_path}")
+        return key, None, self.analyzer._enhance(image_path, image)
+    
+    async def _run(self):
+        """Kuyruktan batch'ler oluşturup modele gönderir"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._execute(batch)
+    
+    async def _execute(self, batch: List[Tuple]):
+        """Bir batch'i model thread'inde analiz edip sonuçları isteklere dağıtır"""
+        loop = asyncio.get_running_loop()
+        image_paths = [image_path for image_path, _, _, _ in batch]
+        images = [image for _, image, _, _ in batch]
+        lookups = [(key, None) for _, _, key, _ in batch]
+        
+        started = time.perf_counter()
+        try:
+            batch_results = await loop.run_in_executor(
+                self._executor, self.analyzer._analyze_with_cache, image_paths, images, lookups
+            )
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._batch_latencies.append(time.perf_counter() - started)
+            self.batches_total += 1
+            self.batched_images += len(batch)
+        
+        for (_, _, _, future), results in zip(batch, batch_results):
+            if not future.done():
+                future.set_result(results)
+    
+    def metrics(self) -> Dict:
+        """Kuyruk derinliği, batch istatistikleri ve gecikme yüzdeliklerini döndürür"""
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'requests_total': self.requests_total,
+            'errors_total': self.errors_total,
+            'cache_hits': self.cache_hits,
+            'batches_total': self.batches_total,
+            'average_batch_size': (self.batched_images / self.batches_total
+                                   if self.batches_total else 0.0),
+            'latency_ms': _percentiles(self._latencies),
+            'batch_latency_ms': _percentiles(self._batch_latencies)
+        }
+
+
+def _percentiles(samples) -> Dict[str, float]:
+    """Saniye cinsinden örneklerin milisaniye yüzdelikleri"""
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+            'max': float(values.max())}
+
+
+class InferenceService:
+    """MicroBatcher'ı localhost üzerinde HTTP/1.1 ile sunan servis"""
+    
+    def __init__(self, analyzer: PhaseAnalyzer, host: str = '127.0.0.1', port: int = 8000,
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 max_queue_size: int = 256, max_upload_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            analyzer: Modeli yüklenmiş PhaseAnalyzer
+            host: Dinlenecek adres (varsayılan yalnızca localhost)
+            port: Dinlenecek port
+            max_batch_size: Tek model çağrısındaki maksimum görüntü sayısı
+            max_wait_ms: Batch doldurmak için beklenecek gecikme penceresi
+            max_queue_size: Kuyruktaki maksimum istek sayısı
+            max_upload_bytes: Kabul edilen maksimum istek gövdesi boyutu
+        """
+        self.host = host
+        self.port = port
+        self.max_upload_bytes = max_upload_bytes
+        self.batcher = MicroBatcher(analyzer, max_batch_size, max_wait_ms, max_queue_size)
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self):
+        """Batch döngüsünü ve HTTP sunucusunu başlatır"""
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"Çıkarım servisi dinleniyor: http://{self.host}:{self.port}")
+    
+    async def stop(self):
+        """Sunucuyu ve batch döngüsünü durdurur"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+    
+    async def serve_forever(self):
+        """Servisi başlatır ve durdurulana kadar çalıştırır"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """Bir bağlantıdaki (keep-alive) HTTP isteklerini sırayla yanıtlar"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                
+                try:
+                    request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                    method, target, version = request_line.split(' ', 2)
+                    headers = {}
+                    for line in header_lines:
+                        if ':' in line:
+                            name, value = line.split(':', 1)
+                            headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Geçersiz istek'}, False)
+                    break
+                
+                if length > self.max_upload_bytes:
+                    await self._respond(writer, 413, {'error': 'İstek gövdesi çok büyük'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                
+                keep_alive = (version.strip() == 'HTTP/1.1' and
+                              headers.get('connection', '').lower() != 'close')
+                status, payload = await self._route(method, target, headers, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _route(self, method: str, target: str, headers: Dict[str, str],
+                     body: bytes) -> Tuple[int, Dict]:
+        """İsteği ilgili uç noktaya yönlendirir"""
+        url = urlsplit(target)
+        
+        if url.path == '/health':
+            return 200, {'status': 'ok'}
+        if url.path == '/metrics':
+            return 200, self.batcher.metrics()
+        if url.path != '/analyze':
+            return 404, {'error': f"Bilinmeyen uç nokta: {url.path}"}
+        if method != 'POST':
+            return 405, {'error': 'Yalnızca POST desteklenir'}
+        
+        try:
+            if headers.get('content-type', '').startswith('application/json'):
+                image_path = json.loads(body)['image_path']
+                results = await self.batcher.submit(image_path)
+            else:
+                image_path = parse_qs(url.query).get('name', ['upload'])[0]
+                results = await self.batcher.submit(image_path, body)
+        except FileNotFoundError as e:
+            return 404, {'error': str(e)}
+        except (ValueError, KeyError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+        
+        # Segmentasyon maskesi (tam boyutlu dizi) JSON yanıtına yazılmaz
+        return 200, {key: value for key, value in results.items() if key != 'mask'}
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict,
+                       keep_alive: bool):
+        """JSON yanıtını yazar"""
+        body = json.dumps(payload, default=json_default, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Faz analizi çıkarım servisi (localhost HTTP)'
+    )
+    
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='models/yolov8_phase_detection.pt',
+        help='Model dosyası'
+    )
+    
+    parser.add_argument(
+        '--conf',
+        type=float,
+        default=0.5,
+        help='Güven eşiği'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='ultralytics',
+        choices=['ultralytics', 'onnxruntime', 'openvino', 'unet'],
+        help='Çıkarım backend\'i'
+    )
+    
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='Dinlenecek adres'
+    )
+    
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8000,
+        help='Dinlenecek port'
+    )
+    
+    parser.add_argument(
+        '--max-batch-size',
+        type=int,
+        default=8,
+        help='Tek model çağrısındaki maksimum görüntü sayısı'
+    )
+    
+    parser.add_argument(
+        '--max-wait-ms',
+        type=float,
+        default=10.0,
+        help='Batch doldurmak için beklenecek gecikme penceresi (ms)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='Sonuç önbelleği klasörü'
+    )
+    
+    args = parser.parse_args()
+    
+    analyzer = PhaseAnalyzer(model_path=args.model, confidence_threshold=args.conf,
+                             backend=args.backend, cache_dir=args.cache_dir)
+    # İlk isteğin model yükleme maliyetini ödememesi için model ısıtılır
+    print(f"Model ısıtıldı: {analyzer.warmup(args.max_batch_size):.2f} s")
+    
+    service = InferenceService(analyzer, host=args.host, port=args.port,
+                               max_batch_size=args.max_batch_size,
+                               max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServis durduruldu.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,231 @@
 """
 Metalik Malzeme Faz Analizi - Ana Analiz Modülü
 
-Bu modül YOLO modelini kullanarak metalik malzeme görüntülerinden
-faz analizi yapmak için gerekli fonksiyonları içerir.
+Bu modül YOLO modelini (veya backend='unet' ile U-Net segmentasyon
+modelini) kullanarak metalik malzeme görüntülerinden faz analizi yapmak
+için gerekli fonksiyonları içerir.
 """
 
 import os
-import cv2
+import json
+import itertools
+import queue
+import threading
+import time
+import multiprocessing
+from collections import deque
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from ultralytics import YOLO
-import matplotlib.pyplot as plt
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from datetime import datetime
 
+# cv2, ultralytics, matplotlib ve çıkarım backend'leri ilk kullanıldıkları
+# yerde import edilir; böylece modülün yüklenmesi (ör. yalnızca rapor
+# üretmek için) ağır bağımlılıkları beklemez.
+from batch_summary import BatchSummaryWriter
+from cascade_screen import CascadeScreen
+from detections import Detections
+from image_discovery import iter_image_files
+from phase_area import phase_area_statistics
+from preprocessing import PreprocessCache, Preprocessor
+from result_cache import ResultCache, file_digest, make_cache_key
+from run_manifest import RunManifest
+from stage_metrics import StageMetrics, add_timing
+from tiled_inference import ImageSource, compute_tiles, iter_tile_batches, merge_tile_detections
+from tta import apply_transform, invert_boxes, resolve_transforms, weighted_box_fusion
+from watch_folder import FolderWatcher
+
+
+# Döşemeli analizde tile_size verilmezse kullanılan döşeme boyutu (eğitim imgsz'i)
+DEFAULT_TILE_SIZE = 640
+
+# Bu backend ile model kutu yerine piksel maskesi üretir (bkz. segmentation modülü)
+SEGMENTATION_BACKEND = 'unet'
+
+# Faz renkleri (RGB); kutular ve maske katmanı aynı paleti kullanır
+PHASE_COLORS = {
+    'Ferrit': (255, 0, 0),      # Kırmızı
+    'Perlit': (0, 255, 0),      # Yeşil
+    'Austenit': (0, 0, 255),    # Mavi
+    'Martenzit': (255, 255, 0), # Sarı
+    'Bainit': (255, 0, 255)     # Magenta
+}
+
+_MODEL_REGISTRY: Dict[Tuple, object] = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+
+
+def get_shared_model(model_path: str, backend: str = 'ultralytics',
+                     backend_options: Optional[Dict] = None):
+    """
+    Modeli süreç genelindeki kayıttan döndürür, yoksa yükleyip kaydeder
+    
+    Aynı model dosyası, backend ve ayarlarla oluşturulan PhaseAnalyzer
+    nesneleri ağırlıkları paylaşır. Dosya değişirse (değiştirilme zamanı)
+    model yeniden yüklenir. Paylaşılan model aynı anda birden fazla
+    thread'den çağrılmamalıdır.
+    """
+    backend_options = backend_options or {}
+    mtime = os.path.getmtime(model_path) if os.path.exists(model_path) else None
+    key = (backend, os.path.abspath(model_path), mtime,
+           json.dumps(backend_options, sort_keys=True, default=str))
+    
+    with _MODEL_REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(key)
+        if model is None:
+            if backend == 'ultralytics':
+                from ultralytics import YOLO
+                model = YOLO(model_path)
+            elif backend == SEGMENTATION_BACKEND:
+                from segmentation import load_segmentation_model
+                model = load_segmentation_model(model_path, **backend_options)
+            else:
+                from inference_backends import create_backend
+                model = create_backend(backend, model_path, **backend_options)
+            _MODEL_REGISTRY[key] = model
+    return model
+
+
+def clear_model_registry():
+    """Süreç genelindeki model kaydını boşaltır"""
+    with _MODEL_REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
 
 class PhaseAnalyzer:
     """Metalik malzeme faz analizi için ana sınıf"""
     
     def __init__(self, model_path: str = 'models/yolov8_phase_detection.pt', 
-                 confidence_threshold: float = 0.5):
+                 confidence_threshold: float = 0.5,
+                 tile_size: Optional[int] = None,
+                 tile_overlap: float = 0.2,
+                 tile_batch_size: int = 8,
+                 tile_iou_threshold: float = 0.5,
+                 backend: str = 'ultralytics',
+                 backend_options: Optional[Dict] = None,
+                 cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 1 << 30,
+                 area_precedence: Optional[List[str]] = None,
+                 collect_metrics: bool = False,
+                 profile_every: int = 0,
+                 profiler: str = 'cprofile',
+                 profile_dir: Optional[str] = None,
+                 cascade: Optional[CascadeScreen] = None,
+                 tta: Optional[Union[str, List[str]]] = None,
+                 tta_iou_threshold: float = 0.55,
+                 preprocessor: Optional[Union[Preprocessor, str, Dict]] = None,
+                 preprocess_cache_max_bytes: int = 0):
         """
         PhaseAnalyzer sınıfını başlatır
         
         Args:
             model_path: Eğitilmiş YOLO model dosyasının yolu
             confidence_threshold: Tespit için minimum güven eşiği
+            tile_size: Verilirse bu boyuttan büyük görüntüler örtüşen
+                döşemelere bölünerek tam çözünürlükte analiz edilir
+            tile_overlap: Komşu döşemeler arasındaki örtüşme oranı
+            tile_batch_size: Tek bir model çağrısında işlenecek döşeme sayısı
+            tile_iou_threshold: Döşeme sınırlarındaki tekrarlanan tespitleri
+                birleştiren NMS için IoU eşiği
+            backend: Çıkarım backend'i ('ultralytics', 'onnxruntime',
+                'openvino' veya 'unet'). ONNX Runtime ve OpenVINO, export_model
+                ile dışa aktarılmış modelleri CPU üzerinde çalıştırır. 'unet'
+                ile model_path bir U-Net checkpoint'i (veya dışa aktarılmış .ts
+                dosyası) olur; görüntüler her zaman tam çözünürlükte döşemeli
+                segmente edilir, sonuca uint8 indeks maskesi 'mask' anahtarıyla
+                eklenir ve faz oranları piksel sayılarından hesaplanır.
+                batch_analyze maskeleri output_dir/masks/ altına PNG olarak
+                yazar; döndürdüğü sonuçlarda 'mask' yerine 'mask_path' bulunur
+            backend_options: Backend'e iletilecek ek parametreler
+                (ör. {'num_threads': 4, 'imgsz': 640}; 'unet' için
+                segmentation.load_segmentation_model parametreleri, ör.
+                {'variant': 'quantized', 'calibration_dir': ...})
+            cache_dir: Verilirse analiz sonuçları bu klasörde içerik adresli
+                olarak önbelleğe alınır; aynı görüntü, model ve ayarlarla
+                tekrar analizde model çalıştırılmaz
+            cache_max_bytes: Önbelleğin maksimum boyutu (LRU ile tahliye edilir)
+            area_precedence: Faz alan oranları hesaplanırken farklı fazların
+                örtüşen kutularındaki piksellerin atanacağı faz öncelik sırası
+                (yüksekten düşüğe). Verilmezse sınıf indeksi sırası kullanılır
+            collect_metrics: True ise her görüntü için aşama süreleri (okuma,
+                ön işleme, çıkarım, NMS, son işleme, çizim, yazma) sonuca
+                'timings' anahtarıyla eklenir ve self.metrics histogramlarında
+                toplanır. batch_analyze bunları output_dir'e metrics.prom ve
+                metrics.json olarak yazar
+            profile_every: 0'dan büyükse her profile_every model çağrısından
+                biri profiler ile çalıştırılır
+            profiler: 'cprofile' veya 'pyinstrument'
+            profile_dir: Profil dosyalarının klasörü (batch_analyze'da
+                varsayılan output_dir/profiles)
+            cascade: Verilirse görüntüler önce ucuz bir ön taramadan geçer;
+                boş, odak dışı veya (low_res_size verilmişse) küçük
+                çözünürlükte hiç tespit üretmeyen görüntüler tam analize
+                girmez ve sonuçlarına eleme gerekçesi 'screen' anahtarıyla
+                yazılır (bkz. cascade_screen.CascadeScreen)
+            tta: Verilirse test-time augmentation açılır: her görüntünün (veya
+                döşemenin) yansıtılmış/döndürülmüş kopyaları aynı batch'te
+                modele verilir ve tespitler Weighted Box Fusion ile
+                birleştirilir. Hazır ayar ('flips', 'rotations', 'dihedral')
+                veya dönüşüm listesi (ör. ['identity', 'hflip', 'rot90']).
+                Çıkarım süresi kopya sayısıyla yaklaşık doğrusal artar
+                (bkz. tta modülü)
+            tta_iou_threshold: Kopyaların kutularının birleştirileceği IoU eşiği
+            preprocessor: Verilirse görüntüler okunduktan hemen sonra, okuma
+                thread'inde ön işlenir (gürültü azaltma, CLAHE,
+                normalizasyon). Preprocessor nesnesi, hazır ayar adı
+                ('methodology', 'clahe'), JSON dosyası (ör. eğitimde yazılan
+                preprocessing.json) veya ayar sözlüğü. Sonuç görselleri ve
+                cascade ön taraması ön işlenmiş görüntüyü kullanır
+            preprocess_cache_max_bytes: 0'dan büyükse ön işlenmiş görüntüler
+                cache_dir/preprocessed altında bu boyuta kadar saklanır
         """
+        if preprocess_cache_max_bytes > 0 and not cache_dir:
+            raise ValueError("Ön işleme önbelleği için cache_dir verilmeli")
+        if backend == SEGMENTATION_BACKEND:
+            if tta:
+                raise ValueError("TTA yalnızca tespit backend'lerinde desteklenir")
+            if cascade is not None and cascade.low_res_size:
+                raise ValueError("Düşük çözünürlüklü ön tarama yalnızca tespit "
+                                 "backend'lerinde desteklenir")
+        elif backend != 'ultralytics':
+            from inference_backends import BACKENDS
+            if backend not in BACKENDS:
+                raise ValueError(f"Bilinmeyen backend: {backend}")
+            if cascade is not None and cascade.low_res_size:
+                raise ValueError("Düşük çözünürlüklü ön tarama yalnızca ultralytics "
+                                 "backend'inde desteklenir (dışa aktarılan modellerin "
+                                 "girdi boyutu sabittir)")
+        
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_batch_size = tile_batch_size
+        self.tile_iou_threshold = tile_iou_threshold
+        self.backend = backend
+        self.backend_options = dict(backend_options or {})
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.result_cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.area_precedence = list(area_precedence) if area_precedence else None
+        self.metrics = StageMetrics(collect_metrics, profile_every=profile_every,
+                                    profiler=profiler, profile_dir=profile_dir)
+        self.cascade = cascade
+        self.tta = resolve_transforms(tta) if tta else None
+        self.tta_iou_threshold = tta_iou_threshold
+        if preprocessor is not None and not isinstance(preprocessor, Preprocessor):
+            preprocessor = Preprocessor.from_config(preprocessor)
+        self.preprocessor = preprocessor if preprocessor is not None and preprocessor.enabled else None
+        self.preprocess_cache_max_bytes = preprocess_cache_max_bytes
+        self.preprocess_cache = (
+            PreprocessCache(os.path.join(cache_dir, 'preprocessed'), preprocess_cache_max_bytes)
+            if self.preprocessor is not None and preprocess_cache_max_bytes > 0 else None
+        )
+        self._model_digest = None
+        self._manifest: Optional[RunManifest] = None
+        # Verilirse sonuç görselleri images/ altında bu klasöre göre alt klasörlere yazılır
+        self._input_root: Optional[str] = None
         self.model = None
         self.phase_names = {
             0: 'Ferrit',
@@ -38,74 +235,522 @@ class PhaseAnalyzer:
             4: 'Bainit'
         }
         
-        if os.path.exists(model_path):
-            self.load_model()
-        else:
+        # Model ilk çıkarımda (veya warmup() ile) yüklenir
+        if not os.path.exists(model_path):
             print(f"Model dosyası bulunamadı: {model_path}")
             print("Model eğitimi için aşağıdaki komutu çalıştırın:")
             print("  python train_model.py --data data/annotations/ --epochs 100")
     
     def load_model(self):
-        """YOLO modelini yükler"""
+        """YOLO modelini seçili backend ile yükler (süreç içinde paylaşılır)"""
         try:
-            self.model = YOLO(self.model_path)
+            self.model = get_shared_model(self.model_path, self.backend, self.backend_options)
             print(f"Model başarıyla yüklendi: {self.model_path}")
         except Exception as e:
             print(f"Model yükleme hatası: {e}")
             raise
     
-    def analyze_image(self, image_path: str) -> Dict:
+    def analyze_image(self, image_path: str, keep_image: bool = False) -> Dict:
         """
         Tek bir görüntüyü analiz eder
         
         Args:
             image_path: Analiz edilecek görüntünün yolu
-            
+            keep_image: True ise okunmuş BGR görüntü sonuçta 'image' anahtarıyla
+                saklanır; visualize_results() görüntüyü diskten tekrar okumaz
+        
         Returns:
             Dict: Analiz sonuçlarını içeren dictionary
         """
+        return self.analyze_images([image_path], keep_image=keep_image)[0]
+    
+    def analyze_images(self, image_paths: List[str], keep_image: bool = False) -> List[Dict]:
+        """
+        Birden fazla görüntüyü tek bir model çağrısında analiz eder
+        
+        Görüntüler tek bir mini-batch olarak YOLO modeline verilir; böylece
+        ön işleme ve son işleme kurulumu her görüntü için tekrarlanmaz.
+        
+        Args:
+            image_paths: Analiz edilecek görüntülerin yolları
+            keep_image: True ise okunmuş görüntüler sonuçlarda saklanır
+        
+        Returns:
+            List[Dict]: Her görüntü için analyze_image() ile aynı formatta sonuç
+        """
+        # Önbellekte bulunan görüntüler model için okunmaz; model yalnızca
+        # önbellekte bulunmayan bir görüntü varsa yüklenir (_analyze_decoded)
+        lookups = []
+        images = []
+        for image_path in image_paths:
+            self.metrics.begin(image_path)
+            lookups.append(self._lookup_cache(image_path))
+            images.append(self._read_image(image_path)
+                          if keep_image or lookups[-1][1] is None else None)
+        all_results = self._analyze_with_cache(image_paths, images, lookups)
+        
+        for image_path, results in zip(image_paths, all_results):
+            self.metrics.finish(image_path, len(results['detections']))
+        
+        if keep_image:
+            for results, image in zip(all_results, images):
+                results['image'] = image
+        return all_results
+    
+    def analyze_tiled(self, source, image_path: Optional[str] = None) -> Dict:
+        """
+        Büyük bir görüntüyü örtüşen döşemeler halinde analiz eder
+        
+        Döşemeler tile_batch_size'lık gruplar halinde modele verilir, kutular
+        global koordinatlara taşınır ve döşeme sınırlarındaki tekrarlar NMS
+        ile birleştirilir. Kaynak döşeme döşeme okunduğundan .npy ve
+        sıkıştırılmamış TIFF dosyaları bellek eşlemeli olarak işlenir. Ön
+        işleme de döşeme bazında uygulanır (normalizasyon aralığı her
+        döşemenin kendi histogramından hesaplanır).
+        
+        Args:
+            source: Görüntü yolu, numpy dizisi / np.memmap, dilimlenebilir
+                dizi benzeri bir nesne veya ImageSource
+            image_path: Sonuçlara yazılacak görüntü yolu (source bir yol ise
+                otomatik olarak kullanılır)
+        
+        Returns:
+            Dict: analyze_image() ile aynı formatta analiz sonucu
+        """
+        self._ensure_model()
+        
+        if isinstance(source, (str, Path)):
+            image_path = image_path or str(source)
+            source = ImageSource.open(str(source))
+        elif not isinstance(source, ImageSource):
+            source = ImageSource(source)
+        if self.preprocessor is not None and source.transform is None:
+            source = ImageSource(source.array, source.channel_order, self.preprocessor.apply)
+        
+        if self.backend == SEGMENTATION_BACKEND:
+            return self._segment(image_path, source)
+        detections = self._predict_tiled(source)
+        return self._build_result(image_path, source.shape, detections)
+    
+    def warmup(self, batch_size: int = 1, image_size: Optional[int] = None) -> float:
+        """
+        Modeli yükleyip sahte bir batch ile ısıtır
+        
+        İlk çıkarımdaki tek seferlik maliyetler (model yükleme, ağırlıkların
+        taşınması, backend'in ilk çalıştırması) gerçek isteklerden önce ödenir.
+        
+        Args:
+            batch_size: Sahte batch'teki görüntü sayısı
+            image_size: Sahte görüntülerin kenar uzunluğu (varsayılan tile_size veya 640)
+        
+        Returns:
+            float: Isıtmanın saniye cinsinden süresi
+        """
+        started = time.perf_counter()
+        self._ensure_model()
+        size = image_size or self.tile_size or DEFAULT_TILE_SIZE
+        images = [np.zeros((size, size, 3), dtype=np.uint8)] * batch_size
+        if self.backend == SEGMENTATION_BACKEND:
+            self.model.predict_logits(images)
+        else:
+            self._predict(images)
+        return time.perf_counter() - started
+    
+    def _ensure_model(self):
+        """Model henüz yüklenmemişse yükler"""
         if self.model is None:
-            raise ValueError("Model yüklenmemiş. Önce load_model() çağrılmalı.")
+            if not os.path.exists(self.model_path):
+                raise ValueError("Model yüklenmemiş. Önce load_model() çağrılmalı.")
+            self.load_model()
+    
+    def _read_image(self, image_path: str) -> np.ndarray:
+        """Görüntüyü diskten okur ve varsa ön işlemeyi uygular"""
+        import cv2
+        cache_key = None
+        if self.preprocess_cache is not None:
+            with self.metrics.stage(image_path, 'preprocess_cache'):
+                cache_key = self.preprocess_cache.key(image_path, self.preprocessor.settings())
+                image = self.preprocess_cache.get(cache_key)
+            if image is not None:
+                self.metrics.increment('preprocess_cache_hits')
+                return image
         
-        # Görüntüyü oku
-        image = cv2.imread(image_path)
+        with self.metrics.stage(image_path, 'decode'):
+            image = cv2.imread(image_path)
         if image is None:
             raise ValueError(f"Görüntü okunamadı: {image_path}")
+        image = self._enhance(image_path, image)
+        if cache_key is not None:
+            self.preprocess_cache.put(cache_key, image)
+        return image
+    
+    def _enhance(self, image_path: str, image: np.ndarray) -> np.ndarray:
+        """Yeni okunmuş görüntüye ön işlemeyi yerinde uygular"""
+        if self.preprocessor is None:
+            return image
+        with self.metrics.stage(image_path, 'enhance'):
+            return self.preprocessor.apply(image, inplace=True)
+    
+    def _analyze_decoded(self, image_paths: List[str],
+                         images: List[np.ndarray]) -> List[Dict]:
+        """Okunmuş görüntüleri tek bir YOLO çağrısında analiz eder"""
+        if not images:
+            return []
+        
+        self._ensure_model()
+        
+        detections = [None] * len(images)
+        timings = [self.metrics.timings(image_path) for image_path in image_paths]
+        
+        # Ön taramada elenen görüntüler tam çözünürlükte analiz edilmez
+        screens = [None] * len(images)
+        regions = [None] * len(images)
+        if self.cascade is not None:
+            screens, regions = self._screen_images(image_paths, images, timings)
+            for i, screen in enumerate(screens):
+                if not screen['passed']:
+                    detections[i] = self._detections_from_arrays(*_empty_arrays())
+        
+        if self.backend == SEGMENTATION_BACKEND:
+            return self._segment_decoded(image_paths, images, detections, screens)
+        
+        # YOLO ile tahmin yap (liste halinde verilen görüntüler tek batch'te işlenir)
+        direct = [i for i, image in enumerate(images)
+                  if detections[i] is None and not self._needs_tiling(image.shape)]
+        if direct:
+            predictions = self._predict_augmented([images[i] for i in direct],
+                                                  [timings[i] for i in direct])
+            for i, arrays in zip(direct, predictions):
+                with self.metrics.stage(image_paths[i], 'process_results'):
+                    detections[i] = self._detections_from_arrays(*arrays)
+        
+        # tile_size'dan büyük görüntüler döşemeli olarak işlenir
+        for i, image in enumerate(images):
+            if detections[i] is None:
+                detections[i] = self._predict_tiled(ImageSource(image), timings[i], regions[i])
+        
+        all_results = [self._build_result(image_path, image.shape, image_detections)
+                       for image_path, image, image_detections
+                       in zip(image_paths, images, detections)]
+        for results, screen in zip(all_results, screens):
+            if screen is not None:
+                results['screen'] = screen
+        return all_results
+    
+    def _segment_decoded(self, image_paths: List[str], images: List[np.ndarray],
+                         detections: List[Optional[Detections]],
+                         screens: List[Optional[Dict]]) -> List[Dict]:
+        """Ön taramayı geçen görüntüleri segmente eder; elenenler boş sonuç alır"""
+        all_results = []
+        for image_path, image, image_detections, screen in zip(image_paths, images,
+                                                               detections, screens):
+            if image_detections is not None:
+                results = self._build_result(image_path, image.shape, image_detections)
+            else:
+                results = self._segment(image_path, ImageSource(image))
+            if screen is not None:
+                results['screen'] = screen
+            all_results.append(results)
+        return all_results
+    
+    def _segment(self, image_path: Optional[str], source: ImageSource) -> Dict:
+        """
+        Kaynağı tam çözünürlükte döşemeli segmente edip sonuç oluşturur
+        
+        Sonuç tespit yolundakiyle aynı anahtarları taşır (tespit listesi
+        boştur); phase_statistics maskenin histogramından hesaplanır.
+        """
+        from segmentation import DEFAULT_SEGMENTATION_TILE_SIZE, mask_statistics, segment_image
+        
+        self.metrics.increment('model_calls')
+        timings = self.metrics.timings(image_path)
+        mask, histogram = segment_image(self.model, source,
+                                        self.tile_size or DEFAULT_SEGMENTATION_TILE_SIZE,
+                                        self.tile_overlap, self.tile_batch_size, timings)
+        
+        results = self._build_result(image_path, source.shape,
+                                     self._detections_from_arrays(*_empty_arrays()))
+        with self.metrics.stage(image_path, 'statistics'):
+            results['phase_statistics'] = mask_statistics(histogram, source.shape,
+                                                          self.phase_names)
+        results['mask'] = mask
+        return results
+    
+    def _screen_images(self, image_paths: List[str], images: List[np.ndarray],
+                       timings: List[Optional[Dict[str, float]]]
+                       ) -> Tuple[List[Dict], List[Optional[np.ndarray]]]:
+        """
+        Görüntüleri cascade ön taramasından geçirir
         
-        # YOLO ile tahmin yap
-        results = self.model(image, conf=self.confidence_threshold)
+        Returns:
+            Tuple: Görüntü başına tarama sonucu ve (candidate_regions açıksa)
+                tam çözünürlükte işlenecek aday kutular
+        """
+        screens = []
+        for image_path, image in zip(image_paths, images):
+            with self.metrics.stage(image_path, 'screen'):
+                screens.append(self.cascade.screen_statistics(image))
+        
+        # İstatistik aşamasını geçen görüntüler küçük imgsz ile tek batch'te taranır
+        regions = [None] * len(images)
+        passed = [i for i, screen in enumerate(screens) if screen['passed']]
+        if self.cascade.low_res_size and passed:
+            started = time.perf_counter()
+            predictions = self._predict([images[i] for i in passed],
+                                        conf=self.cascade.low_res_confidence,
+                                        imgsz=self.cascade.low_res_size)
+            elapsed = (time.perf_counter() - started) / len(passed)
+            for i, (boxes, _, _) in zip(passed, predictions):
+                add_timing(timings[i], 'screen', elapsed)
+                screens[i] = self.cascade.screen_low_res(screens[i], boxes)
+                if self.cascade.candidate_regions:
+                    regions[i] = boxes
+        
+        for screen in screens:
+            if not screen['passed']:
+                self.metrics.increment(f"screen_rejected_{screen['stage']}")
+        return screens, regions
+    
+    def _analyze_with_cache(self, image_paths: List[str], images: List[Optional[np.ndarray]],
+                            lookups: List[Tuple[Optional[str], Optional[Dict]]]) -> List[Dict]:
+        """Önbellekte bulunmayan görüntüleri analiz edip sonuçlarını önbelleğe yazar"""
+        all_results = [cached for _, cached in lookups]
+        misses = [i for i, cached in enumerate(all_results) if cached is None]
+        
+        # Örneklenen model çağrıları profiler ile çalıştırılır (profile_every)
+        with self.metrics.profile(image_paths[misses[0]] if misses else 'cache'):
+            fresh_results = self._analyze_decoded([image_paths[i] for i in misses],
+                                                  [images[i] for i in misses])
+        for i, results in zip(misses, fresh_results):
+            all_results[i] = results
+            key = lookups[i][0]
+            if key is not None:
+                entry = {
+                    'image_shape': results['image_shape'],
+                    'detections': results['detections'],
+                    'phase_statistics': results['phase_statistics']
+                }
+                if 'screen' in results:
+                    entry['screen'] = results['screen']
+                if 'mask' in results:
+                    entry['mask_png'] = _encode_mask(results['mask'])
+                self.result_cache.put(key, entry)
+        
+        return all_results
+    
+    def _lookup_cache(self, image_path: str,
+                      image_digest: Optional[str] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Görüntünün önbellek anahtarını ve varsa önbellekteki sonucunu döndürür
         
-        # Sonuçları işle
-        detections = self._process_results(results[0], image.shape)
+        image_digest verilirse (ör. HTTP ile yüklenen görüntüler) dosya
+        okunmadan bu özet kullanılır. Önbellek kapalıysa (None, None) döndürür.
+        """
+        if self.result_cache is None:
+            return None, None
         
+        if self._model_digest is None:
+            self._model_digest = (file_digest(self.model_path)
+                                  if os.path.isfile(self.model_path) else self.model_path)
+        with self.metrics.stage(image_path, 'cache_lookup'):
+            key = make_cache_key(image_digest or file_digest(image_path), self._model_digest,
+                                 self.confidence_threshold, self._preprocessing_settings())
+            entry = self.result_cache.get(key)
+        if entry is None:
+            return key, None
+        
+        self.metrics.increment('cache_hits')
+        results = self._build_result(image_path, tuple(entry['image_shape']),
+                                     Detections.from_records(entry['detections'],
+                                                             self.phase_names))
+        results['phase_statistics'] = entry['phase_statistics']
+        if 'screen' in entry:
+            results['screen'] = entry['screen']
+        if 'mask_png' in entry:
+            results['mask'] = _decode_mask(entry['mask_png'])
+        return key, results
+    
+    def _preprocessing_settings(self) -> Dict:
+        """Sonuçları etkileyen ön işleme ve çıkarım ayarları (önbellek anahtarı için)"""
         return {
+            'tile_size': self.tile_size,
+            'tile_overlap': self.tile_overlap,
+            'tile_iou_threshold': self.tile_iou_threshold,
+            'backend': self.backend,
+            'backend_options': {key: value for key, value in self.backend_options.items()
+                                if key != 'num_threads'},
+            'area_precedence': self.area_precedence,
+            'cascade': self.cascade.settings() if self.cascade is not None else None,
+            'tta': list(self.tta) if self.tta else None,
+            'tta_iou_threshold': self.tta_iou_threshold if self.tta else None,
+            'preprocessing': self.preprocessor.settings() if self.preprocessor is not None else None
+        }
+    
+    def _predict(self, images: List[np.ndarray],
+                 timings: Optional[List[Optional[Dict[str, float]]]] = None,
+                 conf: Optional[float] = None, imgsz: Optional[int] = None
+                 ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Görüntüleri tek bir çağrıda modelden geçirip ham tespit dizilerini döndürür
+        
+        timings verilirse backend'in görüntü başına ön işleme, çıkarım ve
+        NMS süreleri ilgili görüntünün süre sözlüğüne eklenir. conf ve imgsz
+        verilirse (ör. cascade ön taraması) varsayılanların yerine kullanılır;
+        imgsz yalnızca ultralytics backend'inde desteklenir.
+        """
+        self.metrics.increment('model_calls')
+        conf = self.confidence_threshold if conf is None else conf
+        if self.backend == 'ultralytics':
+            if imgsz is not None:
+                results = self.model(images, conf=conf, imgsz=imgsz)
+            else:
+                results = self.model(images, conf=conf)
+            speeds = [result.speed for result in results]
+            arrays = [self._result_arrays(result) for result in results]
+        else:
+            arrays = self.model.predict(images, conf)
+            speeds = [self.model.speed] * len(images)
+        
+        for image_timings, speed in zip(timings or [], speeds):
+            # Backend süreleri milisaniye cinsindendir
+            add_timing(image_timings, 'preprocess', (speed.get('preprocess') or 0.0) / 1000.0)
+            add_timing(image_timings, 'inference', (speed.get('inference') or 0.0) / 1000.0)
+            add_timing(image_timings, 'nms', (speed.get('postprocess') or 0.0) / 1000.0)
+        return arrays
+    
+    def _predict_augmented(self, images: List[np.ndarray],
+                           timings: Optional[List[Optional[Dict[str, float]]]] = None
+                           ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        TTA açıksa görüntülerin dönüşümlü kopyalarını tek çağrıda modelden
+        geçirip her görüntünün tespitlerini WBF ile birleştirir
+        
+        TTA kapalıysa _predict ile aynıdır. Kopyaların oluşturulması ve
+        birleştirilmesi 'tta' aşamasının süresine eklenir.
+        """
+        if self.tta is None:
+            return self._predict(images, timings)
+        
+        timings = timings or [None] * len(images)
+        num_views = len(self.tta)
+        started = time.perf_counter()
+        views = [apply_transform(image, name) for image in images for name in self.tta]
+        per_image = (time.perf_counter() - started) / max(len(images), 1)
+        for image_timings in timings:
+            add_timing(image_timings, 'tta', per_image)
+        
+        view_timings = [image_timings for image_timings in timings for _ in self.tta]
+        
+        # 90° döndürülmüş kopyalar dikdörtgen görüntülerde farklı boyutludur; tek
+        # çağrıda karışırlarsa hepsi kare girdiye tamamlanır. Bu yüzden kopyalar
+        # boyutlarına göre en fazla iki çağrıda işlenir
+        predictions = [None] * len(views)
+        groups: Dict[Tuple, List[int]] = {}
+        for view_index, view in enumerate(views):
+            groups.setdefault(view.shape, []).append(view_index)
+        for indices in groups.values():
+            group_predictions = self._predict([views[i] for i in indices],
+                                              [view_timings[i] for i in indices])
+            for i, arrays in zip(indices, group_predictions):
+                predictions[i] = arrays
+        
+        fused = []
+        for index, image in enumerate(images):
+            started = time.perf_counter()
+            image_predictions = predictions[index * num_views:(index + 1) * num_views]
+            boxes = np.concatenate([invert_boxes(view_boxes, name, image.shape)
+                                    for (view_boxes, _, _), name
+                                    in zip(image_predictions, self.tta)])
+            confidences = np.concatenate([view[1] for view in image_predictions])
+            class_ids = np.concatenate([view[2] for view in image_predictions])
+            boxes, confidences, class_ids = weighted_box_fusion(
+                boxes, confidences, class_ids, num_views, self.tta_iou_threshold)
+            # Kopyaların çoğunda görülmeyen tespitlerin düşen skoru eşikle tekrar süzülür
+            keep = confidences >= self.confidence_threshold
+            fused.append((boxes[keep], confidences[keep], class_ids[keep]))
+            add_timing(timings[index], 'tta', time.perf_counter() - started)
+        return fused
+    
+    def _needs_tiling(self, image_shape: Tuple) -> bool:
+        """Görüntünün döşemeli analiz gerektirip gerektirmediğini belirler"""
+        return (self.tile_size is not None and
+                (image_shape[0] > self.tile_size or image_shape[1] > self.tile_size))
+    
+    def _predict_tiled(self, source: ImageSource,
+                       timings: Optional[Dict[str, float]] = None,
+                       regions: Optional[np.ndarray] = None) -> Detections:
+        """
+        Kaynağı döşemeler halinde modele verip birleştirilmiş tespitleri döndürür
+        
+        regions verilirse (cascade aday bölgeleri) yalnızca bu kutulara denk
+        gelen döşemeler modele verilir.
+        """
+        height, width = source.shape[:2]
+        tile_size = self.tile_size or DEFAULT_TILE_SIZE
+        tiles = compute_tiles(height, width, tile_size, self.tile_overlap)
+        if regions is not None:
+            candidate_tiles = self.cascade.candidate_tiles(tiles, regions)
+            self.metrics.increment('screen_skipped_tiles', len(tiles) - len(candidate_tiles))
+            tiles = candidate_tiles
+        
+        tile_detections = []
+        for batch_tiles, batch_images in iter_tile_batches(source, tiles, self.tile_batch_size):
+            predictions = self._predict_augmented(batch_images, [timings] * len(batch_images))
+            for tile, arrays in zip(batch_tiles, predictions):
+                tile_detections.append((tile, *arrays))
+        
+        # Döşeme sınırlarındaki tekrarların birleştirilmesi NMS süresine eklenir
+        started = time.perf_counter()
+        boxes, confidences, class_ids = merge_tile_detections(
+            tile_detections, self.tile_iou_threshold, (height, width)
+        )
+        add_timing(timings, 'nms', time.perf_counter() - started)
+        return self._detections_from_arrays(boxes, confidences, class_ids)
+    
+    def _build_result(self, image_path: str, image_shape: Tuple,
+                      detections: List[Dict]) -> Dict:
+        """Tek bir görüntünün tespitlerinden sonuç dictionary'si oluşturur"""
+        with self.metrics.stage(image_path, 'statistics'):
+            stats = self._calculate_statistics(detections)
+        with self.metrics.stage(image_path, 'area_fractions'):
+            stats.update(self._calculate_area_fractions(detections, image_shape))
+        results = {
             'image_path': image_path,
-            'image_shape': image.shape,
+            'image_shape': image_shape,
             'detections': detections,
-            'phase_statistics': self._calculate_statistics(detections),
+            'phase_statistics': stats,
             'timestamp': datetime.now().isoformat()
         }
+        
+        # Süre sözlüğü canlıdır: çizim ve yazma süreleri de sonradan eklenir
+        timings = self.metrics.timings(image_path)
+        if timings is not None:
+            results['timings'] = timings
+        return results
     
-    def _process_results(self, result, image_shape: Tuple) -> List[Dict]:
+    def _process_results(self, result, image_shape: Tuple) -> Detections:
         """YOLO sonuçlarını işler"""
-        detections = []
+        return self._detections_from_arrays(*self._result_arrays(result))
+    
+    def _result_arrays(self, result) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """YOLO sonucundan kutu, güven ve sınıf dizilerini çıkarır"""
+        if result.boxes is None:
+            return _empty_arrays()
         
-        if result.boxes is not None:
-            boxes = result.boxes.xyxy.cpu().numpy()
-            confidences = result.boxes.conf.cpu().numpy()
-            class_ids = result.boxes.cls.cpu().numpy().astype(int)
-            
-            for box, conf, cls_id in zip(boxes, confidences, class_ids):
-                detection = {
-                    'bbox': box.tolist(),
-                    'confidence': float(conf),
-                    'class_id': int(cls_id),
-                    'class_name': self.phase_names.get(cls_id, 'Unknown'),
-                    'area': self._calculate_box_area(box)
-                }
-                detections.append(detection)
+        boxes = result.boxes.xyxy.cpu().numpy()
+        confidences = result.boxes.conf.cpu().numpy()
+        class_ids = result.boxes.cls.cpu().numpy().astype(int)
+        return boxes, confidences, class_ids
+    
+    def _detections_from_arrays(self, boxes: np.ndarray, confidences: np.ndarray,
+                                class_ids: np.ndarray) -> Detections:
+        """
+        Kutu, güven ve sınıf dizilerini sütunlu Detections nesnesine dönüştürür
         
-        return detections
+        Detections, eski dictionary listesi gibi gezilebilir; liste görünümü
+        yalnızca erişildiğinde oluşturulur.
+        """
+        return Detections(boxes, confidences, class_ids, self.phase_names)
     
     def _calculate_box_area(self, box: np.ndarray) -> float:
         """Bounding box alanını hesaplar"""
@@ -114,6 +759,10 @@ class PhaseAnalyzer:
     
     def _calculate_statistics(self, detections: List[Dict]) -> Dict:
         """Tespit edilen fazların istatistiklerini hesaplar"""
+        # Sütunlu tespitler için vektörel yol
+        if isinstance(detections, Detections):
+            return detections.statistics()
+        
         stats = {
             'total_detections': len(detections),
             'phase_counts': {},
@@ -142,8 +791,21 @@ class PhaseAnalyzer:
         
         return stats
     
+    def _calculate_area_fractions(self, detections: List[Dict], image_shape: Tuple) -> Dict:
+        """
+        Fazların örtüşmesiz piksel alanlarını ve görüntüdeki alan oranlarını hesaplar
+        
+        phase_areas ham kutu alanlarının toplamıdır ve örtüşen kutuları
+        birden fazla sayar; phase_area_fractions ise her pikseli en fazla
+        bir faza atar, bu nedenle oranların toplamı 1'i geçmez.
+        """
+        if not isinstance(detections, Detections):
+            detections = Detections.from_records(detections, self.phase_names)
+        return phase_area_statistics(detections.boxes, detections.class_ids, image_shape,
+                                     self.phase_names, self.area_precedence)
+    
     def visualize_results(self, results: Dict, save_path: Optional[str] = None,
-                         show: bool = True) -> None:
+                         show: bool = True, image: Optional[np.ndarray] = None) -> None:
         """
         Analiz sonuçlarını görselleştirir
         
@@ -151,45 +813,28 @@ class PhaseAnalyzer:
             results: analyze_image() çıktısı
             save_path: Görüntünün kaydedileceği yol
             show: Görüntüyü göster
+            image: Önceden okunmuş BGR görüntü. Verilirse diskten tekrar
+                okunmaz ve kutular doğrudan bu buffer'ın üzerine çizilir
         """
-        # Görüntüyü oku
-        image = cv2.imread(results['image_path'])
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Renk paleti
-        colors = {
-            'Ferrit': (255, 0, 0),      # Kırmızı
-            'Perlit': (0, 255, 0),      # Yeşil
-            'Austenit': (0, 0, 255),    # Mavi
-            'Martenzit': (255, 255, 0), # Sarı
-            'Bainit': (255, 0, 255)     # Magenta
-        }
+        # Görüntüyü al: devredilen buffer, sonuçta saklanan kopya veya disk
+        if image is None:
+            if results.get('image') is not None:
+                image = results['image'].copy()
+            else:
+                image = self._read_image(results['image_path'])
         
-        # Tespit edilen fazları çiz
-        for detection in results['detections']:
-            x1, y1, x2, y2 = map(int, detection['bbox'])
-            phase_name = detection['class_name']
-            confidence = detection['confidence']
-            
-            color = colors.get(phase_name, (128, 128, 128))
-            
-            # Bounding box çiz
-            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
-            
-            # Etiket ekle
-            label = f"{phase_name}: {confidence:.2f}"
-            (label_width, label_height), _ = cv2.getTextSize(
-                label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
-            )
-            cv2.rectangle(image, (x1, y1 - label_height - 5),
-                         (x1 + label_width, y1), color, -1)
-            cv2.putText(image, label, (x1, y1 - 5),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        import cv2
+        
+        with self.metrics.stage(results['image_path'], 'render'):
+            if results.get('mask') is not None:
+                self._draw_mask(image, results['mask'])
+            self._draw_detections(image, results['detections'])
         
         # Görselleştir
         if show:
+            import matplotlib.pyplot as plt
             plt.figure(figsize=(12, 8))
-            plt.imshow(image)
+            plt.imshow(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
             plt.title(f"Faz Analizi Sonuçları\n"
                      f"Toplam Tespit: {results['phase_statistics']['total_detections']}")
             plt.axis('off')
@@ -200,91 +845,715 @@ class PhaseAnalyzer:
             
             plt.show()
         elif save_path:
-            cv2.imwrite(save_path, cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+            with self.metrics.stage(results['image_path'], 'write'):
+                cv2.imwrite(save_path, image)
             print(f"Görüntü kaydedildi: {save_path}")
     
-    def batch_analyze(self, input_dir: str, output_dir: str = 'results/') -> List[Dict]:
+    def _draw_mask(self, image: np.ndarray, mask: np.ndarray, alpha: float = 0.4):
+        """İndeks maskesini yarı saydam renkli katman olarak BGR görüntünün üzerine çizer"""
+        import cv2
+        
+        # Maske değeri (faz indeksi + 1) → BGR renk
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        for class_id, phase_name in self.phase_names.items():
+            palette[class_id + 1] = PHASE_COLORS.get(phase_name, (128, 128, 128))[::-1]
+        
+        blended = cv2.addWeighted(image, 1.0 - alpha, palette[mask], alpha, 0.0)
+        np.copyto(image, blended, where=(mask > 0)[:, :, None])
+    
+    def _draw_detections(self, image: np.ndarray, detections: List[Dict]):
+        """Tespit kutularını ve etiketlerini BGR görüntünün üzerine çizer"""
+        import cv2
+        
+        if not isinstance(detections, Detections):
+            detections = Detections.from_records(detections, self.phase_names)
+        
+        # Tespit edilen fazları çiz
+        for (x1, y1, x2, y2), phase_name, confidence in zip(
+                detections.boxes.astype(int).tolist(), detections.class_names,
+                detections.confidences.tolist()):
+            
+            # Görüntü BGR olduğundan renk sırası ters çevrilir
+            color = PHASE_COLORS.get(phase_name, (128, 128, 128))[::-1]
+            
+            # Bounding box çiz
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            
+            # Etiket ekle
+            label = f"{phase_name}: {confidence:.2f}"
+            (label_width, label_height), _ = cv2.getTextSize(
+                label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
+            )
+            cv2.rectangle(image, (x1, y1 - label_height - 5),
+                         (x1 + label_width, y1), color, -1)
+            cv2.putText(image, label, (x1, y1 - 5),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    
+    def batch_analyze(self, input_dir: str, output_dir: str = 'results/',
+                      batch_size: int = 8, mode: str = 'sequential',
+                      num_workers: int = 4, queue_size: int = 16,
+                      num_processes: Optional[int] = None,
+                      resume: bool = False, verify_hash: bool = False,
+                      summary_formats: Tuple[str, ...] = (),
+                      keep_results: bool = True, recursive: bool = True,
+                      include: Optional[List[str]] = None,
+                      exclude: Optional[List[str]] = None,
+                      shard_index: int = 0, num_shards: int = 1) -> List[Dict]:
         """
         Bir klasördeki tüm görüntüleri analiz eder
         
+        Görüntüler image_discovery.iter_image_files() ile bulundukça
+        işlenir; klasör ağacının tamamının taranması beklenmez ve dosya
+        listesi bellekte tutulmaz. Alt klasörlerdeki görüntülerin sonuç
+        görselleri images/ altında aynı alt klasörlere yazılır.
+        
         Args:
             input_dir: Giriş görüntülerinin bulunduğu klasör
             output_dir: Çıktıların kaydedileceği klasör
-            
+            batch_size: Tek bir model çağrısında işlenecek görüntü sayısı
+            mode: İşleme modu ('sequential', 'pipeline' veya 'process').
+                'pipeline' modunda okuma, çıkarım ve çizim/yazma aşamaları
+                sınırlı kuyruklarla birbirine bağlanıp eşzamanlı çalışır.
+                'process' modunda dosya listesi, modeli bir kez yükleyen
+                işçi süreçlere paylaştırılır
+            num_workers: Pipeline modunda okuma ve çizim/yazma aşamalarının
+                her biri için thread sayısı
+            queue_size: Pipeline modunda aşamalar arası kuyrukların kapasitesi
+            num_processes: Process modunda işçi süreç sayısı
+                (varsayılan: CPU çekirdek sayısı)
+            resume: True ise output_dir içindeki manifestoya her dosyanın
+                durumu ve sonucu kaydedilir; tekrar çalıştırıldığında daha
+                önce başarıyla işlenmiş ve değişmemiş dosyalar atlanır,
+                yalnızca yeni, değişmiş ve başarısız dosyalar işlenir. Özet
+                rapor manifestodaki sonuçlardan oluşturulur
+            verify_hash: Resume modunda dosya değişikliğini boyut ve
+                değiştirilme zamanına ek olarak içerik özetiyle kontrol et
+            summary_formats: Her görüntü tamamlandığında output_dir'e bir
+                satır eklenecek makine tarafından okunabilir formatlar
+                ('jsonl', 'csv', 'parquet'). Dosyalar çalışma sürerken
+                okunabilir; Parquet ise çalışma sonunda tamamlanır
+            keep_results: False ise sonuçlar bellekte biriktirilmez ve boş
+                liste döndürülür; özetler yine de akışlı olarak yazılır
+            recursive: False ise alt klasörlere inilmez
+            include: Yalnızca göreli yolu bu fnmatch kalıplarına uyan
+                görüntüleri işle (ör. ['*.tif'])
+            exclude: Göreli yolu bu kalıplara uyan görüntüleri ve klasörleri atla
+            shard_index: Birden fazla makine aynı ağacı bölüşürken bu
+                makinenin parça indeksi
+            num_shards: Toplam parça sayısı; her dosya göreli yolunun
+                özetine göre tek bir parçaya düşer
+        
         Returns:
             List[Dict]: Tüm analiz sonuçları
         """
+        if batch_size < 1:
+            raise ValueError(f"batch_size en az 1 olmalı: {batch_size}")
+        if mode not in ('sequential', 'pipeline', 'process'):
+            raise ValueError(f"Bilinmeyen işleme modu: {mode}")
+        
         # Çıktı klasörünü oluştur
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         (output_path / 'images').mkdir(parents=True, exist_ok=True)
         
-        # Desteklenen görüntü formatları
-        extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
+        # Görüntüler bulundukça işlenir; input_dir içindeki çıktı klasörü taranmaz
+        def discover() -> Iterable[Path]:
+            return iter_image_files(input_dir, include=include, exclude=exclude,
+                                    recursive=recursive, shard_index=shard_index,
+                                    num_shards=num_shards, skip_dirs=[output_dir])
+        
+        image_files = discover()
+        found_count = [0]
+        skipped_count = [0]
         
-        # Tüm görüntüleri bul
-        image_files = []
-        for ext in extensions:
-            image_files.extend(Path(input_dir).glob(f'*{ext}'))
+        # Profil dosyaları varsayılan olarak çıktı klasörüne yazılır
+        default_profile_dir = self.metrics.profile_dir is None
+        if default_profile_dir:
+            self.metrics.profile_dir = str(output_path / 'profiles')
         
-        print(f"Toplam {len(image_files)} görüntü bulundu.")
+        # Daha önce işlenmiş ve değişmemiş dosyaları atla
+        if resume:
+            self._manifest = RunManifest(output_dir, verify_hash=verify_hash)
         
-        # Tüm görüntüleri analiz et
+        def iter_pending() -> Iterable[Path]:
+            for image_file in image_files:
+                found_count[0] += 1
+                try:
+                    is_done = self._manifest is not None and self._manifest.is_done(str(image_file))
+                except OSError:  # Taramadan sonra silinen dosya okuma aşamasında raporlanır
+                    is_done = False
+                if is_done:
+                    skipped_count[0] += 1
+                    continue
+                yield image_file
+        
+        pending_files = iter_pending()
+        
+        # Her sonuç tamamlandığında özete eklenir
         all_results = []
-        for image_file in image_files:
-            print(f"Analiz ediliyor: {image_file.name}")
+        summary = BatchSummaryWriter(output_dir, summary_formats,
+                                     list(self.phase_names.values()))
+        
+        def on_result(results: Dict):
+            summary.add(results)
+            if keep_results:
+                all_results.append(results)
+        
+        self._input_root = os.path.abspath(input_dir)
+        try:
+            # Tüm görüntüleri analiz et
+            if mode == 'pipeline':
+                self._batch_pipeline(pending_files, output_dir, batch_size,
+                                     num_workers, queue_size, on_result)
+            elif mode == 'process':
+                self._batch_processes(pending_files, output_dir, batch_size,
+                                      num_processes, on_result, resume, verify_hash)
+            else:
+                self._batch_sequential(pending_files, output_dir, batch_size, on_result)
+            
+            print(f"Toplam {found_count[0]} görüntü bulundu.")
+            if resume:
+                print(f"{skipped_count[0]} görüntü daha önce işlenmiş, "
+                      f"{found_count[0] - skipped_count[0]} görüntü işlendi.")
+            if self.cascade is not None:
+                for stage, reasons in summary.totals.screen_rejections.items():
+                    print(f"Ön tarama ({stage}): {sum(reasons.values())} görüntü elendi {reasons}")
             
+            # Özet, bu çalışmada işlenenler yerine manifestodaki tüm sonuçlardan oluşturulur
+            if self._manifest is not None:
+                summary.close(write_summary=False)
+                all_results = []
+                summary = BatchSummaryWriter(output_dir, summary_formats,
+                                             list(self.phase_names.values()))
+                for results in self._manifest.iter_results(discover()):
+                    on_result(results)
+        finally:
+            # Özet rapor oluştur
+            summary.close()
+            if self._manifest is not None:
+                self._manifest.close()
+                self._manifest = None
+            self._input_root = None
+            if default_profile_dir:
+                self.metrics.profile_dir = None
+        
+        # Aşama süreleri ve sayaçlar
+        if self.metrics.enabled:
+            self.metrics.write(output_dir)
+            print(f"Ölçümler kaydedildi: {output_path / 'metrics.prom'}")
+        
+        # İşçi süreçlerin sayaçları ana süreçte görünmez
+        if self.result_cache is not None and mode != 'process':
+            cache_stats = self.result_cache.stats()
+            print(f"Önbellek: {cache_stats['hits']} isabet, "
+                  f"{cache_stats['misses']} ıskalama")
+        
+        return all_results
+    
+    def watch(self, input_dir: str, output_dir: str = 'results/',
+              batch_size: int = 8, num_workers: int = 2, queue_size: int = 64,
+              method: str = 'auto', settle_seconds: float = 2.0,
+              poll_interval: float = 1.0, verify_hash: bool = False,
+              summary_formats: Tuple[str, ...] = ('jsonl',),
+              stop_event: Optional[threading.Event] = None):
+        """
+        Bir klasör ağacını izler ve eklenen görüntüleri geldikçe analiz eder
+        
+        Başlangıçta ağaçta bulunup daha önce işlenmemiş görüntüler ve izleme
+        sırasında yazılması tamamlanan görüntüler, en fazla queue_size
+        elemanlık bir kuyruk üzerinden, izleme boyunca açık kalan tek bir
+        pipeline ile analiz edilir; mini-batch'ler o an okunmuş görüntülerden
+        oluşturulur. Analiz geride kalırsa kuyruk dolar ve izleme thread'i
+        bekler (backpressure). Çıktılar batch_analyze() ile aynı düzende
+        yazılır ve manifestoya kaydedilir; yeniden başlatıldığında işlenmiş
+        dosyalar atlanır, sonuçları özete manifestodan eklenir. Özet
+        satırları her görüntüden, batch_totals.json (ve ölçüm açıksa
+        metrics.prom/metrics.json) bekleyen dosya kalmadığında veya en geç
+        poll_interval'da bir güncellenir; batch_summary.txt izleme
+        durduğunda yazılır.
+        
+        Args:
+            input_dir: İzlenecek klasör (alt klasörler dahil)
+            output_dir: Çıktıların kaydedileceği klasör (input_dir içinde
+                olabilir, izlenmez)
+            batch_size: Tek bir model çağrısında işlenecek görüntü sayısı
+            num_workers: Okuma ve çizim/yazma aşamalarının her biri için
+                thread sayısı
+            queue_size: Analiz bekleyen maksimum görüntü sayısı
+            method: 'inotify', 'poll' veya 'auto' (bkz. FolderWatcher)
+            settle_seconds: Yoklamada dosyanın yazılmış sayılması için
+                değişmeden geçmesi gereken süre
+            poll_interval: Yoklama aralığı (saniye)
+            verify_hash: Manifestoda değişiklik kontrolünü içerik özetiyle yap
+            summary_formats: Görüntü başına satır eklenecek özet formatları
+            stop_event: Set edildiğinde izleme durur (varsayılan: Ctrl+C)
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size en az 1 olmalı: {batch_size}")
+        stop_event = stop_event or threading.Event()
+        
+        output_path = Path(output_dir)
+        (output_path / 'images').mkdir(parents=True, exist_ok=True)
+        
+        watcher = FolderWatcher(input_dir, exclude=[output_dir], method=method,
+                                settle_seconds=settle_seconds)
+        print(f"Klasör izleniyor ({watcher.method}): {watcher.root}")
+        
+        self._input_root = watcher.root
+        self._manifest = RunManifest(output_dir, verify_hash=verify_hash)
+        summary = BatchSummaryWriter(output_dir, summary_formats,
+                                     list(self.phase_names.values()))
+        path_queue = queue.Queue(maxsize=queue_size)
+        
+        def watch_worker():
             try:
-                results = self.analyze_image(str(image_file))
-                all_results.append(results)
-                
-                # Sonuçları görselleştir ve kaydet
-                result_output_path = str(Path(output_dir) / 'images' / f"{image_file.stem}_result.jpg")
-                self.visualize_results(results, save_path=result_output_path, show=False)
-                
+                while not stop_event.is_set():
+                    for path in watcher.changes(poll_interval):
+                        _put_until_stopped(path_queue, path, stop_event)
             except Exception as e:
-                print(f"Hata ({image_file.name}): {e}")
+                print(f"İzleme hatası: {e}")
+                stop_event.set()
         
-        # Özet rapor oluştur
-        self._generate_batch_summary(all_results, output_dir)
+        # Okuma thread'lerine verilmiş ama sonucu gelmemiş dosyalar (yol -> mtime)
+        in_flight: Dict[str, int] = {}
         
-        return all_results
+        def pending_files() -> Iterator[Path]:
+            while not stop_event.is_set():
+                try:
+                    path = str(Path(path_queue.get(timeout=poll_interval)))
+                except queue.Empty:
+                    continue
+                # Tekrar bildirilen, işlenmekte olan ve bu arada silinen dosyalar atlanır
+                try:
+                    if self._manifest.is_done(path):
+                        continue
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                if in_flight.get(path) == mtime:
+                    continue
+                in_flight[path] = mtime
+                yield Path(path)
+        
+        # Son güncellemeden beri analiz edilenlerin edinimden (dosyanın
+        # yazılmasından) sonuca kadar geçen süreleri
+        latencies = []
+        last_flush = [time.monotonic()]
+        
+        def flush():
+            summary.write_totals()
+            if self.metrics.enabled:
+                self.metrics.write(output_dir)
+            if latencies:
+                print(f"{len(latencies)} görüntü analiz edildi "
+                      f"(en yüksek gecikme: {max(latencies):.1f} s)")
+                latencies.clear()
+            last_flush[0] = time.monotonic()
+        
+        def on_result(results: Dict):
+            in_flight.pop(results['image_path'], None)
+            summary.add(results)
+            try:
+                latency = max(0.0, time.time() - os.path.getmtime(results['image_path']))
+            except OSError:
+                latency = None
+            if latency is not None:
+                latencies.append(latency)
+                self.metrics.add(results['image_path'], 'ingest_latency', latency)
+            # Toplamlar bekleyen dosya kalmadığında veya en geç poll_interval'da bir yazılır
+            if path_queue.empty() or time.monotonic() - last_flush[0] >= poll_interval:
+                flush()
+        
+        watch_thread = None
+        try:
+            # Önceki çalışmalarda işlenenler özete eklenir, diğerleri yazılmaları bitince işlenir
+            done_count = 0
+            for path in watcher.existing_files():
+                try:
+                    is_done = self._manifest.is_done(path)
+                except OSError:
+                    continue
+                if is_done:
+                    for results in self._manifest.iter_results([Path(path)]):
+                        summary.add(results)
+                    done_count += 1
+                else:
+                    watcher.track(path)
+            summary.write_totals()
+            print(f"{done_count} görüntü daha önce işlenmiş, yeni görüntüler bekleniyor.")
+            
+            watch_thread = threading.Thread(target=watch_worker, daemon=True)
+            watch_thread.start()
+            
+            # Tek bir pipeline izleme süresince açık kalır; okuma thread'leri
+            # dosyaları kuyruktan geldikçe çeker, çıkarım aşaması hazır olanlardan
+            # en fazla batch_size'lık mini-batch'ler oluşturur
+            self._batch_pipeline(pending_files(), output_dir, batch_size, num_workers,
+                                 queue_size, on_result, stop_event=stop_event)
+            flush()
+        except KeyboardInterrupt:
+            print("\nİzleme durduruldu.")
+        finally:
+            stop_event.set()
+            if watch_thread is not None:
+                watch_thread.join()
+            watcher.close()
+            summary.close()
+            self._manifest.close()
+            self._manifest = None
+            self._input_root = None
     
-    def _generate_batch_summary(self, results_list: List[Dict], output_dir: str):
-        """Batch işleme için özet rapor oluşturur"""
-        summary_path = str(Path(output_dir) / 'batch_summary.txt')
+    def _batch_sequential(self, image_files: Iterable[Path], output_dir: str,
+                          batch_size: int, on_result: Callable[[Dict], None]):
+        """Görüntüleri mini-batch'ler halinde sırayla analiz eder"""
+        for chunk in _chunks(image_files, batch_size):
+            batch_files = []
+            batch_images = []
+            batch_lookups = []
+            for image_file in chunk:
+                image = self._decode_for_batch(image_file)
+                if image is not None:
+                    batch_images.append(image)
+                    batch_files.append(image_file)
+                    batch_lookups.append(self._lookup_cache(str(image_file)))
+            
+            batch_results = self._infer_for_batch(batch_files, batch_images, batch_lookups)
+            for i, results in batch_results:
+                mask = self._detach_mask(results, batch_files[i], output_dir)
+                on_result(results)
+                self._save_result_image(results, batch_files[i], output_dir, batch_images[i],
+                                        mask)
+    
+    def _batch_pipeline(self, image_files: Iterable[Path], output_dir: str,
+                        batch_size: int, num_workers: int, queue_size: int,
+                        on_result: Callable[[Dict], None],
+                        stop_event: Optional[threading.Event] = None):
+        """
+        Görüntüleri okuma / çıkarım / çizim-yazma aşamalarından oluşan
+        bir pipeline ile analiz eder
         
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            f.write("=" * 60 + "\n")
-            f.write("Metalik Malzeme Faz Analizi - Batch İşleme Özeti\n")
-            f.write("=" * 60 + "\n\n")
-            f.write(f"Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Toplam İşlenen Görüntü: {len(results_list)}\n\n")
+        Okuma ve çizim-yazma aşamaları thread havuzlarında, çıkarım ise tek
+        bir aşamada (bu thread'de) çalışır. Aşamalar arasındaki kuyruklar
+        sınırlı olduğundan yavaş bir aşama öncekini bekletir ve bellek
+        kullanımı görüntü sayısıyla büyümez. Dosyalar image_files'tan okuma
+        thread'leri tarafından sırayla çekilir. Sonuçlar on_result'a, okuma
+        sırası karışsa da giriş dosyalarının sırasıyla iletilir.
+        
+        stop_event verilirse (ör. watch) set edildiğinde pipeline yeni
+        görüntü almayı bırakır; pipeline bittiğinde veya hata verdiğinde de
+        set edilir, böylece image_files'ı besleyen üreteç beklemeyi bırakabilir.
+        """
+        if num_workers < 1:
+            raise ValueError(f"num_workers en az 1 olmalı: {num_workers}")
+        
+        path_iterator = enumerate(image_files)
+        path_lock = threading.Lock()
+        decode_queue = queue.Queue(maxsize=queue_size)
+        render_queue = queue.Queue(maxsize=queue_size)
+        stop_event = stop_event or threading.Event()
+        decoders_left = [num_workers]
+        decoders_lock = threading.Lock()
+        
+        def decode_worker():
+            try:
+                while not stop_event.is_set():
+                    # Keşif üreteci aynı anda tek bir thread tarafından ilerletilebilir
+                    with path_lock:
+                        item = next(path_iterator, None)
+                    if item is None:
+                        break
+                    index, image_file = item
+                    # Okunamayan görüntüler de sıralamanın ilerlemesi için iletilir
+                    image = self._decode_for_batch(image_file)
+                    lookup = self._lookup_cache(str(image_file)) if image is not None else None
+                    _put_until_stopped(decode_queue, (index, image_file, image, lookup),
+                                       stop_event)
+            except BaseException:
+                stop_event.set()
+                raise
+            finally:
+                # Son okuma thread'i çıkarım aşamasına bitiş sinyali gönderir
+                with decoders_lock:
+                    decoders_left[0] -= 1
+                    if decoders_left[0] == 0:
+                        _put_until_stopped(decode_queue, None, stop_event)
+        
+        def render_worker():
+            try:
+                while True:
+                    try:
+                        item = render_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        if stop_event.is_set():
+                            break
+                        continue
+                    if item is None:
+                        break
+                    image_file, results, image, mask = item
+                    self._save_result_image(results, image_file, output_dir, image, mask)
+            except BaseException:
+                # Çizim thread'i hata ile biterse diğer aşamalar beklemeyi bırakır
+                stop_event.set()
+                raise
+        
+        # Sırası gelmemiş sonuçlar (okunamayanlar için None) burada bekler
+        completed = {}
+        next_index = 0
+        
+        with ThreadPoolExecutor(max_workers=num_workers) as decode_pool, \
+                ThreadPoolExecutor(max_workers=num_workers) as render_pool:
+            futures = []
+            for _ in range(num_workers):
+                futures.append(decode_pool.submit(decode_worker))
+                futures.append(render_pool.submit(render_worker))
             
-            # Genel istatistikler
-            total_detections = sum(r['phase_statistics']['total_detections'] 
-                                  for r in results_list)
-            confidence_values = [r['phase_statistics']['average_confidence'] 
-                               for r in results_list if r['phase_statistics']['average_confidence'] > 0]
-            avg_confidence = np.mean(confidence_values) if confidence_values else 0.0
+            try:
+                finished = False
+                while not finished:
+                    # İlk görüntüyü bekle, kuyrukta hazır olanlarla batch'i doldur
+                    batch = [_get_until_stopped(decode_queue, stop_event)]
+                    while len(batch) < batch_size and batch[-1] is not None:
+                        try:
+                            batch.append(decode_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    if batch[-1] is None:
+                        finished = True
+                        batch.pop()
+                    
+                    for index, _, image, _ in batch:
+                        completed[index] = None
+                    batch = [item for item in batch if item[2] is not None]
+                    
+                    batch_files = [image_file for _, image_file, _, _ in batch]
+                    batch_images = [image for _, _, image, _ in batch]
+                    batch_lookups = [lookup for _, _, _, lookup in batch]
+                    batch_results = self._infer_for_batch(batch_files, batch_images,
+                                                          batch_lookups)
+                    for i, results in batch_results:
+                        index, image_file, image, _ = batch[i]
+                        # Maske on_result'tan önce sonuçtan çıkarılır ve yalnızca çizim
+                        # thread'ine iletilir; sıralı moddaki ile aynı sonuç döner
+                        mask = self._detach_mask(results, image_file, output_dir)
+                        completed[index] = results
+                        _put_until_stopped(render_queue, (image_file, results, image, mask),
+                                           stop_event)
+                    
+                    # Sonuçları sıralı moddaki ile aynı sırada ilet
+                    while next_index in completed:
+                        results = completed.pop(next_index)
+                        if results is not None:
+                            on_result(results)
+                        next_index += 1
+            except BaseException:
+                stop_event.set()
+                raise
+            finally:
+                # Normal bitişte çizim thread'leri kuyruğu boşaltıp bitiş sinyalinde durur
+                for _ in range(num_workers):
+                    _put_until_stopped(render_queue, None, stop_event)
+                stop_event.set()
+        
+        # Okuma ve çizim thread'lerindeki hatalar çağırana iletilir
+        for future in futures:
+            future.result()
+    
+    def _batch_processes(self, image_files: Iterable[Path], output_dir: str,
+                         batch_size: int, num_processes: Optional[int],
+                         on_result: Callable[[Dict], None],
+                         resume: bool = False, verify_hash: bool = False):
+        """
+        Görüntüleri birden fazla süreçte paralel olarak analiz eder
+        
+        Dosyalar batch_size'lık parçalara bölünerek işçi süreçlere dağıtılır;
+        bellekte aynı anda en fazla 2 * num_processes parça bekler. Her işçi modeli model_path'ten yalnızca bir kez yükler ve
+        çekirdeklerin aşırı paylaşılmaması için torch/OpenCV thread sayısı
+        çekirdek sayısı / süreç sayısı ile sınırlandırılır.
+        """
+        cpu_count = os.cpu_count() or 1
+        num_processes = num_processes or cpu_count
+        if num_processes < 1:
+            raise ValueError(f"num_processes en az 1 olmalı: {num_processes}")
+        num_threads = max(1, cpu_count // num_processes)
+        
+        shards = _chunks(image_files, batch_size)
+        
+        # fork, torch'un thread havuzlarıyla kilitlenebildiği için spawn kullanılır
+        with ProcessPoolExecutor(max_workers=num_processes,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_process_worker_init,
+                                 initargs=(self._worker_config(), num_threads)) as pool:
+            in_flight = deque()
             
-            f.write(f"Toplam Tespit: {total_detections}\n")
-            f.write(f"Ortalama Güven Skoru: {avg_confidence:.2%}\n\n")
+            def submit_next():
+                shard = next(shards, None)
+                if shard is not None:
+                    in_flight.append((shard, pool.submit(
+                        _process_worker_run, shard, output_dir, batch_size,
+                        resume, verify_hash, self._input_root)))
             
-            # Görüntü bazında sonuçlar
-            f.write("Görüntü Bazında Sonuçlar:\n")
-            f.write("-" * 60 + "\n")
+            for _ in range(2 * num_processes):
+                submit_next()
             
-            for i, result in enumerate(results_list, 1):
-                f.write(f"\n{i}. {Path(result['image_path']).name}\n")
-                f.write(f"   Tespit Sayısı: {result['phase_statistics']['total_detections']}\n")
-                
-                if result['phase_statistics']['phase_counts']:
-                    f.write("   Faz Dağılımı:\n")
-                    for phase, count in result['phase_statistics']['phase_counts'].items():
-                        f.write(f"      - {phase}: {count}\n")
+            # Sonuçları sıralı moddaki ile aynı sırada birleştir
+            while in_flight:
+                shard, future = in_flight.popleft()
+                submit_next()
+                try:
+                    shard_results = future.result()
+                except Exception as e:
+                    for image_file in shard:
+                        self._report_failure(image_file, e)
+                    continue
+                for results in shard_results:
+                    # İşçi süreçlerde ölçülen süreler ana sürecin histogramlarına eklenir
+                    self.metrics.observe(results.get('timings'), len(results['detections']))
+                    on_result(results)
+    
+    def _worker_config(self) -> Dict:
+        """İşçi süreçlerde aynı analyzer'ı oluşturmak için gereken parametreler"""
+        return {
+            'model_path': self.model_path,
+            'confidence_threshold': self.confidence_threshold,
+            'tile_size': self.tile_size,
+            'tile_overlap': self.tile_overlap,
+            'tile_batch_size': self.tile_batch_size,
+            'tile_iou_threshold': self.tile_iou_threshold,
+            'backend': self.backend,
+            'backend_options': self.backend_options,
+            'cache_dir': self.cache_dir,
+            'cache_max_bytes': self.cache_max_bytes,
+            'area_precedence': self.area_precedence,
+            'collect_metrics': self.metrics.enabled,
+            'profile_every': self.metrics.profile_every,
+            'profiler': self.metrics.profiler,
+            'profile_dir': self.metrics.profile_dir,
+            'cascade': self.cascade,
+            'tta': list(self.tta) if self.tta else None,
+            'tta_iou_threshold': self.tta_iou_threshold,
+            'preprocessor': self.preprocessor,
+            'preprocess_cache_max_bytes': self.preprocess_cache_max_bytes
+        }
+    
+    def _decode_for_batch(self, image_file: Path) -> Optional[np.ndarray]:
+        """Batch işleme için görüntüyü okur, hata durumunda None döndürür"""
+        print(f"Analiz ediliyor: {image_file.name}")
+        self.metrics.begin(str(image_file))
+        try:
+            return self._read_image(str(image_file))
+        except Exception as e:
+            self._report_failure(image_file, e)
+            return None
+    
+    def _infer_for_batch(self, batch_files: List[Path], batch_images: List[np.ndarray],
+                         batch_lookups: List[Tuple[Optional[str], Optional[Dict]]]
+                         ) -> List[Tuple[int, Dict]]:
+        """
+        Bir mini-batch'i analiz eder ve başarılı görüntülerin batch içindeki
+        sırasını sonuçlarıyla birlikte döndürür
+        
+        Batch çağrısı hata verirse görüntüler tek tek yeniden analiz edilir;
+        böylece yalnızca hataya yol açan görüntü başarısız olarak raporlanır.
+        """
+        try:
+            batch_results = self._analyze_with_cache(
+                [str(image_file) for image_file in batch_files], batch_images, batch_lookups
+            )
+            return list(enumerate(batch_results))
+        except Exception as e:
+            if len(batch_files) == 1:
+                self._report_failure(batch_files[0], e)
+                return []
+        
+        indexed_results = []
+        for i, (image_file, image, lookup) in enumerate(zip(batch_files, batch_images,
+                                                            batch_lookups)):
+            try:
+                results = self._analyze_with_cache([str(image_file)], [image], [lookup])[0]
+            except Exception as e:
+                self._report_failure(image_file, e)
+                continue
+            indexed_results.append((i, results))
+        return indexed_results
+    
+    def _detach_mask(self, results: Dict, image_file: Path,
+                     output_dir: str) -> Optional[np.ndarray]:
+        """
+        Segmentasyon maskesini sonuçtan çıkarıp yerine yazılacağı yolu koyar
+        
+        Batch modlarında maske on_result'tan önce çıkarılır; sonuçlar ve
+        manifesto tam boyutlu dizi yerine 'mask_path' taşır. Maske
+        _save_result_image ile masks/ altına yazılır.
+        """
+        mask = results.pop('mask', None)
+        if mask is not None:
+            results['mask_path'] = str(self._result_image_path(image_file, output_dir,
+                                                                'masks', '_mask.png'))
+        return mask
+    
+    def _save_result_image(self, results: Dict, image_file: Path, output_dir: str,
+                           image: Optional[np.ndarray] = None,
+                           mask: Optional[np.ndarray] = None):
+        """
+        Sonuçları görselleştirip images/ klasörüne kaydeder
+        
+        Ön taramada elenen görüntüler için sonuç görseli üretilmez. mask
+        verilirse (bkz. _detach_mask) görsele çizilir ve sonucun
+        'mask_path' yoluna PNG olarak yazılır; results değiştirilmez.
+        """
+        screen = results.get('screen')
+        if screen is None or screen['passed']:
+            try:
+                result_output_path = str(self._result_image_path(image_file, output_dir))
+                render_results = dict(results, mask=mask) if mask is not None else results
+                self.visualize_results(render_results, save_path=result_output_path,
+                                       show=False, image=image)
+                if mask is not None:
+                    import cv2
+                    mask_path = Path(results['mask_path'])
+                    mask_path.parent.mkdir(parents=True, exist_ok=True)
+                    with self.metrics.stage(str(image_file), 'write'):
+                        cv2.imwrite(str(mask_path), mask)
+            except Exception as e:
+                self._report_failure(image_file, e)
+                return
+        
+        if self._manifest is not None:
+            self._manifest.record_success(str(image_file), results)
+        self.metrics.finish(str(image_file), len(results['detections']))
+    
+    def _result_image_path(self, image_file: Path, output_dir: str,
+                           subdir: str = 'images', suffix: str = '_result.jpg') -> Path:
+        """
+        Sonuç görselinin (veya maskesinin) yolu
         
-        print(f"\nÖzet rapor kaydedildi: {summary_path}")
+        Giriş klasörünün alt klasörlerindeki görüntüler, aynı adlı dosyalar
+        birbirinin üzerine yazılmasın diye images/ altında aynı alt klasör
+        düzeniyle kaydedilir.
+        """
+        images_dir = Path(output_dir) / subdir
+        if self._input_root is not None:
+            relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(image_file)),
+                                           self._input_root)
+            if relative_dir != '.' and not relative_dir.startswith('..'):
+                images_dir = images_dir / relative_dir
+                images_dir.mkdir(parents=True, exist_ok=True)
+        return images_dir / f"{image_file.stem}{suffix}"
+    
+    def _report_failure(self, image_file: Path, error: Exception):
+        """Batch işlemedeki hatayı yazdırır ve manifesto açıksa kaydeder"""
+        print(f"Hata ({image_file.name}): {error}")
+        self.metrics.finish(str(image_file), failed=True)
+        if self._manifest is not None:
+            self._manifest.record_failure(str(image_file), error)
+    
+    def _generate_batch_summary(self, results_list: Iterable[Dict], output_dir: str,
+                                summary_formats: Tuple[str, ...] = ()):
+        """Batch işleme için özet rapor oluşturur"""
+        with BatchSummaryWriter(output_dir, summary_formats,
+                                list(self.phase_names.values())) as summary:
+            for results in results_list:
+                summary.add(results)
     
     def generate_report(self, results: Dict, output_path: str = 'report.txt'):
         """
@@ -303,6 +1572,10 @@ class PhaseAnalyzer:
             f.write(f"Tarih: {results['timestamp']}\n")
             f.write(f"Görüntü Boyutu: {results['image_shape'][1]}x{results['image_shape'][0]}\n\n")
             
+            screen = results.get('screen')
+            if screen is not None and not screen['passed']:
+                f.write(f"Ön Taramada Elendi: {screen['stage']}/{screen['reason']}\n\n")
+            
             stats = results['phase_statistics']
             f.write(f"Toplam Tespit: {stats['total_detections']}\n")
             f.write(f"Ortalama Güven Skoru: {stats['average_confidence']:.2%}\n\n")
@@ -310,11 +1583,23 @@ class PhaseAnalyzer:
             if stats['phase_counts']:
                 f.write("Faz Dağılımı:\n")
                 f.write("-" * 40 + "\n")
+                fractions = stats.get('phase_area_fractions', {})
                 for phase, count in stats['phase_counts'].items():
                     area = stats['phase_areas'].get(phase, 0)
                     f.write(f"{phase}:\n")
                     f.write(f"  Tespit Sayısı: {count}\n")
-                    f.write(f"  Toplam Alan: {area:.2f} piksel²\n\n")
+                    f.write(f"  Toplam Alan: {area:.2f} piksel²\n")
+                    if phase in fractions:
+                        f.write(f"  Alan Oranı: {fractions[phase]:.2%}\n")
+                    f.write("\n")
+            elif stats.get('phase_area_fractions'):
+                # Segmentasyon sonuçlarında tespit yoktur, alanlar piksel sayısıdır
+                f.write("Faz Dağılımı (segmentasyon):\n")
+                f.write("-" * 40 + "\n")
+                for phase, fraction in stats['phase_area_fractions'].items():
+                    f.write(f"{phase}:\n")
+                    f.write(f"  Toplam Alan: {stats['phase_areas'][phase]:.0f} piksel\n")
+                    f.write(f"  Alan Oranı: {fraction:.2%}\n\n")
             
             f.write("\nDetaylı Tespit Listesi:\n")
             f.write("-" * 40 + "\n")
@@ -327,6 +1612,105 @@ class PhaseAnalyzer:
         print(f"Rapor kaydedildi: {output_path}")
 
 
+def _empty_arrays() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tespit olmayan görüntüler için boş kutu, güven ve sınıf dizileri"""
+    return (np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=int))
+
+
+def _encode_mask(mask: np.ndarray) -> str:
+    """İndeks maskesini önbellekte JSON içinde saklamak için PNG + base64'e çevirir"""
+    import base64
+    import cv2
+    
+    ok, encoded = cv2.imencode('.png', mask)
+    if not ok:
+        raise ValueError("Maske PNG olarak kodlanamadı")
+    return base64.b64encode(encoded.tobytes()).decode('ascii')
+
+
+def _decode_mask(data: str) -> np.ndarray:
+    """_encode_mask ile saklanan maskeyi uint8 indeks maskesine geri çevirir"""
+    import base64
+    import cv2
+    
+    buffer = np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+    return cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    """Bir iterable'ı en fazla size elemanlık listeler halinde döndürür"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _get_until_stopped(source_queue: queue.Queue, stop_event: threading.Event):
+    """Kuyruktan eleman alır; pipeline durdurulursa None döndürür"""
+    while not stop_event.is_set():
+        try:
+            return source_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _put_until_stopped(target_queue: queue.Queue, item, stop_event: threading.Event):
+    """Sınırlı kuyruğa eleman koyar; pipeline durdurulursa beklemeyi bırakır"""
+    while not stop_event.is_set():
+        try:
+            target_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+_worker_analyzer: Optional[PhaseAnalyzer] = None
+
+
+def _process_worker_init(analyzer_config: Dict, num_threads: int):
+    """İşçi süreci başlatır: thread sayısını sınırlar ve modeli bir kez yükler"""
+    global _worker_analyzer
+    
+    import cv2
+    cv2.setNumThreads(num_threads)
+    
+    # torch yalnızca ultralytics backend'inde içe aktarılır; diğer backend'ler
+    # (onnxruntime, openvino, unet) thread sayısını num_threads seçeneğiyle alır
+    if analyzer_config['backend'] == 'ultralytics':
+        import torch
+        torch.set_num_threads(num_threads)
+    else:
+        analyzer_config['backend_options'].setdefault('num_threads', num_threads)
+    
+    _worker_analyzer = PhaseAnalyzer(**analyzer_config)
+
+
+def _process_worker_run(image_files: List[Path], output_dir: str, batch_size: int,
+                        resume: bool = False, verify_hash: bool = False,
+                        input_root: Optional[str] = None) -> List[Dict]:
+    """İşçi süreçte bir dosya parçasını analiz eder"""
+    _worker_analyzer._input_root = input_root
+    shard_results = []
+    if not resume:
+        _worker_analyzer._batch_sequential(image_files, output_dir, batch_size,
+                                           shard_results.append)
+        return shard_results
+    
+    # İşçiler aynı manifestoya kendi bağlantılarıyla yazar
+    _worker_analyzer._manifest = RunManifest(output_dir, verify_hash=verify_hash)
+    try:
+        _worker_analyzer._batch_sequential(image_files, output_dir, batch_size,
+                                           shard_results.append)
+        return shard_results
+    finally:
+        _worker_analyzer._manifest.close()
+        _worker_analyzer._manifest = None
+
+
 def main():
     """Ana fonksiyon - Örnek kullanım"""
     print("Metalik Malzeme Faz Analizi Sistemi")
@@ -0,0 +1,429 @@
+"""
+Görüntü Ön İşleme
+
+Bu modül docs/methodology.md'de tanımlanan ön işleme adımlarını (gürültü
+azaltma, CLAHE ile kontrast iyileştirme, normalizasyon) çıkarımda ve
+eğitim verisinin hazırlanmasında aynı şekilde uygulayan Preprocessor
+sınıfını içerir. Boyutlandırma modelin kendi ön işlemesinde yapılır.
+
+PhaseAnalyzer ön işlemeyi görüntüyü okuyan thread'de (pipeline modunda
+okuma havuzunda) çalıştırır; çıkarım aşaması ön işlemeyi beklemez. OpenCV
+CLAHE nesneleri thread güvenli olmadığından her thread kendi nesnesini bir
+kez oluşturur; ara buffer'lar da thread başına tutulur ve aynı boyuttaki
+görüntüler için yeniden kullanılır. Normalizasyon 256 kovalı histogramdan
+hesaplanan bir lookup tablosuyla (cv2.LUT) tek geçişte uygulanır.
+
+Ön işlenmiş görüntüler PreprocessCache ile sonuç önbelleğinin yanında
+saklanabilir; aynı görüntü farklı bir model veya eşikle tekrar analiz
+edildiğinde okuma ve ön işleme atlanır.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from image_discovery import iter_image_files
+
+
+DENOISE_METHODS = ('gaussian', 'median', 'bilateral')
+NORMALIZE_METHODS = ('minmax', 'percentile')
+
+PREPROCESS_PRESETS: Dict[str, Dict] = {
+    # docs/methodology.md 2.2: Gaussian blur, CLAHE ve normalizasyon
+    'methodology': {
+        'denoise': 'gaussian',
+        'denoise_kernel': 3,
+        'clahe_clip_limit': 2.0,
+        'clahe_tile_grid': 8,
+        'normalize': 'percentile'
+    },
+    'clahe': {
+        'clahe_clip_limit': 2.0,
+        'clahe_tile_grid': 8
+    }
+}
+
+
+class Preprocessor:
+    """Gürültü azaltma, CLAHE ve normalizasyondan oluşan ön işleme adımı"""
+    
+    def __init__(self, denoise: Optional[str] = None, denoise_kernel: int = 3,
+                 clahe_clip_limit: Optional[float] = None, clahe_tile_grid: int = 8,
+                 normalize: Optional[str] = None,
+                 percentiles: Tuple[float, float] = (1.0, 99.0),
+                 min_range: int = 16, grayscale: bool = False):
+        """
+        Args:
+            denoise: Gürültü azaltma yöntemi ('gaussian', 'median',
+                'bilateral' veya None)
+            denoise_kernel: Filtre çekirdeğinin kenar uzunluğu (tek sayı)
+            clahe_clip_limit: Verilirse CLAHE bu kırpma sınırıyla uygulanır
+                (renkli görüntülerde LAB uzayının L kanalına)
+            clahe_tile_grid: CLAHE ızgarasının bir kenarındaki hücre sayısı
+            normalize: 'minmax' veya 'percentile' ile yoğunluk aralığı
+                0-255'e gerdirilir
+            percentiles: 'percentile' normalizasyonunda siyah ve beyaza
+                eşlenecek yüzdelikler
+            min_range: Alt ve üst değer arasındaki fark bundan küçükse
+                (ör. boş görüntülerde) normalizasyon uygulanmaz; böylece
+                gürültü tam aralığa gerdirilmez
+            grayscale: True ise görüntü gri tonlu işlenir ve üç kanala
+                kopyalanır (renk bilgisi taşımayan mikroskop görüntüleri için
+                daha hızlıdır)
+        """
+        if denoise is not None and denoise not in DENOISE_METHODS:
+            raise ValueError(f"Bilinmeyen gürültü azaltma yöntemi: {denoise}")
+        if denoise_kernel < 1 or denoise_kernel % 2 == 0:
+            raise ValueError(f"denoise_kernel pozitif tek sayı olmalı: {denoise_kernel}")
+        if normalize is not None and normalize not in NORMALIZE_METHODS:
+            raise ValueError(f"Bilinmeyen normalizasyon yöntemi: {normalize}")
+        if not 0 <= percentiles[0] < percentiles[1] <= 100:
+            raise ValueError(f"Geçersiz yüzdelikler: {percentiles}")
+        
+        self.denoise = denoise
+        self.denoise_kernel = denoise_kernel
+        self.clahe_clip_limit = clahe_clip_limit
+        self.clahe_tile_grid = clahe_tile_grid
+        self.normalize = normalize
+        self.percentiles = (float(percentiles[0]), float(percentiles[1]))
+        self.min_range = min_range
+        self.grayscale = grayscale
+        # Thread başına CLAHE nesnesi ve ara buffer'lar
+        self._local = threading.local()
+    
+    @classmethod
+    def from_config(cls, config: Union[str, Dict]) -> 'Preprocessor':
+        """Hazır ayar adından, JSON dosyasından veya ayar sözlüğünden oluşturur"""
+        if isinstance(config, str):
+            if config in PREPROCESS_PRESETS:
+                config = PREPROCESS_PRESETS[config]
+            elif os.path.isfile(config):
+                with open(config, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            else:
+                raise ValueError(f"Bilinmeyen ön işleme ayarı: {config}")
+        return cls(**config)
+    
+    def settings(self) -> Dict:
+        """Çıktıyı etkileyen ayarlar (önbellek anahtarı, işçi süreçler ve eğitim için)"""
+        return {
+            'denoise': self.denoise,
+            'denoise_kernel': self.denoise_kernel,
+            'clahe_clip_limit': self.clahe_clip_limit,
+            'clahe_tile_grid': self.clahe_tile_grid,
+            'normalize': self.normalize,
+            'percentiles': list(self.percentiles),
+            'min_range': self.min_range,
+            'grayscale': self.grayscale
+        }
+    
+    def save(self, path: str):
+        """Ayarları from_config() ile okunabilecek bir JSON dosyasına yazar"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.settings(), f, indent=2)
+    
+    @property
+    def enabled(self) -> bool:
+        """En az bir adım açıksa True"""
+        return bool(self.denoise or self.clahe_clip_limit or self.normalize or self.grayscale)
+    
+    def __getstate__(self):
+        # threading.local işçi süreçlere aktarılamaz, her süreçte yeniden oluşturulur
+        state = dict(self.__dict__)
+        del state['_local']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+    
+    def __call__(self, image: np.ndarray) -> np.ndarray:
+        return self.apply(image)
+    
+    def apply(self, image: np.ndarray, inplace: bool = False) -> np.ndarray:
+        """
+        Ön işleme adımlarını sırayla (gürültü azaltma, CLAHE, normalizasyon) uygular
+        
+        Args:
+            image: uint8 BGR (H, W, 3) veya gri tonlu (H, W) görüntü
+            inplace: True ise sonuç image'ın üzerine yazılır (görüntü başka
+                bir yerde kullanılmıyorsa yeni bir dizi ayrılmaz)
+        
+        Returns:
+            np.ndarray: Girdiyle aynı boyutta ön işlenmiş görüntü
+        """
+        if image.dtype != np.uint8:
+            raise ValueError(f"Desteklenmeyen piksel tipi: {image.dtype}")
+        if not self.enabled:
+            return image
+        
+        out = image if inplace else np.empty_like(image)
+        if image.ndim == 2 or self.grayscale:
+            self._apply_gray(image, out)
+        else:
+            self._apply_color(image, out)
+        return out
+    
+    def _apply_gray(self, image: np.ndarray, out: np.ndarray):
+        """Tek kanal üzerinde işler; sonuç out'a (gri veya üç kanallı) yazılır"""
+        import cv2
+        height, width = image.shape[:2]
+        work = (self._buffer('gray_a', (height, width)),
+                self._buffer('gray_b', (height, width)))
+        
+        if image.ndim == 2:
+            current = image
+        else:
+            current = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=work[0])
+        
+        # Her adım boştaki buffer'a yazar; adımlar arasında bellek ayrılmaz
+        for step in (self._denoise, self._clahe_gray, self._normalize):
+            target = work[1] if current is work[0] else work[0]
+            current = step(current, target)
+        
+        if out.ndim == 2:
+            np.copyto(out, current)
+        else:
+            cv2.cvtColor(current, cv2.COLOR_GRAY2BGR, dst=out)
+    
+    def _apply_color(self, image: np.ndarray, out: np.ndarray):
+        """Üç kanallı görüntüyü işler; CLAHE yalnızca parlaklık (L) kanalına uygulanır"""
+        import cv2
+        height, width = image.shape[:2]
+        current = self._denoise(image, self._buffer('color', image.shape))
+        
+        if self.clahe_clip_limit:
+            lab = cv2.cvtColor(current, cv2.COLOR_BGR2LAB,
+                               dst=self._buffer('lab', image.shape))
+            lightness = cv2.extractChannel(lab, 0, dst=self._buffer('gray_a', (height, width)))
+            enhanced = self._clahe_gray(lightness, self._buffer('gray_b', (height, width)))
+            cv2.insertChannel(enhanced, lab, 0)
+            current = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=out)
+        
+        if self.normalize:
+            gray = cv2.cvtColor(current, cv2.COLOR_BGR2GRAY,
+                                dst=self._buffer('gray_a', (height, width)))
+            lut = self._stretch_lut(gray)
+            if lut is not None:
+                current = cv2.LUT(current, lut, dst=out)
+        
+        if current is not out:
+            np.copyto(out, current)
+    
+    def _denoise(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        import cv2
+        kernel = self.denoise_kernel
+        if self.denoise == 'gaussian':
+            return cv2.GaussianBlur(src, (kernel, kernel), 0, dst=dst)
+        if self.denoise == 'median':
+            return cv2.medianBlur(src, kernel, dst=dst)
+        if self.denoise == 'bilateral':
+            return cv2.bilateralFilter(src, kernel, 50, kernel, dst=dst)
+        return src
+    
+    def _clahe_gray(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        if not self.clahe_clip_limit:
+            return src
+        clahe = getattr(self._local, 'clahe', None)
+        if clahe is None:
+            import cv2
+            clahe = cv2.createCLAHE(clipLimit=self.clahe_clip_limit,
+                                    tileGridSize=(self.clahe_tile_grid, self.clahe_tile_grid))
+            self._local.clahe = clahe
+        return clahe.apply(src, dst=dst)
+    
+    def _normalize(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        if not self.normalize:
+            return src
+        import cv2
+        lut = self._stretch_lut(src)
+        return src if lut is None else cv2.LUT(src, lut, dst=dst)
+    
+    def _stretch_lut(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """Gri tonlu görüntünün histogramından yoğunluk gerdirme tablosunu hesaplar"""
+        import cv2
+        histogram = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        cdf = np.cumsum(histogram)
+        low_percentile, high_percentile = (
+            (0.0, 100.0) if self.normalize == 'minmax' else self.percentiles
+        )
+        # En az bir pikselin bulunduğu ilk ve son kovalar (minmax) veya yüzdelikler
+        low = int(np.searchsorted(cdf, max(cdf[-1] * low_percentile / 100.0, 1.0)))
+        high = int(np.searchsorted(cdf, cdf[-1] * high_percentile / 100.0))
+        if high - low < self.min_range:
+            return None
+        
+        scale = 255.0 / (high - low)
+        return np.clip((np.arange(256) - low) * scale, 0, 255).round().astype(np.uint8)
+    
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Thread'e ait, verilen boyutta yeniden kullanılabilir uint8 buffer"""
+        local = self._local
+        # Boyut değişince eski buffer'lar bırakılır; bellek son görüntü boyutuyla sınırlı kalır
+        if getattr(local, 'size', None) != shape[:2]:
+            local.size = shape[:2]
+            local.buffers = {}
+        buffer = local.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = local.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+
+class PreprocessCache:
+    """
+    Ön işlenmiş görüntülerin boyutu sınırlı disk önbelleği
+    
+    Görüntüler .npy dosyaları olarak saklanır ve tekrar okunurken çözülmeleri
+    gerekmez. Anahtar dosyanın yolu, boyutu, değişiklik zamanı ve ön işleme
+    ayarlarından türetilir; içerik özeti hesaplanmaz. Toplam boyut max_bytes'ı
+    aştığında en uzun süredir kullanılmayan dosyalar silinir.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 4 << 30):
+        """
+        Args:
+            cache_dir: Önbellek klasörü
+            max_bytes: Önbelleğin maksimum toplam boyutu (bayt)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                          if entry.name.endswith('.npy'))
+    
+    def key(self, image_path: str, settings: Dict) -> str:
+        """Dosyanın durumundan ve ayarlardan önbellek anahtarı oluşturur"""
+        stat = os.stat(image_path)
+        payload = json.dumps({
+            'path': os.path.abspath(image_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'settings': settings
+        }, sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Anahtara ait görüntüyü döndürür, yoksa None döndürür"""
+        path = self.cache_dir / f"{key}.npy"
+        try:
+            image = np.load(str(path))
+            # Erişim zamanı LRU tahliyesi için güncellenir
+            os.utime(str(path))
+        except (OSError, ValueError):
+            return None
+        return image
+    
+    def put(self, key: str, image: np.ndarray):
+        """Görüntüyü atomik olarak yazar ve gerekirse eski kayıtları tahliye eder"""
+        path = self.cache_dir / f"{key}.npy"
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, image)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._total += path.stat().st_size
+            if self._total > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        """Toplam boyut sınırın altına inene kadar en eski dosyaları siler"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        # Diğer süreçlerin yazdıkları da hesaba katılır
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
+
+
+def preprocess_dataset(data_dir: str, output_dir: str, preprocessor: Preprocessor,
+                       num_workers: Optional[int] = None,
+                       jpeg_quality: int = 95) -> Dict[str, int]:
+    """
+    YOLO veri setindeki görüntüleri ön işleyip etiketleriyle birlikte output_dir'e yazar
+    
+    data_dir/images altındaki görüntüler aynı göreli yollarla
+    output_dir/images altına, data_dir/labels altındaki etiketler de
+    output_dir/labels altına kopyalanır. Hedefi kaynaktan yeni olan dosyalar
+    atlanır; ayarlar output_dir/preprocessing.json'a yazılır ve değişmişse
+    tüm görüntüler yeniden işlenir.
+    
+    Args:
+        data_dir: images/ ve labels/ klasörlerini içeren veri seti
+        output_dir: Ön işlenmiş veri setinin yazılacağı klasör
+        preprocessor: Çıkarımda da kullanılacak ön işleme
+        num_workers: Ön işleme thread sayısı (varsayılan CPU sayısı)
+        jpeg_quality: JPEG olarak yeniden kaydedilen görüntülerin kalitesi
+    
+    Returns:
+        Dict[str, int]: İşlenen ve atlanan görüntü sayıları
+    """
+    import cv2
+    
+    data_dir = Path(os.path.abspath(data_dir))
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    settings_path = output_dir / 'preprocessing.json'
+    previous = None
+    if settings_path.exists():
+        with open(settings_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    force = previous != preprocessor.settings()
+    
+    def process(image_file: Path) -> bool:
+        target = output_dir / image_file.relative_to(data_dir)
+        if (not force and target.exists()
+                and target.stat().st_mtime >= image_file.stat().st_mtime):
+            return False
+        image = cv2.imread(str(image_file))
+        if image is None:
+            raise ValueError(f"Görüntü okunamadı: {image_file}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        params = ([cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+                  if target.suffix.lower() in ('.jpg', '.jpeg') else [])
+        if not cv2.imwrite(str(target), preprocessor.apply(image, inplace=True), params):
+            raise ValueError(f"Görüntü yazılamadı: {target}")
+        return True
+    
+    counts = {'processed': 0, 'skipped': 0}
+    with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count()) as pool:
+        for processed in pool.map(process, iter_image_files(str(data_dir / 'images'))):
+            counts['processed' if processed else 'skipped'] += 1
+    
+    labels_dir = data_dir / 'labels'
+    if labels_dir.is_dir():
+        for label_file in labels_dir.rglob('*.txt'):
+            target = output_dir / label_file.relative_to(data_dir)
+            if target.exists() and target.stat().st_mtime >= label_file.stat().st_mtime:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(label_file, target)
+    
+    # Ayarlar yalnızca tüm görüntüler yazıldıktan sonra güncellenir
+    preprocessor.save(str(settings_path))
+    print(f"Ön işleme tamamlandı: {counts['processed']} görüntü işlendi, "
+          f"{counts['skipped']} güncel görüntü atlandı ({output_dir})")
+    return counts
@@ -0,0 +1,207 @@
+"""
+Analiz Sonuçları için Kalıcı Önbellek
+
+Bu modül analyze_image() sonuçlarını içerik adresli (content-addressed)
+bir anahtar altında diskte saklamak için gerekli sınıfı içerir. Anahtar;
+görüntü içeriğinin özeti, model dosyasının özeti, güven eşiği ve ön işleme
+ayarlarından türetilir. Böylece aynı arşiv tekrar işlendiğinde model
+çalıştırılmadan saklanan tespitler döndürülür.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Dosya içeriğinin BLAKE2b özetini hesaplar"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    """Bellekteki dosya içeriğinin BLAKE2b özetini hesaplar (file_digest ile aynı)"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def make_cache_key(image_digest: str, model_digest: str, confidence_threshold: float,
+                   settings: Dict) -> str:
+    """Görüntü, model ve ayarlardan önbellek anahtarı oluşturur"""
+    payload = json.dumps({
+        'image': image_digest,
+        'model': model_digest,
+        'confidence_threshold': confidence_threshold,
+        'settings': settings
+    }, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """
+    Boyutu sınırlı, LRU tahliyeli kalıcı sonuç önbelleği
+    
+    Kayıtlar cache_dir içindeki bir SQLite veritabanında JSON olarak tutulur.
+    Toplam boyut max_bytes'ı aştığında en uzun süredir kullanılmayan kayıtlar
+    silinir. Aynı önbellek birden fazla thread veya süreç tarafından
+    paylaşılabilir.
+    
+    Toplam boyut her yazmada yeniden hesaplanmaz, bellekte tutulur; sınır
+    aşıldığında diğer süreçlerin yazdıkları da görülsün diye veritabanından
+    yeniden okunur ve boyut sınırın EVICT_TARGET oranına indirilir. İsabetlerin
+    son erişim zamanları bellekte biriktirilir ve ACCESS_FLUSH_SIZE kayıtta
+    bir, yazmalarla aynı işlemde (transaction) veritabanına yazılır; böylece
+    okumalar yazma işlemine dönüşmez.
+    """
+    
+    # Tahliye, toplam boyutu max_bytes'ın bu oranına indirir
+    EVICT_TARGET = 0.9
+    # Bu sayıda isabet biriktiğinde son erişim zamanları yazılır
+    ACCESS_FLUSH_SIZE = 256
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 1 << 30):
+        """
+        Args:
+            cache_dir: Önbellek veritabanının bulunduğu klasör
+            max_bytes: Önbelleğin maksimum toplam boyutu (bayt)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        # Henüz yazılmamış son erişim zamanları: anahtar -> zaman
+        self._pending_access: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.cache_dir / 'results.sqlite'),
+                                     timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)'
+        )
+        self._total_bytes = self._stored_bytes()
+        # Sınır küçültülmüş olabilir, mevcut kayıtları yeni sınıra indir
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Anahtara ait kaydı döndürür, yoksa None döndürür"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._pending_access[key] = time.time()
+            if len(self._pending_access) >= self.ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+        return json.loads(row[0])
+    
+    def put(self, key: str, value: Dict):
+        """Kaydı önbelleğe yazar ve gerekirse eski kayıtları tahliye eder"""
+        data = json.dumps(value, default=json_default)
+        with self._lock:
+            previous = self._conn.execute(
+                'SELECT size FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_access) '
+                'VALUES (?, ?, ?, ?)', (key, data, len(data), time.time())
+            )
+            self._pending_access.pop(key, None)
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._flush_access()
+            self._conn.commit()
+    
+    def _stored_bytes(self) -> int:
+        """Veritabanındaki kayıtların toplam boyutu"""
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+    
+    def _flush_access(self):
+        """Biriken son erişim zamanlarını yazar (commit çağırana aittir)"""
+        if not self._pending_access:
+            return
+        self._conn.executemany('UPDATE entries SET last_access = ? WHERE key = ?',
+                               [(accessed, key) for key, accessed
+                                in self._pending_access.items()])
+        self._pending_access.clear()
+    
+    def _evict(self, batch_size: int = 64):
+        """Toplam boyut hedefin altına inene kadar en eski kayıtları siler"""
+        self._flush_access()
+        # Diğer süreçlerin yazdıkları ve sildikleri de hesaba katılır
+        self._total_bytes = self._stored_bytes()
+        target = self.max_bytes * self.EVICT_TARGET
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY last_access LIMIT ?', (batch_size,)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+    
+    def clear(self):
+        """Önbellekteki tüm kayıtları siler"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+            self._pending_access.clear()
+            self._total_bytes = 0
+    
+    def stats(self) -> Dict:
+        """İsabet/ıskalama sayaçlarını ve önbellek boyutunu döndürür"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size
+        }
+    
+    def close(self):
+        """Biriken erişim zamanlarını yazar ve veritabanı bağlantısını kapatır"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
+
+
+def json_default(value):
+    """numpy skalerlerini ve dizilerini JSON'a dönüştürür"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"JSON'a dönüştürülemeyen tip: {type(value)}")
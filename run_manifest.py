@@ -0,0 +1,170 @@
+"""
+Batch İşleme için Çalışma Manifestosu
+
+Bu modül batch_analyze() çalışmalarını kaldığı yerden devam ettirebilmek
+için output_dir içinde tutulan manifestoyu içerir. Manifesto işlenen her
+dosyanın boyutunu, değiştirilme zamanını (isteğe bağlı olarak içerik
+özetini), durumunu ve analiz sonucunu saklar. Böylece yarıda kalan bir
+çalışma yeniden başlatıldığında yalnızca yeni, değişmiş veya başarısız
+olmuş dosyalar işlenir ve özet rapor saklanan sonuçlardan yeniden üretilir.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from result_cache import file_digest, json_default
+
+
+MANIFEST_NAME = 'manifest.sqlite'
+
+
+class RunManifest:
+    """output_dir içindeki SQLite tabanlı çalışma manifestosu"""
+    
+    def __init__(self, output_dir: str, verify_hash: bool = False):
+        """
+        Args:
+            output_dir: batch_analyze() çıktı klasörü
+            verify_hash: True ise dosyaların değişip değişmediği boyut ve
+                değiştirilme zamanına ek olarak içerik özetiyle de kontrol edilir
+        """
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.verify_hash = verify_hash
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+            'digest TEXT, status TEXT NOT NULL, error TEXT, result TEXT, '
+            'updated REAL NOT NULL)'
+        )
+        self._conn.commit()
+    
+    def _signature(self, image_path: str) -> Dict:
+        """Dosyanın değişiklik kontrolünde kullanılan imzası"""
+        stat = os.stat(image_path)
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': file_digest(image_path) if self.verify_hash else None
+        }
+    
+    def is_done(self, image_path: str) -> bool:
+        """Dosya daha önce başarıyla işlendiyse ve değişmediyse True döndürür"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, digest, status FROM files WHERE path = ?',
+                (_key(image_path),)
+            ).fetchone()
+        if row is None or row[3] != 'done':
+            return False
+        
+        size, mtime_ns, digest, _ = row
+        stat = os.stat(image_path)
+        if stat.st_size != size:
+            return False
+        if self.verify_hash:
+            # İçerik özeti, yalnızca zaman damgası değişmiş kopyaları da yakalar
+            return digest is not None and file_digest(image_path) == digest
+        return stat.st_mtime_ns == mtime_ns
+    
+    def pending(self, image_files: Iterable[Path]) -> List[Path]:
+        """İşlenmesi gereken (yeni, değişmiş veya başarısız) dosyaları döndürür"""
+        return [image_file for image_file in image_files
+                if not self.is_done(str(image_file))]
+    
+    def record_success(self, image_path: str, results: Dict):
+        """Başarıyla işlenen dosyayı sonucu ile birlikte kaydeder"""
+        self._record(image_path, 'done', None, json.dumps(results, default=json_default))
+    
+    def record_failure(self, image_path: str, error: Exception):
+        """Başarısız olan dosyayı hata mesajı ile birlikte kaydeder"""
+        self._record(image_path, 'failed', str(error), None)
+    
+    def _record(self, image_path: str, status: str, error: Optional[str],
+                result: Optional[str]):
+        try:
+            signature = self._signature(image_path)
+        except OSError:
+            signature = {'size': -1, 'mtime_ns': -1, 'digest': None}
+        
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO files '
+                '(path, size, mtime_ns, digest, status, error, result, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (_key(image_path), signature['size'], signature['mtime_ns'],
+                 signature['digest'], status, error, result, time.time())
+            )
+            self._conn.commit()
+    
+    def load_results(self, image_files: Optional[Iterable[Path]] = None) -> List[Dict]:
+        """
+        Saklanan başarılı sonuçları döndürür
+        
+        Args:
+            image_files: Verilirse yalnızca bu dosyaların sonuçları, bu sırayla
+                döndürülür; aksi halde tüm sonuçlar yol sırasıyla döndürülür
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, result FROM files WHERE status = 'done' ORDER BY path"
+            ).fetchall()
+        stored = {path: result for path, result in rows}
+        
+        if image_files is None:
+            ordered = [stored[path] for path, _ in rows]
+        else:
+            ordered = [stored[_key(str(image_file))] for image_file in image_files
+                       if _key(str(image_file)) in stored]
+        
+        results_list = []
+        for data in ordered:
+            results = json.loads(data)
+            results['image_shape'] = tuple(results['image_shape'])
+            results_list.append(results)
+        return results_list
+    
+    def iter_results(self, image_files: Iterable[Path]) -> Iterator[Dict]:
+        """
+        Verilen dosyaların saklanan başarılı sonuçlarını sırayla, tek tek döndürür
+        
+        load_results()'ın aksine sonuçları belleğe toplamaz.
+        """
+        for image_file in image_files:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT result FROM files WHERE path = ? AND status = 'done'",
+                    (_key(str(image_file)),)
+                ).fetchone()
+            if row is not None:
+                results = json.loads(row[0])
+                results['image_shape'] = tuple(results['image_shape'])
+                yield results
+    
+    def counts(self) -> Dict[str, int]:
+        """Durum bazında dosya sayılarını döndürür"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT status, COUNT(*) FROM files GROUP BY status'
+            ).fetchall()
+        return dict(rows)
+    
+    def close(self):
+        """Veritabanı bağlantısını kapatır"""
+        with self._lock:
+            self._conn.close()
+
+
+def _key(image_path: str) -> str:
+    """Manifestoda kullanılan normalize edilmiş dosya yolu"""
+    return os.path.abspath(image_path)
+
@@ -0,0 +1,727 @@
+"""
+U-Net Segmentasyon Motoru
+
+Bu modül Unet_v1 defterindeki U-Net modelini, eğitim döngüsünü ve tam
+çözünürlükte döşemeli CPU çıkarımını içerir. YOLO kutularının aksine
+U-Net piksel maskeleri ürettiğinden faz oranları doğrudan piksel
+sayılarından hesaplanır.
+
+Çıkarım:
+    - Görüntü örtüşen döşemelere bölünür ve döşemeler batch'ler halinde
+      modele verilir; defterdeki gibi 256×256'ya küçültülmez
+    - Döşeme çıktıları kenarlara doğru azalan ağırlıklarla toplanır
+      (overlap blending); böylece döşeme sınırlarında kesiklik oluşmaz
+    - Toplama, döşeme satırı yüksekliğinde kayan bir buffer'da yapılır;
+      tamamlanan satırlar hemen uint8 indeks maskesine çevrilir ve
+      histogramları np.bincount ile çıkarılır. Bellek kullanımı görüntü
+      yüksekliğinden bağımsızdır
+    - Model channels_last bellek düzeninde, TorchScript ile derlenmiş
+      (torchscript) veya kalibrasyon görüntüleriyle INT8 kuantize edilmiş
+      (quantized) olarak çalıştırılabilir
+
+İndeks maskeleri annotation_converter ile aynı düzendedir: 0 arka plan,
+diğer değerler faz sınıf indeksi + 1.
+
+Kullanım:
+    python segmentation.py train --shards data/shards --output models/unet_phase.pth
+    python segmentation.py export models/unet_phase.pth --variant quantized \\
+        --calibration-dir data/annotations/images/val
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from image_discovery import iter_image_files
+from stage_metrics import add_timing
+from tiled_inference import ImageSource, compute_tiles
+
+
+SEGMENTATION_VARIANTS = ('eager', 'torchscript', 'quantized')
+
+# Bu uzantılardaki dosyalar export_segmentation_model çıktısı (TorchScript) sayılır
+TORCHSCRIPT_SUFFIXES = ('.ts', '.torchscript')
+
+# tile_size verilmezse kullanılan döşeme boyutu (8'in katı olmalı)
+DEFAULT_SEGMENTATION_TILE_SIZE = 512
+
+# Defterdeki ikili model perlit maskeleriyle eğitildi (bkz. unet_perlit_v*.pth)
+DEFAULT_BINARY_CLASS_ID = 1
+
+# Döşeme kenarları modelin üç havuzlama katmanı için bu sayının katına tamamlanır
+_SIZE_DIVISOR = 8
+
+
+class UNet(nn.Module):
+    """
+    Unet_v1 defterindeki U-Net (üç kodlayıcı seviyesi ve darboğaz)
+    
+    Katman adları defterdekiyle aynı olduğundan defterde kaydedilen
+    checkpoint'ler doğrudan yüklenir. out_channels=1 ikili segmentasyon
+    (logit > 0), daha büyük değerler arka plan + faz sınıfları içindir.
+    """
+    
+    def __init__(self, in_channels: int = 3, out_channels: int = 1):
+        super().__init__()
+        
+        def conv_block(in_c: int, out_c: int) -> nn.Sequential:
+            return nn.Sequential(
+                nn.Conv2d(in_c, out_c, kernel_size=3, padding=1),
+                nn.ReLU(inplace=True),
+                nn.Conv2d(out_c, out_c, kernel_size=3, padding=1),
+                nn.ReLU(inplace=True)
+            )
+        
+        self.encoder1 = conv_block(in_channels, 64)
+        self.encoder2 = conv_block(64, 128)
+        self.encoder3 = conv_block(128, 256)
+        
+        self.pool = nn.MaxPool2d(2, 2)
+        
+        self.bottleneck = conv_block(256, 512)
+        
+        self.upconv3 = nn.ConvTranspose2d(512, 256, kernel_size=2, stride=2)
+        self.decoder3 = conv_block(512, 256)
+        self.upconv2 = nn.ConvTranspose2d(256, 128, kernel_size=2, stride=2)
+        self.decoder2 = conv_block(256, 128)
+        self.upconv1 = nn.ConvTranspose2d(128, 64, kernel_size=2, stride=2)
+        self.decoder1 = conv_block(128, 64)
+        
+        self.final_conv = nn.Conv2d(64, out_channels, kernel_size=1)
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        enc1 = self.encoder1(x)
+        enc2 = self.encoder2(self.pool(enc1))
+        enc3 = self.encoder3(self.pool(enc2))
+        
+        bottleneck = self.bottleneck(self.pool(enc3))
+        
+        dec3 = self.decoder3(torch.cat([self.upconv3(bottleneck), enc3], dim=1))
+        dec2 = self.decoder2(torch.cat([self.upconv2(dec3), enc2], dim=1))
+        dec1 = self.decoder1(torch.cat([self.upconv1(dec2), enc1], dim=1))
+        
+        return self.final_conv(dec1)
+
+
+class SegmentationModel:
+    """
+    Derlenmiş veya eager U-Net'i BGR döşemeler üzerinde çalıştıran sarmalayıcı
+    
+    Girdi defterdeki ToTensor ile aynıdır: RGB, [0, 1] aralığında,
+    normalizasyonsuz. Aynı nesne aynı anda birden fazla thread'den
+    çağrılmamalıdır.
+    """
+    
+    def __init__(self, module, out_channels: int, class_ids: Sequence[int],
+                 channels_last: bool = True, variant: str = 'eager'):
+        """
+        Args:
+            module: Değerlendirme modundaki model (nn.Module veya TorchScript)
+            out_channels: Model çıktı kanalı sayısı
+            class_ids: Çıktı sınıflarının faz sınıf indeksleri (ikili modelde
+                tek eleman, çok sınıflıda arka plan hariç kanal 1, 2, ...)
+            channels_last: Girdiler NHWC bellek düzeninde verilir
+            variant: Modelin çalıştırılma şekli (bilgi amaçlı)
+        """
+        expected = 1 if out_channels == 1 else out_channels - 1
+        if len(class_ids) != expected:
+            raise ValueError(f"{out_channels} çıktı kanalı için {expected} sınıf "
+                             f"indeksi gerekli: {list(class_ids)}")
+        
+        self.module = module
+        self.out_channels = out_channels
+        self.class_ids = [int(class_id) for class_id in class_ids]
+        self.channels_last = channels_last
+        self.variant = variant
+        # Arg-max (veya ikili eşik) sonucu → maske değeri (faz indeksi + 1)
+        self.value_lut = np.array([0] + [class_id + 1 for class_id in self.class_ids],
+                                  dtype=np.uint8)
+        # Son predict_logits çağrısında döşeme başına süreler (ms)
+        self.speed = {'preprocess': 0.0, 'inference': 0.0, 'postprocess': 0.0}
+    
+    def metadata(self) -> Dict:
+        """TorchScript dosyasına yazılan model bilgileri"""
+        return {'out_channels': self.out_channels, 'class_ids': self.class_ids,
+                'variant': self.variant}
+    
+    def predict_logits(self, tiles: List[np.ndarray]) -> np.ndarray:
+        """
+        Aynı boyuttaki BGR döşemeleri tek çağrıda modelden geçirir
+        
+        Returns:
+            np.ndarray: (N, out_channels, H, W) boyutlu float32 logit'ler
+        """
+        import cv2
+        
+        started = time.perf_counter()
+        height, width = tiles[0].shape[:2]
+        if any(tile.shape[:2] != (height, width) for tile in tiles):
+            raise ValueError("Bir batch'teki döşemeler aynı boyutta olmalı")
+        padded_h = -(-height // _SIZE_DIVISOR) * _SIZE_DIVISOR
+        padded_w = -(-width // _SIZE_DIVISOR) * _SIZE_DIVISOR
+        
+        batch = np.empty((len(tiles), padded_h, padded_w, 3), dtype=np.uint8)
+        for i, tile in enumerate(tiles):
+            if (padded_h, padded_w) != (height, width):
+                tile = cv2.copyMakeBorder(tile, 0, padded_h - height, 0, padded_w - width,
+                                          cv2.BORDER_REFLECT_101)
+            cv2.cvtColor(tile, cv2.COLOR_BGR2RGB, dst=batch[i])
+        
+        # NHWC bayt dizisinin NCHW görünümü zaten channels_last düzenindedir
+        inputs = torch.from_numpy(batch).permute(0, 3, 1, 2).float().div_(255.0)
+        if not self.channels_last:
+            inputs = inputs.contiguous()
+        preprocessed = time.perf_counter()
+        
+        with torch.inference_mode():
+            outputs = self.module(inputs)
+        inferred = time.perf_counter()
+        
+        logits = outputs.float().numpy()[:, :, :height, :width]
+        count = len(tiles)
+        self.speed = {
+            'preprocess': (preprocessed - started) * 1000.0 / count,
+            'inference': (inferred - preprocessed) * 1000.0 / count,
+            'postprocess': (time.perf_counter() - inferred) * 1000.0 / count
+        }
+        return logits
+    
+    def labels(self, scores: np.ndarray) -> np.ndarray:
+        """(C, H, W) toplanmış skorları uint8 indeks maskesine çevirir"""
+        if self.out_channels == 1:
+            return self.value_lut[(scores[0] > 0).view(np.uint8)]
+        return self.value_lut[scores.argmax(axis=0)]
+
+
+def _read_checkpoint(model_path: str) -> Tuple[Dict, Dict]:
+    """Checkpoint'ten ağırlıkları ve (varsa) model bilgilerini okur"""
+    checkpoint = torch.load(model_path, map_location='cpu')
+    # Defter {'model_state_dict': ...} kaydeder; yalın state_dict de kabul edilir
+    state_dict = checkpoint.get('model_state_dict', checkpoint)
+    metadata = {key: checkpoint[key] for key in ('out_channels', 'class_ids')
+                if key in checkpoint}
+    metadata.setdefault('out_channels', int(state_dict['final_conv.weight'].shape[0]))
+    return state_dict, metadata
+
+
+def _default_class_ids(out_channels: int) -> List[int]:
+    return ([DEFAULT_BINARY_CLASS_ID] if out_channels == 1
+            else list(range(out_channels - 1)))
+
+
+def _calibration_tiles(calibration_dir: str, tile_size: int,
+                       max_tiles: int) -> List[np.ndarray]:
+    """Kuantizasyon kalibrasyonu için görüntülerden tam boyutlu döşemeler okur"""
+    import cv2
+    
+    tiles = []
+    for image_file in sorted(iter_image_files(calibration_dir)):
+        image = cv2.imread(str(image_file))
+        if image is None:
+            continue
+        source = ImageSource(image)
+        for tile in compute_tiles(image.shape[0], image.shape[1], tile_size, 0.0):
+            tile = source.read_tile(tile)
+            # Döşemeden küçük görüntüler batch'e girebilmek için aynalanarak büyütülür
+            height, width = tile.shape[:2]
+            if (height, width) != (tile_size, tile_size):
+                tile = cv2.copyMakeBorder(tile, 0, tile_size - height, 0, tile_size - width,
+                                          cv2.BORDER_REFLECT_101)
+            tiles.append(tile)
+            if len(tiles) >= max_tiles:
+                return tiles
+    if not tiles:
+        raise ValueError(f"Kalibrasyon görüntüsü bulunamadı: {calibration_dir}")
+    return tiles
+
+
+def _quantize(model: UNet, calibration_tiles: List[np.ndarray],
+              wrapper: SegmentationModel) -> nn.Module:
+    """Modeli FX graph mode ile statik INT8 kuantize eder (x86 / fbgemm)"""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+    
+    example = torch.zeros(1, 3, _SIZE_DIVISOR * 8, _SIZE_DIVISOR * 8)
+    prepared = prepare_fx(model, get_default_qconfig_mapping('x86'), (example,))
+    
+    # Aktivasyon aralıkları gerçek döşemelerden gözlemlenir
+    wrapper.module = prepared
+    wrapper.channels_last = False
+    for start in range(0, len(calibration_tiles), 4):
+        wrapper.predict_logits(calibration_tiles[start:start + 4])
+    return convert_fx(prepared)
+
+
+def _compile_checkpoint(model_path: str, variant: str, channels_last: bool,
+                        class_ids: Optional[Sequence[int]], calibration_dir: Optional[str],
+                        calibration_tiles: int, tile_size: int) -> SegmentationModel:
+    """Checkpoint'i yükler; torchscript/quantized varyantında trace edip dondurur"""
+    state_dict, metadata = _read_checkpoint(model_path)
+    out_channels = metadata['out_channels']
+    class_ids = class_ids or metadata.get('class_ids') or _default_class_ids(out_channels)
+    
+    model = UNet(out_channels=out_channels)
+    model.load_state_dict(state_dict)
+    model.eval()
+    wrapper = SegmentationModel(model, out_channels, class_ids,
+                                channels_last=channels_last, variant=variant)
+    
+    if variant == 'quantized':
+        if not calibration_dir:
+            raise ValueError("quantized varyantı için calibration_dir verilmeli")
+        model = _quantize(model, _calibration_tiles(calibration_dir, tile_size,
+                                                    calibration_tiles), wrapper)
+    elif channels_last:
+        model = model.to(memory_format=torch.channels_last)
+    wrapper.module = model
+    # Kuantize çekirdekler NCHW girdiyle çalışır
+    wrapper.channels_last = channels_last and variant != 'quantized'
+    
+    if variant != 'eager':
+        example = torch.zeros(1, 3, tile_size, tile_size)
+        if wrapper.channels_last:
+            example = example.contiguous(memory_format=torch.channels_last)
+        with torch.inference_mode():
+            wrapper.module = torch.jit.freeze(torch.jit.trace(model, example).eval())
+    return wrapper
+
+
+def load_segmentation_model(model_path: str, variant: str = 'eager',
+                            channels_last: bool = True,
+                            class_ids: Optional[Sequence[int]] = None,
+                            calibration_dir: Optional[str] = None,
+                            calibration_tiles: int = 32,
+                            tile_size: int = DEFAULT_SEGMENTATION_TILE_SIZE,
+                            num_threads: Optional[int] = None) -> SegmentationModel:
+    """
+    U-Net checkpoint'ini veya dışa aktarılmış TorchScript dosyasını yükler
+    
+    Args:
+        model_path: .pth checkpoint (train_unet veya defter çıktısı) ya da
+            export_segmentation_model ile yazılmış .ts dosyası
+        variant: 'eager', 'torchscript' (trace + freeze) veya 'quantized'
+            (statik INT8; calibration_dir gerekir). TorchScript dosyalarında
+            dosyaya kaydedilen varyant kullanılır
+        channels_last: Model ve girdiler NHWC bellek düzeninde çalıştırılır
+        class_ids: Çıktı sınıflarının faz indeksleri; checkpoint'te yoksa ve
+            verilmezse ikili modelde Perlit, çok sınıflıda 0, 1, ... kullanılır
+        calibration_dir: Kuantizasyon kalibrasyonu için görüntü klasörü
+        calibration_tiles: Kalibrasyonda kullanılacak döşeme sayısı
+        tile_size: Kalibrasyon ve trace döşemelerinin boyutu
+        num_threads: Verilirse torch intra-op thread sayısı
+    
+    Returns:
+        SegmentationModel: Çıkarıma hazır model
+    """
+    if variant not in SEGMENTATION_VARIANTS:
+        raise ValueError(f"Bilinmeyen segmentasyon varyantı: {variant}")
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    
+    if Path(model_path).suffix.lower() in TORCHSCRIPT_SUFFIXES:
+        extra_files = {'segmentation.json': ''}
+        module = torch.jit.load(model_path, map_location='cpu', _extra_files=extra_files)
+        metadata = json.loads(extra_files['segmentation.json'])
+        model = SegmentationModel(module.eval(), metadata['out_channels'],
+                                  class_ids or metadata['class_ids'],
+                                  channels_last=channels_last and metadata['variant'] != 'quantized',
+                                  variant=metadata['variant'])
+    else:
+        model = _compile_checkpoint(model_path, variant, channels_last, class_ids,
+                                    calibration_dir, calibration_tiles, tile_size)
+    
+    # Conv + ReLU birleştirme gibi optimizasyonlar dosyaya kaydedilemediğinden
+    # yüklemede uygulanır; kuantize grafta ek bir kazancı yoktur
+    if model.variant == 'torchscript':
+        model.module = torch.jit.optimize_for_inference(model.module)
+    return model
+
+
+def export_segmentation_model(model_path: str, output_path: Optional[str] = None,
+                              variant: str = 'torchscript', channels_last: bool = True,
+                              class_ids: Optional[Sequence[int]] = None,
+                              calibration_dir: Optional[str] = None,
+                              calibration_tiles: int = 32,
+                              tile_size: int = DEFAULT_SEGMENTATION_TILE_SIZE) -> str:
+    """
+    Checkpoint'i derlenmiş TorchScript dosyası olarak dışa aktarır
+    
+    Kuantizasyon kalibrasyonu ve derleme bir kez yapılır; PhaseAnalyzer
+    (ve process modundaki her işçi) .ts dosyasını doğrudan yükler.
+    
+    Args:
+        model_path: .pth checkpoint
+        output_path: Çıktı dosyası (varsayılan: <model>_<variant>.ts)
+        variant: 'torchscript' veya 'quantized'
+        channels_last, class_ids, calibration_dir, calibration_tiles,
+            tile_size: Bkz. load_segmentation_model
+    
+    Returns:
+        str: Yazılan dosyanın yolu
+    """
+    if variant not in ('torchscript', 'quantized'):
+        raise ValueError("Dışa aktarma için 'torchscript' veya 'quantized' seçilmeli")
+    model = _compile_checkpoint(model_path, variant, channels_last, class_ids,
+                                calibration_dir, calibration_tiles, tile_size)
+    output_path = output_path or str(Path(model_path).with_name(
+        f"{Path(model_path).stem}_{variant}.ts"))
+    torch.jit.save(model.module, output_path,
+                   _extra_files={'segmentation.json': json.dumps(model.metadata())})
+    print(f"Segmentasyon modeli dışa aktarıldı: {output_path}")
+    return output_path
+
+
+def _blend_window(height: int, width: int, ramp: int) -> np.ndarray:
+    """Kenarlara doğru ramp piksel boyunca doğrusal azalan (sıfır olmayan) ağırlıklar"""
+    def profile(length: int) -> np.ndarray:
+        index = np.arange(length)
+        return np.minimum(np.minimum(index + 1, length - index), ramp) / float(ramp)
+    return np.outer(profile(height), profile(width)).astype(np.float32)
+
+
+def segment_image(model: SegmentationModel, source: ImageSource,
+                  tile_size: int = DEFAULT_SEGMENTATION_TILE_SIZE,
+                  overlap: float = 0.25, batch_size: int = 8,
+                  timings: Optional[Dict[str, float]] = None
+                  ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Görüntüyü tam çözünürlükte döşemeler halinde segmente eder
+    
+    Örtüşen bölgelerde logit'ler döşeme kenarına uzaklıkla artan
+    ağırlıklarla toplanır. Ağırlıklar her pikselde pozitif olduğundan
+    toplamın arg-max'ı (veya işareti) ağırlıklı ortalamanınkiyle aynıdır;
+    normalizasyon gerekmez.
+    
+    Args:
+        model: load_segmentation_model çıktısı
+        source: Görüntü kaynağı (döşemeler tembel okunur)
+        tile_size: Döşeme kenar uzunluğu (8'in katı olması önerilir)
+        overlap: Komşu döşemeler arasındaki örtüşme oranı
+        batch_size: Tek model çağrısındaki döşeme sayısı
+        timings: Verilirse ön işleme, çıkarım ve birleştirme süreleri eklenir
+    
+    Returns:
+        Tuple: (H, W) uint8 indeks maskesi ve maske değerlerinin 256
+            elemanlı histogramı
+    """
+    height, width = source.shape[:2]
+    tiles = compute_tiles(height, width, tile_size, overlap)
+    ramp = max(1, int(round(tile_size * overlap)))
+    windows: Dict[Tuple[int, int], np.ndarray] = {}
+    
+    mask = np.empty((height, width), dtype=np.uint8)
+    histogram = np.zeros(256, dtype=np.int64)
+    # Döşeme satırı yüksekliğinde kayan toplama buffer'ı; scores[0] = satır `top`
+    band_height = min(tile_size, height)
+    scores = np.zeros((model.out_channels, band_height, width), dtype=np.float32)
+    top = 0
+    
+    def flush(bottom: int):
+        # bottom'dan önceki satırlara sonraki döşemeler katkı yapmaz
+        rows = bottom - top
+        labels = model.labels(scores[:, :rows])
+        mask[top:bottom] = labels
+        histogram[:] += np.bincount(labels.ravel(), minlength=256)
+        scores[:, :band_height - rows] = scores[:, rows:].copy()
+        scores[:, band_height - rows:] = 0.0
+    
+    for start in range(0, len(tiles), batch_size):
+        batch_tiles = tiles[start:start + batch_size]
+        logits = model.predict_logits([source.read_tile(tile) for tile in batch_tiles])
+        for stage, milliseconds in model.speed.items():
+            add_timing(timings, stage, milliseconds * len(batch_tiles) / 1000.0)
+        
+        started = time.perf_counter()
+        for (x1, y1, x2, y2), tile_logits in zip(batch_tiles, logits):
+            if y1 > top:
+                flush(y1)
+                top = y1
+            shape = (y2 - y1, x2 - x1)
+            if shape not in windows:
+                windows[shape] = _blend_window(*shape, ramp)
+            scores[:, y1 - top:y2 - top, x1:x2] += tile_logits * windows[shape]
+        add_timing(timings, 'postprocess', time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    flush(height)
+    add_timing(timings, 'postprocess', time.perf_counter() - started)
+    return mask, histogram
+
+
+def mask_statistics(histogram: np.ndarray, image_shape: Tuple,
+                    phase_names: Dict[int, str]) -> Dict:
+    """
+    İndeks maskesinin histogramından faz istatistiklerini hesaplar
+    
+    Anahtarlar kutu tabanlı phase_statistics ile aynıdır; maskede tespit
+    (kutu) olmadığından sayılar ve güven skoru boştur. phase_areas ve
+    phase_union_areas fazın piksel sayısı, phase_area_fractions piksel
+    oranıdır.
+    
+    Args:
+        histogram: Maske değerlerinin histogramı (np.bincount çıktısı)
+        image_shape: Görüntü boyutu
+        phase_names: Sınıf indeksi -> faz adı eşlemesi
+    """
+    image_area = float(int(image_shape[0]) * int(image_shape[1]))
+    stats = {
+        'total_detections': 0,
+        'phase_counts': {},
+        'phase_areas': {},
+        'average_confidence': 0.0,
+        'phase_union_areas': {},
+        'phase_area_fractions': {},
+        'covered_fraction': 0.0
+    }
+    if image_area == 0:
+        return stats
+    
+    for value in np.flatnonzero(histogram[1:]) + 1:
+        name = phase_names.get(int(value) - 1, 'Unknown')
+        pixels = float(histogram[value])
+        stats['phase_areas'][name] = stats['phase_areas'].get(name, 0.0) + pixels
+        stats['phase_union_areas'][name] = stats['phase_areas'][name]
+        stats['phase_area_fractions'][name] = stats['phase_areas'][name] / image_area
+    stats['covered_fraction'] = float(histogram[1:].sum() / image_area)
+    return stats
+
+
+def train_unet(shard_dir: str, output_path: str = 'models/unet_phase.pth',
+               num_classes: int = 5, binary_class_id: Optional[int] = None,
+               epochs: int = 100, batch_size: int = 4, learning_rate: float = 1e-4,
+               early_stopping_patience: int = 7, device: str = 'cpu',
+               num_workers: int = 0, in_memory: Optional[bool] = None) -> Dict:
+    """
+    U-Net'i dataset_cache shard'ları üzerinde eğitir (Unet_v1 eğitim döngüsü)
+    
+    Doğrulama kaybı iyileştikçe en iyi model output_path'e checkpoint olarak
+    yazılır; kayıp early_stopping_patience epoch boyunca iyileşmezse eğitim
+    durur. Öğrenme oranı doğrulama kaybı 3 epoch iyileşmezse yarıya iner.
+    
+    Args:
+        shard_dir: train.bin (ve varsa val.bin) içeren klasör
+        output_path: En iyi modelin yazılacağı checkpoint
+        num_classes: Faz sınıfı sayısı (çok sınıflı modelde çıktı kanalı
+            sayısı arka planla birlikte num_classes + 1)
+        binary_class_id: Verilirse defterdeki gibi ikili model eğitilir
+            (maskedeki sıfır olmayan pikseller bu faz sayılır)
+        epochs: En fazla epoch sayısı
+        batch_size: Batch boyutu
+        learning_rate: Adam öğrenme oranı
+        early_stopping_patience: Erken durdurma sabrı (epoch)
+        device: 'cpu' veya 'cuda'
+        num_workers: DataLoader işçi sayısı
+        in_memory: Shard'lar belleğe okunsun mu (None: kullanılabilir
+            belleğe göre, bkz. dataset_cache.choose_cache_mode)
+    
+    Returns:
+        Dict: Epoch başına eğitim ve doğrulama kayıpları
+    """
+    from torch.utils.data import DataLoader
+    from dataset_cache import ShardDataset, choose_cache_mode
+    
+    shard_dir = Path(shard_dir)
+    train_path = shard_dir / 'train.bin'
+    val_path = shard_dir / 'val.bin'
+    if in_memory is None:
+        total = sum(path.stat().st_size for path in (train_path, val_path) if path.exists())
+        in_memory = choose_cache_mode(total) == 'ram'
+    
+    binary = binary_class_id is not None
+    train_dataset = ShardDataset(str(train_path), in_memory=in_memory, binary_masks=binary)
+    val_dataset = (ShardDataset(str(val_path), in_memory=in_memory, binary_masks=binary)
+                   if val_path.exists() else None)
+    if not train_dataset.has_masks:
+        raise ValueError(f"Shard maske içermiyor: {train_path}")
+    
+    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True,
+                              num_workers=num_workers)
+    val_loader = (DataLoader(val_dataset, batch_size=batch_size, num_workers=num_workers)
+                  if val_dataset is not None else None)
+    
+    out_channels = 1 if binary else num_classes + 1
+    class_ids = [binary_class_id] if binary else list(range(num_classes))
+    model = UNet(out_channels=out_channels).to(device, memory_format=torch.channels_last)
+    criterion = nn.BCEWithLogitsLoss() if binary else nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=3)
+    
+    def run_batch(images: torch.Tensor, masks: torch.Tensor) -> torch.Tensor:
+        # Shard'lar uint8 tutar; float'a çevirme batch üzerinde yapılır
+        images = images.to(device).float().div_(255.0).contiguous(
+            memory_format=torch.channels_last)
+        outputs = model(images)
+        if binary:
+            return criterion(outputs, masks.to(device).float().unsqueeze(1))
+        return criterion(outputs, masks.to(device).long())
+    
+    print("=" * 60)
+    print("U-Net Eğitimi Başlıyor")
+    print("=" * 60)
+    print(f"Eğitim örnekleri: {len(train_dataset)}, doğrulama örnekleri: "
+          f"{len(val_dataset) if val_dataset is not None else 0}")
+    print(f"Çıktı kanalları: {out_channels}, shard'lar {'bellekte' if in_memory else 'diskte'}")
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    history = {'train_losses': [], 'val_losses': []}
+    best_val_loss = float('inf')
+    patience_counter = 0
+    for epoch in range(epochs):
+        model.train()
+        running_loss = 0.0
+        for images, masks in train_loader:
+            optimizer.zero_grad()
+            loss = run_batch(images, masks)
+            loss.backward()
+            optimizer.step()
+            running_loss += loss.item()
+        train_loss = running_loss / len(train_loader)
+        
+        # Doğrulama seti yoksa eğitim kaybı izlenir
+        val_loss = train_loss
+        if val_loader is not None:
+            model.eval()
+            running_loss = 0.0
+            with torch.no_grad():
+                for images, masks in val_loader:
+                    running_loss += run_batch(images, masks).item()
+            val_loss = running_loss / len(val_loader)
+        
+        scheduler.step(val_loss)
+        history['train_losses'].append(train_loss)
+        history['val_losses'].append(val_loss)
+        print(f"Epoch {epoch + 1}/{epochs} - Train Loss: {train_loss:.4f}, "
+              f"Validation Loss: {val_loss:.4f}")
+        
+        if val_loss < best_val_loss:
+            best_val_loss = val_loss
+            patience_counter = 0
+            torch.save({
+                'epoch': epoch,
+                'model_state_dict': model.state_dict(),
+                'optimizer_state_dict': optimizer.state_dict(),
+                'train_loss': train_loss,
+                'val_loss': val_loss,
+                'out_channels': out_channels,
+                'class_ids': class_ids,
+                'img_size': [train_dataset.height, train_dataset.width]
+            }, output_path)
+        else:
+            patience_counter += 1
+            if patience_counter >= early_stopping_patience:
+                print(f"Erken durdurma: {epoch + 1}. epoch")
+                break
+    
+    print(f"En iyi model: {output_path} (Validation Loss: {best_val_loss:.4f})")
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='U-Net faz segmentasyonu - eğitim ve dışa aktarma'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    train_parser = subparsers.add_parser('train', help='Modeli shard\'lar üzerinde eğit')
+    train_parser.add_argument(
+        '--shards',
+        type=str,
+        default='data/shards',
+        help='dataset_cache.py ile yazılmış shard klasörü'
+    )
+    train_parser.add_argument(
+        '--output',
+        type=str,
+        default='models/unet_phase.pth',
+        help='En iyi modelin yazılacağı checkpoint'
+    )
+    train_parser.add_argument(
+        '--epochs',
+        type=int,
+        default=100,
+        help='Eğitim epoch sayısı'
+    )
+    train_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=4,
+        help='Batch boyutu'
+    )
+    train_parser.add_argument(
+        '--lr',
+        type=float,
+        default=1e-4,
+        help='Öğrenme oranı'
+    )
+    train_parser.add_argument(
+        '--binary-class',
+        type=int,
+        help='İkili model eğit (maskedeki ön plan bu faz indeksi sayılır)'
+    )
+    train_parser.add_argument(
+        '--patience',
+        type=int,
+        default=7,
+        help='Erken durdurma sabrı (epoch)'
+    )
+    train_parser.add_argument(
+        '--device',
+        type=str,
+        default='cpu',
+        help='Cihaz (cpu veya cuda)'
+    )
+    train_parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='DataLoader işçi sayısı'
+    )
+    
+    export_parser = subparsers.add_parser('export', help='Modeli TorchScript olarak dışa aktar')
+    export_parser.add_argument('model', type=str, help='.pth checkpoint')
+    export_parser.add_argument(
+        '--output',
+        type=str,
+        help='Çıktı dosyası (varsayılan: <model>_<variant>.ts)'
+    )
+    export_parser.add_argument(
+        '--variant',
+        type=str,
+        default='torchscript',
+        choices=['torchscript', 'quantized'],
+        help='Derleme şekli'
+    )
+    export_parser.add_argument(
+        '--calibration-dir',
+        type=str,
+        help='INT8 kalibrasyonu için görüntü klasörü (quantized)'
+    )
+    export_parser.add_argument(
+        '--tile-size',
+        type=int,
+        default=DEFAULT_SEGMENTATION_TILE_SIZE,
+        help='Kalibrasyon döşemelerinin boyutu'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.command == 'train':
+        train_unet(args.shards, args.output, binary_class_id=args.binary_class,
+                   epochs=args.epochs, batch_size=args.batch_size,
+                   learning_rate=args.lr, early_stopping_patience=args.patience,
+                   device=args.device, num_workers=args.workers)
+        return
+    
+    export_segmentation_model(args.model, args.output, args.variant,
+                              calibration_dir=args.calibration_dir,
+                              tile_size=args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Aşama Bazında Süre ve Sayaç Ölçümleri
+
+Bu modül analiz hattının her aşaması (okuma, ön işleme, çıkarım, NMS,
+son işleme, istatistik, çizim, diske yazma) için görüntü başına süreleri
+ve genel sayaçları toplayan StageMetrics sınıfını içerir. Süreler
+görüntünün sonucuna 'timings' anahtarıyla eklenir ve aşama bazında
+histogramlarda toplanır. Histogramlar Prometheus metin formatında veya
+JSON olarak dışa aktarılabilir.
+
+Ölçüm kapalıyken aşama zamanlayıcıları paylaşılan boş bir context manager
+döndürür; ek maliyet tek bir metot çağrısıdır.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Histogram kova sınırları (saniye)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def add_timing(timings: Optional[Dict[str, float]], name: str, seconds: float):
+    """Süre sözlüğü varsa (ölçüm açıksa) aşama süresini ekler"""
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class _Histogram:
+    """Tek bir aşamanın süre histogramı"""
+    
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    def quantile(self, q: float) -> float:
+        """Kova sınırlarından yaklaşık yüzdelik (üst sınır) hesaplar"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'p50_seconds': self.quantile(0.50),
+            'p95_seconds': self.quantile(0.95),
+            'max_seconds': self.max,
+            'buckets': buckets
+        }
+
+
+class StageMetrics:
+    """
+    Görüntü başına aşama sürelerini ve genel sayaçları toplar
+    
+    Bir görüntünün ölçümü begin() ile başlar, aşamalar stage() ile ölçülür ve
+    finish() ile görüntünün süreleri histogramlara eklenir. Sınıf birden
+    fazla thread'den (ör. pipeline modu) aynı anda kullanılabilir.
+    """
+    
+    def __init__(self, enabled: bool = False, buckets: tuple = DEFAULT_BUCKETS,
+                 profile_every: int = 0, profiler: str = 'cprofile',
+                 profile_dir: Optional[str] = None):
+        """
+        Args:
+            enabled: Ölçümlerin açık olup olmadığı
+            buckets: Histogram kova sınırları (saniye)
+            profile_every: 0'dan büyükse her profile_every model çağrısından
+                biri profiler ile çalıştırılır
+            profiler: 'cprofile' veya 'pyinstrument'
+            profile_dir: Profil dosyalarının yazılacağı klasör
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"Bilinmeyen profiler: {profiler}")
+        if profiler == 'pyinstrument' and profile_every:
+            # pyinstrument opsiyoneldir ve yalnızca seçildiğinde içe aktarılır
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ImportError("pyinstrument kurulu değil: pip install pyinstrument")
+        
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.profile_every = profile_every
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._histograms: Dict[str, _Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._profile_calls = 0
+    
+    def begin(self, image_path: str) -> Optional[Dict[str, float]]:
+        """Görüntünün ölçümünü başlatır ve süre sözlüğünü döndürür"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._pending.setdefault(image_path, {})
+    
+    def timings(self, image_path: str) -> Optional[Dict[str, float]]:
+        """Ölçümü süren görüntünün süre sözlüğü (yoksa None)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._pending.get(image_path)
+    
+    def stage(self, image_path: str, name: str):
+        """Bir aşamanın süresini ölçen context manager"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(image_path, name)
+    
+    @contextlib.contextmanager
+    def _timed(self, image_path: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(image_path, name, time.perf_counter() - started)
+    
+    def add(self, image_path: str, name: str, seconds: float):
+        """
+        Aşama süresini görüntünün sürelerine ekler
+        
+        Görüntünün ölçümü başlatılmamış veya bitmişse süre doğrudan
+        histograma eklenir.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            timings = self._pending.get(image_path)
+            if timings is None:
+                self._observe_stage(name, seconds)
+            else:
+                timings[name] = timings.get(name, 0.0) + seconds
+    
+    def finish(self, image_path: str, num_detections: int = 0,
+               failed: bool = False) -> Optional[Dict[str, float]]:
+        """
+        Görüntünün ölçümünü bitirir
+        
+        Başarılı görüntülerin süreleri histogramlara eklenir; başarısız
+        görüntülerin kısmi süreleri histogramları bozmamak için atılır.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            timings = self._pending.pop(image_path, None)
+            if failed:
+                self._increment('images_failed')
+                return timings
+            if timings is not None:
+                self._observe(timings, num_detections)
+            return timings
+    
+    def observe(self, timings: Optional[Dict[str, float]], num_detections: int = 0):
+        """Başka bir süreçte ölçülmüş görüntü sürelerini histogramlara ekler"""
+        if not self.enabled or timings is None:
+            return
+        with self._lock:
+            self._observe(timings, num_detections)
+    
+    def increment(self, name: str, value: int = 1):
+        """Genel bir sayacı artırır"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._increment(name, value)
+    
+    def _observe(self, timings: Dict[str, float], num_detections: int):
+        for name, seconds in timings.items():
+            self._observe_stage(name, seconds)
+        self._observe_stage('total', sum(timings.values()))
+        self._increment('images_processed')
+        self._increment('detections', num_detections)
+    
+    def _observe_stage(self, name: str, seconds: float):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = _Histogram(self.buckets)
+        histogram.observe(seconds)
+    
+    def _increment(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+    
+    def profile(self, label: str):
+        """
+        Örneklenen çağrıları profiler ile çalıştıran context manager
+        
+        Her profile_every çağrıdan biri profillenir ve sonuç profile_dir
+        klasörüne (cProfile için .prof, pyinstrument için .html) yazılır.
+        """
+        if not self.profile_every or self.profile_dir is None:
+            return _NULL_CONTEXT
+        with self._lock:
+            self._profile_calls += 1
+            if (self._profile_calls - 1) % self.profile_every:
+                return _NULL_CONTEXT
+            index = self._profile_calls
+        return self._profiled(label, index)
+    
+    @contextlib.contextmanager
+    def _profiled(self, label: str, index: int):
+        profile_dir = Path(self.profile_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{index:05d}_{os.getpid()}_{Path(label).stem}"
+        
+        if self.profiler == 'pyinstrument':
+            import pyinstrument
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                (profile_dir / f"{stem}.html").write_text(profiler.output_html(),
+                                                          encoding='utf-8')
+            return
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(profile_dir / f"{stem}.prof"))
+    
+    def snapshot(self) -> Dict:
+        """Histogramların ve sayaçların JSON'a yazılabilir görüntüsü"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'stages': {name: histogram.to_dict()
+                           for name, histogram in self._histograms.items()},
+                'counters': dict(self.counters)
+            }
+    
+    def to_prometheus(self, prefix: str = 'phase_analysis') -> str:
+        """Histogramları ve sayaçları Prometheus metin formatına dönüştürür"""
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_stage_seconds Görüntü başına aşama süresi",
+                f"# TYPE {prefix}_stage_seconds histogram"
+            ]
+            for name, histogram in self._histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} '
+                             f'{histogram.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {histogram.total}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+            
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, output_dir: str):
+        """metrics.prom ve metrics.json dosyalarını output_dir'e yazar"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / 'metrics.prom').write_text(self.to_prometheus(), encoding='utf-8')
+        with open(output_dir / 'metrics.json', 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+    
+    def reset(self):
+        """Tüm histogramları ve sayaçları sıfırlar"""
+        with self._lock:
+            self._pending.clear()
+            self._histograms.clear()
+            self.counters.clear()
@@ -0,0 +1,141 @@
+"""
+Başlangıç Süresi Ölçümü
+
+Bu script phase_analysis modülünün yeni bir Python sürecinde import
+süresini, PhaseAnalyzer oluşturma süresini ve ilk çıkarım (warmup)
+süresini ölçer. Her ölçüm ayrı bir süreçte tekrarlanır ve medyan değerler
+raporlanır. --max-import-seconds verilirse import süresi bu sınırı aştığında
+script hata koduyla çıkar; böylece başlangıç süresindeki gerilemeler
+CI veya LIMS scriptlerinde fark edilir.
+
+Kullanım:
+    python startup_time.py --model models/yolov8_phase_detection.pt --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Ölçüm, ayrı bir süreçte çalıştırılan bu kodla yapılır
+_CHILD_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import phase_analysis
+imported = time.perf_counter()
+analyzer = phase_analysis.PhaseAnalyzer(model_path={model_path!r})
+created = time.perf_counter()
+heavy = [name for name in ('cv2', 'ultralytics', 'matplotlib', 'torch') if name in sys.modules]
+warmup = analyzer.warmup() if {warmup!r} else None
+print('STARTUP_TIMES ' + json.dumps({{
+    'import_seconds': imported - started,
+    'init_seconds': created - imported,
+    'warmup_seconds': warmup,
+    'modules_after_init': heavy
+}}))
+"""
+
+
+def measure_once(model_path: str, warmup: bool = False) -> Dict:
+    """Yeni bir süreçte tek bir başlangıç ölçümü yapar"""
+    code = _CHILD_CODE.format(model_path=model_path, warmup=warmup)
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=str(Path(__file__).resolve().parent))
+    wall_seconds = time.perf_counter() - started
+    
+    for line in completed.stdout.splitlines():
+        if line.startswith('STARTUP_TIMES '):
+            times = json.loads(line[len('STARTUP_TIMES '):])
+            times['process_seconds'] = wall_seconds
+            return times
+    raise RuntimeError(f"Ölçüm başarısız:\n{completed.stderr}")
+
+
+def measure_startup(model_path: str, repeat: int = 5, warmup: bool = False) -> Dict:
+    """
+    Başlangıç sürelerini repeat kez ölçüp medyanlarını döndürür
+    
+    Args:
+        model_path: PhaseAnalyzer'a verilecek model yolu
+        repeat: Ölçüm (süreç) sayısı
+        warmup: True ise ilk çıkarım süresi de ölçülür
+    
+    Returns:
+        Dict: Medyan süreler (saniye) ve tek tek ölçümler
+    """
+    runs: List[Dict] = [measure_once(model_path, warmup) for _ in range(repeat)]
+    
+    summary = {'repeat': repeat, 'runs': runs}
+    for key in ('import_seconds', 'init_seconds', 'warmup_seconds', 'process_seconds'):
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = statistics.median(values) if values else None
+    summary['modules_after_init'] = runs[-1]['modules_after_init']
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='phase_analysis başlangıç süresi ölçümü'
+    )
+    
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='models/yolov8_phase_detection.pt',
+        help='Model dosyası'
+    )
+    
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Ölçüm tekrar sayısı'
+    )
+    
+    parser.add_argument(
+        '--warmup',
+        action='store_true',
+        help='İlk çıkarım (warmup) süresini de ölç'
+    )
+    
+    parser.add_argument(
+        '--max-import-seconds',
+        type=float,
+        help='Import süresi bu değeri aşarsa hata koduyla çık'
+    )
+    
+    parser.add_argument(
+        '--json',
+        type=str,
+        help='Sonuçların kaydedileceği JSON dosyası'
+    )
+    
+    args = parser.parse_args()
+    
+    summary = measure_startup(args.model, args.repeat, args.warmup)
+    
+    print(f"Import süresi (medyan): {summary['import_seconds']:.3f} s")
+    print(f"PhaseAnalyzer oluşturma (medyan): {summary['init_seconds']:.3f} s")
+    if summary['warmup_seconds'] is not None:
+        print(f"İlk çıkarım / warmup (medyan): {summary['warmup_seconds']:.3f} s")
+    print(f"Toplam süreç süresi (medyan): {summary['process_seconds']:.3f} s")
+    print(f"Oluşturma sonrası yüklü ağır modüller: {summary['modules_after_init'] or '-'}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    
+    limit: Optional[float] = args.max_import_seconds
+    if limit is not None and summary['import_seconds'] > limit:
+        print(f"Import süresi sınırı aşıldı: {summary['import_seconds']:.3f} s > {limit:.3f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
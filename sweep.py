@@ -0,0 +1,493 @@
+"""
+Hiperparametre Taraması (Sweep)
+
+Bu modül train_model.train_model'in hiperparametrelerini YAML dosyasında
+tanımlanan bir arama uzayında tarar:
+    - Denemeler (trial) ayrı süreçlerde eşzamanlı çalışır; her süreç
+      kendine ayrılmış CPU çekirdeklerine sabitlenir ve torch/OpenCV
+      thread sayısı bu çekirdek sayısıyla sınırlanır. Böylece denemeler
+      birbirinin çekirdeklerini paylaşmaz ve ölçülen gecikmeler hedef
+      donanım bütçesine (ör. 2 çekirdek) karşılık gelir
+    - ASHA (Asynchronous Successive Halving) ile denemeler önce az sayıda
+      epoch eğitilir. Her basamakta (rung) o basamağı tamamlamış
+      denemelerin en iyi 1/reduction_factor kadarı bir sonraki basamağa
+      terfi eder, diğerleri erken durdurulur. Terfi eden deneme önceki
+      basamağın son ağırlıklarından devam eder. Boşalan çekirdekler
+      basamağın tamamlanmasını beklemeden yeni işe verilir
+    - Görüntü önbelleği tüm denemeler için bir kez seçilir: RAM önbelleği
+      her süreçte ayrı tutulduğundan gereken bellek eşzamanlı deneme
+      sayısıyla çarpılır; sığmazsa görüntüler eğitimden önce bir kez .npy
+      olarak diske yazılır ve tüm denemeler aynı dosyaları okur (bkz.
+      dataset_cache.prepare_yolo_disk_cache)
+    - Her basamağın sonunda model validate_model ile doğrulanır (mAP50-95)
+      ve deneme çekirdeklerinde PhaseAnalyzer.analyze_image gecikmesi
+      ölçülür. latency_budget_ms verilirse bütçeyi aşan denemeler terfi
+      etmez. Sonuçlar leaderboard.csv / leaderboard.json dosyalarına yazılır
+
+Arama uzayı örneği için bkz. models/sweep.yaml.
+
+Kullanım:
+    python train_model.py --data data/annotations --sweep models/sweep.yaml
+"""
+
+import contextlib
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from image_discovery import IMAGE_EXTENSIONS, iter_image_files
+
+
+# Arama uzayında bu anahtarlar train_model argümanlarına karşılık gelir
+# (diğer anahtarlar doğrudan model.train'e iletilir)
+TRAIN_ARGUMENTS = {'model': 'yolov8n.pt', 'imgsz': 640, 'batch': 16}
+
+SWEEP_DEFAULTS = {
+    'trials': 16,
+    'seed': 0,
+    'min_epochs': 3,
+    'max_epochs': 27,
+    'reduction_factor': 3,
+    'cores_per_trial': 2,
+    'concurrency': None,
+    'latency_budget_ms': None,
+    'latency_calls': 20,
+    'device': 'cpu',
+    'fixed': {},
+    'space': {}
+}
+
+DISTRIBUTIONS = ('choice', 'uniform', 'loguniform', 'int')
+
+LEADERBOARD_FIELDS = ('rank', 'trial', 'status', 'epochs', 'map50_95', 'map50',
+                      'latency_p50_ms', 'latency_p95_ms', 'train_seconds', 'weights')
+
+
+def load_sweep_config(config_path: str) -> Dict:
+    """
+    Sweep YAML dosyasını okur, varsayılanlarla birleştirip doğrular
+    
+    space altındaki her parametre bir liste (ayrık seçim), sabit bir değer
+    veya {type: uniform | loguniform | int, low: ..., high: ...} /
+    {type: choice, values: [...]} biçiminde olabilir.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    
+    unknown = set(config) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen sweep ayarları: {sorted(unknown)}")
+    config = dict(SWEEP_DEFAULTS, **config)
+    
+    for name, spec in config['space'].items():
+        if isinstance(spec, list) and not spec:
+            raise ValueError(f"{name}: seçenek listesi boş")
+        if isinstance(spec, dict):
+            kind = spec.get('type', 'choice')
+            if kind not in DISTRIBUTIONS:
+                raise ValueError(f"{name}: bilinmeyen dağılım {kind}")
+            if kind == 'choice' and not spec.get('values'):
+                raise ValueError(f"{name}: choice için values verilmeli")
+            if kind != 'choice' and ('low' not in spec or 'high' not in spec):
+                raise ValueError(f"{name}: {kind} için low ve high verilmeli")
+            if kind == 'loguniform' and spec['low'] <= 0:
+                raise ValueError(f"{name}: loguniform için low pozitif olmalı")
+    if not 1 <= config['min_epochs'] <= config['max_epochs']:
+        raise ValueError("1 <= min_epochs <= max_epochs olmalı")
+    if config['reduction_factor'] < 2:
+        raise ValueError("reduction_factor en az 2 olmalı")
+    return config
+
+
+def sample_parameters(space: Dict, rng: random.Random) -> Dict:
+    """Arama uzayından bir parametre kümesi örnekler"""
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            params[name] = rng.choice(spec)
+            continue
+        if not isinstance(spec, dict):
+            params[name] = spec
+            continue
+        kind = spec.get('type', 'choice')
+        if kind == 'choice':
+            params[name] = rng.choice(spec['values'])
+        elif kind == 'uniform':
+            params[name] = rng.uniform(float(spec['low']), float(spec['high']))
+        elif kind == 'loguniform':
+            params[name] = math.exp(rng.uniform(math.log(float(spec['low'])),
+                                                math.log(float(spec['high']))))
+        else:
+            params[name] = rng.randint(int(spec['low']), int(spec['high']))
+    return params
+
+
+def rung_epochs(min_epochs: int, max_epochs: int, reduction_factor: int) -> List[int]:
+    """
+    ASHA basamaklarının toplam epoch sayıları
+    
+    Son basamak max_epochs'tur; önceki basamaklar reduction_factor oranında
+    küçülür (ör. 3, 27, 3 -> [3, 9, 27]).
+    """
+    levels = int(math.floor(math.log(max_epochs / min_epochs, reduction_factor) + 1e-9))
+    epochs = [max(1, round(max_epochs / reduction_factor ** (levels - i)))
+              for i in range(levels + 1)]
+    return sorted(set(epochs))
+
+
+class ASHAScheduler:
+    """
+    Asenkron ardışık yarılama (ASHA) zamanlayıcısı
+    
+    Boşalan her çalışana sırayla şu iş verilir: en üst basamaktan
+    başlayarak, basamağı tamamlamış denemelerin en iyi 1/reduction_factor
+    kadarı içinde olup henüz terfi etmemiş bir deneme varsa bir sonraki
+    basamağı; yoksa yeni bir denemenin ilk basamağı.
+    """
+    
+    def __init__(self, num_trials: int, rungs: List[int], reduction_factor: int):
+        self.num_trials = num_trials
+        self.rungs = rungs
+        self.reduction_factor = reduction_factor
+        self.started = 0
+        # Basamak başına deneme -> skor (hatalı / bütçe dışı denemeler -inf)
+        self.scores: List[Dict[int, float]] = [{} for _ in rungs]
+        self.promoted: List[set] = [set() for _ in rungs]
+    
+    def next_job(self) -> Optional[Tuple[int, int]]:
+        """Çalıştırılacak (deneme, basamak) çiftini döndürür; iş yoksa None"""
+        for rung in reversed(range(len(self.rungs) - 1)):
+            scores = self.scores[rung]
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            for trial in ranked[:len(scores) // self.reduction_factor]:
+                if trial not in self.promoted[rung] and scores[trial] > float('-inf'):
+                    self.promoted[rung].add(trial)
+                    return trial, rung + 1
+        
+        if self.started < self.num_trials:
+            self.started += 1
+            return self.started - 1, 0
+        return None
+    
+    def report(self, trial: int, rung: int, score: Optional[float]):
+        """Denemenin basamak skorunu kaydeder (None: terfi edemez)"""
+        self.scores[rung][trial] = float('-inf') if score is None else score
+
+
+def core_slots(cores_per_trial: int, concurrency: Optional[int] = None) -> List[List[int]]:
+    """
+    Eşzamanlı denemelere ayrılacak CPU çekirdeği gruplarını döndürür
+    
+    concurrency verilmezse kullanılabilir çekirdek sayısı / cores_per_trial
+    kadar grup oluşturulur. Çekirdekler yetmezse gruplar örtüşür.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    concurrency = concurrency or max(1, len(cores) // cores_per_trial)
+    if concurrency * cores_per_trial > len(cores):
+        print(f"Uyarı: {concurrency} deneme x {cores_per_trial} çekirdek için "
+              f"yalnızca {len(cores)} çekirdek var, çekirdekler paylaşılacak")
+    return [sorted({cores[(i * cores_per_trial + j) % len(cores)]
+                    for j in range(cores_per_trial)})
+            for i in range(concurrency)]
+
+
+def measure_latency(model_path: str, image_paths: List[str], calls: int = 20,
+                    img_size: int = 640) -> Dict[str, float]:
+    """
+    Modelin PhaseAnalyzer.analyze_image gecikmesini (ms) ölçer
+    
+    Ölçüm çağıran sürecin çekirdek ve thread ayarlarıyla yapılır; görüntü
+    okuma dahildir. İlk çağrının tek seferlik maliyetleri warmup ile ölçüm
+    dışında tutulur.
+    """
+    from benchmark import time_calls
+    from phase_analysis import PhaseAnalyzer, clear_model_registry
+    
+    analyzer = PhaseAnalyzer(model_path=model_path)
+    analyzer.warmup(image_size=img_size)
+    images = itertools.cycle(image_paths)
+    try:
+        return time_calls(lambda: analyzer.analyze_image(next(images)), calls)
+    finally:
+        clear_model_registry()
+
+
+@contextlib.contextmanager
+def _redirect_output(log_path: Path):
+    """Sürecin stdout/stderr'ini (alt süreçler ve ilerleme çubukları dahil) dosyaya yönlendirir"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(log_path, 'a', encoding='utf-8') as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            for fd in saved:
+                os.close(fd)
+
+
+def _run_job(job: Dict) -> Dict:
+    """İşçi süreçte bir denemenin bir basamağını eğitir, doğrular ve ölçer"""
+    cores = job['cores']
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    import cv2
+    import torch
+    torch.set_num_threads(len(cores))
+    cv2.setNumThreads(len(cores))
+    
+    from train_model import train_model, validate_model
+    
+    params = job['params']
+    hyperparameters = {key: value for key, value in params.items()
+                       if key not in TRAIN_ARGUMENTS}
+    # DataLoader işçileri de denemenin çekirdek bütçesine sığmalı
+    hyperparameters.setdefault('workers', len(cores))
+    if job['rung'] > 0:
+        # Önceki basamağın ağırlıklarından devam edilir, ısınma tekrarlanmaz
+        hyperparameters['warmup_epochs'] = 0
+    
+    run_dir = Path(job['project']) / job['name']
+    run_dir.mkdir(parents=True, exist_ok=True)
+    result = {'trial': job['trial'], 'rung': job['rung'], 'epochs': job['total_epochs']}
+    with _redirect_output(run_dir / 'sweep.log'):
+        started = time.perf_counter()
+        train_model(job['data_config'], epochs=job['epochs'], batch_size=params['batch'],
+                    img_size=params['imgsz'], model_name=job['weights'],
+                    device=job['device'], cache=job['cache'],
+                    hyperparameters=hyperparameters, project=job['project'],
+                    name=job['name'])
+        result['train_seconds'] = time.perf_counter() - started
+        
+        weights = run_dir / 'weights'
+        metrics = validate_model(str(weights / 'best.pt'), job['data_config'])
+        result['map50_95'] = float(metrics.box.map)
+        result['map50'] = float(metrics.box.map50)
+        
+        latency = measure_latency(str(weights / 'best.pt'), job['latency_images'],
+                                  job['latency_calls'], params['imgsz'])
+        result['latency_p50_ms'] = latency['p50_ms']
+        result['latency_p95_ms'] = latency['p95_ms']
+    result['weights'] = str(weights / 'best.pt')
+    result['last_weights'] = str(weights / 'last.pt')
+    return result
+
+
+def _latency_images(data_dir: str, count: int) -> List[str]:
+    """Gecikme ölçümü için doğrulama (yoksa eğitim) görüntülerinden birkaçını seçer"""
+    for split in ('val', 'train'):
+        split_dir = Path(data_dir) / 'images' / split
+        if split_dir.is_dir():
+            images = sorted(iter_image_files(str(split_dir), IMAGE_EXTENSIONS))[:count]
+            if images:
+                return [str(image) for image in images]
+    raise ValueError(f"Gecikme ölçümü için görüntü bulunamadı: {data_dir}/images/val")
+
+
+def _largest_image_size(config: Dict) -> int:
+    """Denemelerde kullanılabilecek en büyük imgsz (önbellek tahmini için)"""
+    spec = config['space'].get('imgsz', config['fixed'].get('imgsz', TRAIN_ARGUMENTS['imgsz']))
+    if isinstance(spec, list):
+        return max(spec)
+    if isinstance(spec, dict):
+        return max(spec['values']) if 'values' in spec else int(spec['high'])
+    return spec
+
+
+def run_sweep(config_path: str, data_config: str, data_dir: str,
+              output_dir: str = 'runs/sweep', cache: str = 'none') -> List[Dict]:
+    """
+    Arama uzayındaki denemeleri ASHA ile eşzamanlı olarak çalıştırır
+    
+    Args:
+        config_path: Sweep YAML dosyası
+        data_config: create_yolo_dataset_config ile oluşturulmuş veri seti YAML'ı
+        data_dir: Veri seti dizini (önbellek ve gecikme görüntüleri için)
+        output_dir: Deneme çıktıları, trials.jsonl ve leaderboard dosyaları
+        cache: Görüntü önbelleği ('auto', 'ram', 'disk' veya 'none')
+    
+    Returns:
+        List[Dict]: mAP50-95'e göre sıralanmış leaderboard satırları
+    """
+    from dataset_cache import prepare_yolo_disk_cache, resolve_cache_mode
+    
+    config = load_sweep_config(config_path)
+    rungs = rung_epochs(config['min_epochs'], config['max_epochs'], config['reduction_factor'])
+    scheduler = ASHAScheduler(config['trials'], rungs, config['reduction_factor'])
+    slots = core_slots(config['cores_per_trial'], config['concurrency'])
+    
+    # Tüm denemeler aynı disk önbelleğini okur; RAM önbelleği her süreçte ayrı tutulur
+    cache = resolve_cache_mode(cache, data_dir, _largest_image_size(config),
+                               copies=len(slots))
+    if cache == 'disk':
+        prepare_yolo_disk_cache(data_dir)
+    
+    rng = random.Random(config['seed'])
+    trial_params = [dict(TRAIN_ARGUMENTS, **config['fixed'],
+                         **sample_parameters(config['space'], rng))
+                    for _ in range(config['trials'])]
+    latency_images = _latency_images(data_dir, config['latency_calls'])
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    project = str((output_path / 'trials').resolve())
+    log_path = output_path / 'trials.jsonl'
+    budget = config['latency_budget_ms']
+    trials = {}
+    
+    print("=" * 60)
+    print("Hiperparametre Taraması Başlıyor")
+    print("=" * 60)
+    print(f"Denemeler: {config['trials']}, basamaklar (epoch): {rungs}")
+    print(f"Eşzamanlı deneme: {len(slots)}, çekirdekler: {slots}")
+    print(f"Görüntü önbelleği: {cache or 'yok'}")
+    print("=" * 60)
+    
+    def make_job(trial: int, rung: int, slot: int) -> Dict:
+        params = trial_params[trial]
+        previous = trials[trial]['history'][-1] if rung > 0 else None
+        return {
+            'trial': trial,
+            'rung': rung,
+            'params': params,
+            'cores': slots[slot],
+            'epochs': rungs[rung] - (rungs[rung - 1] if rung > 0 else 0),
+            'total_epochs': rungs[rung],
+            'weights': previous['last_weights'] if previous else params['model'],
+            'data_config': os.path.abspath(data_config),
+            'device': config['device'],
+            'cache': cache,
+            'project': project,
+            'name': f"trial_{trial:03d}_rung{rung}",
+            'latency_images': latency_images,
+            'latency_calls': config['latency_calls']
+        }
+    
+    # fork, torch'un thread havuzlarıyla kilitlenebildiği için spawn kullanılır
+    with ProcessPoolExecutor(max_workers=len(slots),
+                             mp_context=multiprocessing.get_context('spawn')) as pool, \
+            open(log_path, 'a', encoding='utf-8') as log:
+        free_slots = list(range(len(slots)))
+        running = {}
+        while True:
+            while free_slots:
+                job = scheduler.next_job()
+                if job is None:
+                    break
+                trial, rung = job
+                trials.setdefault(trial, {'params': trial_params[trial], 'history': []})
+                slot = free_slots.pop(0)
+                running[pool.submit(_run_job, make_job(trial, rung, slot))] = (trial, rung, slot)
+                print(f"Deneme {trial} basamak {rung} ({rungs[rung]} epoch) başladı: "
+                      f"çekirdekler {slots[slot]}")
+            if not running:
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial, rung, slot = running.pop(future)
+                free_slots.append(slot)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'trial': trial, 'rung': rung, 'epochs': rungs[rung],
+                              'error': f"{type(e).__name__}: {e}"}
+                result['params'] = trial_params[trial]
+                log.write(json.dumps(result, ensure_ascii=False) + "\n")
+                log.flush()
+                
+                if 'error' in result:
+                    print(f"Deneme {trial} basamak {rung} başarısız: {result['error']}")
+                    trials[trial]['error'] = result['error']
+                    scheduler.report(trial, rung, None)
+                    continue
+                trials[trial]['history'].append(result)
+                over_budget = budget is not None and result['latency_p50_ms'] > budget
+                scheduler.report(trial, rung, None if over_budget else result['map50_95'])
+                print(f"Deneme {trial} basamak {rung}: mAP50-95 {result['map50_95']:.4f}, "
+                      f"gecikme {result['latency_p50_ms']:.1f} ms"
+                      f"{' (bütçe aşıldı)' if over_budget else ''}")
+    
+    leaderboard = write_leaderboard(trials, output_dir, len(rungs) - 1, budget)
+    
+    print("\n" + "=" * 60)
+    print("Tarama Tamamlandı - En İyi Denemeler")
+    print("=" * 60)
+    for row in leaderboard[:10]:
+        if row['map50_95'] is None:
+            print(f"{row['rank']:>3}. deneme {row['trial']:>3}  {row['status']}")
+            continue
+        print(f"{row['rank']:>3}. deneme {row['trial']:>3}  mAP50-95 {row['map50_95']:.4f}  "
+              f"{row['latency_p50_ms']:7.1f} ms  {row['epochs']:>3} epoch  {row['status']}")
+    print(f"\nLeaderboard: {output_path / 'leaderboard.csv'}")
+    return leaderboard
+
+
+def write_leaderboard(trials: Dict[int, Dict], output_dir: str, final_rung: int,
+                      latency_budget_ms: Optional[float] = None) -> List[Dict]:
+    """
+    Denemelerin son tamamlanan basamaklarından leaderboard oluşturur
+    
+    Sıralama: gecikme bütçesine uyan denemeler önce, ardından mAP50-95
+    (yüksekten düşüğe), eşitlikte gecikme. CSV'de deneme parametreleri ayrı
+    sütunlardır.
+    """
+    rows = []
+    for trial, state in trials.items():
+        row = {field: None for field in LEADERBOARD_FIELDS}
+        row['trial'] = trial
+        history = state['history']
+        if history:
+            latest = history[-1]
+            row.update({field: latest[field] for field in LEADERBOARD_FIELDS
+                        if field in latest})
+            row['train_seconds'] = sum(result['train_seconds'] for result in history)
+        if 'error' in state:
+            row['status'] = 'failed'
+        elif latency_budget_ms is not None and row['latency_p50_ms'] > latency_budget_ms:
+            row['status'] = 'over_budget'
+        elif history and history[-1]['rung'] == final_rung:
+            row['status'] = 'completed'
+        else:
+            row['status'] = 'stopped'
+        row['params'] = state['params']
+        rows.append(row)
+    
+    rows.sort(key=lambda row: (row['status'] in ('failed', 'over_budget'),
+                               -(row['map50_95'] if row['map50_95'] is not None else -1.0),
+                               row['latency_p50_ms'] or float('inf')))
+    for rank, row in enumerate(rows, 1):
+        row['rank'] = rank
+    
+    output_path = Path(output_dir)
+    with open(output_path / 'leaderboard.json', 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+    
+    param_names = sorted({name for row in rows for name in row['params']})
+    with open(output_path / 'leaderboard.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(LEADERBOARD_FIELDS) + param_names)
+        for row in rows:
+            writer.writerow([row[field] for field in LEADERBOARD_FIELDS] +
+                            [row['params'].get(name) for name in param_names])
+    return rows
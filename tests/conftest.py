@@ -0,0 +1,11 @@
+"""
+Test yapılandırması
+
+Modüller depo kökünde bulunduğundan testler `pytest` ile doğrudan
+çalıştırıldığında da içe aktarılabilmeleri için kök dizin sys.path'e eklenir.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,89 @@
+"""
+annotation_converter testleri (renk tablosu ve etiket üretimi)
+"""
+
+import numpy as np
+
+from annotation_converter import (build_color_lut, hex_to_rgb, mask_to_labels, pack_bgr,
+                                  split_of)
+
+
+def test_hex_to_rgb():
+    assert hex_to_rgb('#ff8000') == (255, 128, 0)
+    assert hex_to_rgb('00ff10') == (0, 255, 16)
+
+
+def test_pack_bgr_matches_rgb_code():
+    image = np.array([[[0, 128, 255], [16, 32, 64]]], dtype=np.uint8)  # BGR
+    
+    codes = pack_bgr(image)
+    
+    assert codes.shape == (1, 2)
+    assert codes[0, 0] == (255 << 16) | (128 << 8) | 0
+    assert codes[0, 1] == (64 << 16) | (32 << 8) | 16
+
+
+def test_color_lut_maps_within_tolerance():
+    lut = build_color_lut(((255, 0, 0), (0, 0, 255)), (1, 2), 10.0)
+    
+    def code(r, g, b):
+        return (r << 16) | (g << 8) | b
+    
+    assert lut[code(255, 0, 0)] == 1
+    assert lut[code(249, 6, 0)] == 1      # uzaklık ~8.5
+    assert lut[code(240, 0, 0)] == 0      # uzaklık 15
+    assert lut[code(0, 0, 250)] == 2
+    assert lut[code(128, 128, 128)] == 0
+
+
+def test_color_lut_first_color_wins_on_overlap():
+    lut = build_color_lut(((100, 100, 100), (104, 100, 100)), (1, 2), 5.0)
+    
+    assert lut[(102 << 16) | (100 << 8) | 100] == 1
+    assert lut[(104 << 16) | (100 << 8) | 100] == 1
+    assert lut[(108 << 16) | (100 << 8) | 100] == 2
+
+
+def test_lut_and_pack_bgr_label_an_image():
+    lut = build_color_lut(((255, 0, 0), (0, 255, 0)), (1, 2), 3.0)
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    image[0, 0] = (0, 0, 254)     # BGR kırmızıya yakın
+    image[1, 1] = (0, 255, 0)     # yeşil
+    
+    labels = lut[pack_bgr(image)]
+    
+    assert labels.tolist() == [[1, 0], [0, 2]]
+
+
+def test_mask_to_labels_bbox():
+    mask = np.zeros((100, 200), dtype=np.uint8)
+    mask[10:30, 20:60] = 1       # sınıf 0
+    mask[50:90, 100:180] = 3     # sınıf 2
+    mask[0:2, 0:2] = 3           # min_area altında, atlanır
+    
+    lines, counts = mask_to_labels(mask, num_classes=3, label_format='bbox', min_area=10)
+    
+    assert counts.tolist() == [1, 0, 1]
+    assert sorted(lines) == ['0 0.200000 0.200000 0.200000 0.200000',
+                             '2 0.700000 0.700000 0.400000 0.400000']
+
+
+def test_mask_to_labels_polygon():
+    mask = np.zeros((50, 50), dtype=np.uint8)
+    mask[10:40, 10:40] = 2
+    
+    lines, counts = mask_to_labels(mask, num_classes=2, label_format='polygon')
+    
+    assert counts.tolist() == [0, 1]
+    class_id, *coords = lines[0].split()
+    assert class_id == '1'
+    assert len(coords) >= 8 and len(coords) % 2 == 0
+
+
+def test_split_of_is_deterministic():
+    names = [f'task_{i}.json' for i in range(200)]
+    splits = [split_of(name, (0.7, 0.2, 0.1)) for name in names]
+    
+    assert splits == [split_of(name, (0.7, 0.2, 0.1)) for name in names]
+    assert set(splits) == {'train', 'val', 'test'}
+    assert splits.count('train') > splits.count('test')
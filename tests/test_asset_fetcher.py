@@ -0,0 +1,149 @@
+"""
+asset_fetcher testleri
+
+İndirici thread'li yerel bir http.server'a karşı çalıştırılır.
+"""
+
+import http.server
+import threading
+
+import pytest
+
+from asset_fetcher import AssetFetcher, cache_key
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Yol başına sabit içerik döndüren, ETag destekli test sunucusu"""
+    
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        server.requests.append((path, self.headers.get('If-None-Match')))
+        
+        # /flaky ilk server.failures istekte 503 döndürür
+        if path == '/flaky' and server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        body = server.files.get(path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        etag = f'"{len(body)}-{hash(body) & 0xffff}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.files = {'/image.png': b'image-bytes', '/mask.png': b'mask-bytes',
+                   '/flaky': b'flaky-bytes'}
+    httpd.failures = 0
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    with AssetFetcher(str(tmp_path / 'cache'), max_workers=4, backoff=0.0,
+                      timeout=5.0) as fetcher:
+        yield fetcher
+
+
+def test_cache_key_strips_signature_params():
+    signed = ('https://bucket.s3.amazonaws.com/a/b.png?X-Amz-Signature=abc'
+              '&X-Amz-Date=20240101&X-Amz-Expires=600&version=2')
+    assert cache_key(signed) == 'https://bucket.s3.amazonaws.com/a/b.png?version=2'
+
+
+def test_second_fetch_is_cache_hit(server, fetcher):
+    assert fetcher.fetch(server.url + '/image.png') == b'image-bytes'
+    assert fetcher.fetch(server.url + '/image.png') == b'image-bytes'
+    
+    assert len(server.requests) == 1
+    assert fetcher.counters['downloads'] == 1
+    assert fetcher.counters['hits'] == 1
+
+
+def test_signed_urls_share_cache_entry(server, fetcher):
+    fetcher.fetch(server.url + '/image.png?X-Amz-Signature=first&X-Amz-Date=1')
+    data = fetcher.fetch(server.url + '/image.png?X-Amz-Signature=second&X-Amz-Date=2')
+    
+    assert data == b'image-bytes'
+    assert len(server.requests) == 1
+    assert fetcher.stats()['entries'] == 1
+
+
+def test_retries_transient_503(server, fetcher):
+    server.failures = 2
+    
+    assert fetcher.fetch(server.url + '/flaky') == b'flaky-bytes'
+    assert fetcher.counters['retries'] == 2
+    assert len(server.requests) == 3
+
+
+def test_gives_up_after_retries(server, tmp_path):
+    server.failures = 10
+    with AssetFetcher(str(tmp_path / 'cache'), retries=1, backoff=0.0) as fetcher:
+        with pytest.raises(ValueError):
+            fetcher.fetch(server.url + '/flaky')
+    assert len(server.requests) == 2
+
+
+def test_revalidate_uses_304(server, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    with AssetFetcher(cache_dir) as fetcher:
+        fetcher.fetch(server.url + '/image.png')
+    
+    with AssetFetcher(cache_dir, revalidate=True) as fetcher:
+        assert fetcher.fetch(server.url + '/image.png') == b'image-bytes'
+        assert fetcher.counters['not_modified'] == 1
+        assert fetcher.counters['downloads'] == 0
+    assert server.requests[-1][1] is not None
+
+
+def test_revalidate_refetches_missing_blob(server, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    with AssetFetcher(cache_dir) as fetcher:
+        fetcher.fetch_path(server.url + '/image.png').unlink()
+    
+    with AssetFetcher(cache_dir, revalidate=True) as fetcher:
+        assert fetcher.fetch(server.url + '/image.png') == b'image-bytes'
+        assert fetcher.counters['downloads'] == 1
+    # Dosyası olmayan kayıt için koşullu istek gönderilmez
+    assert server.requests[-1][1] is None
+
+
+def test_prefetch_reports_errors(server, fetcher):
+    urls = [server.url + '/image.png', server.url + '/mask.png', server.url + '/missing.png']
+    
+    errors = fetcher.prefetch(urls)
+    
+    assert list(errors) == [server.url + '/missing.png']
+    assert fetcher.fetch(server.url + '/mask.png') == b'mask-bytes'
+    assert fetcher.counters['downloads'] == 2
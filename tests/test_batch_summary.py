@@ -0,0 +1,127 @@
+"""
+batch_summary testleri (akışlı satır dosyaları ve toplamlar)
+"""
+
+import csv
+import json
+
+import pytest
+
+import batch_summary
+from batch_summary import BatchSummaryWriter, SummaryTotals
+
+
+PHASES = ['Ferrit', 'Perlit']
+
+
+def _results(name, counts, areas, fractions, confidence, shape=(10, 20, 3), screen=None):
+    results = {
+        'image_path': f'/veri/{name}',
+        'image_shape': shape,
+        'timestamp': '2024-01-01T00:00:00',
+        'phase_statistics': {
+            'total_detections': sum(counts.values()),
+            'phase_counts': counts,
+            'phase_areas': areas,
+            'phase_area_fractions': fractions,
+            'average_confidence': confidence
+        }
+    }
+    if screen is not None:
+        results['screen'] = screen
+    return results
+
+
+FIRST = _results('a.png', {'Ferrit': 2, 'Perlit': 1}, {'Ferrit': 30.0, 'Perlit': 20.0},
+                 {'Ferrit': 0.15, 'Perlit': 0.1}, 0.8)
+SECOND = _results('b.png', {'Perlit': 1}, {'Perlit': 40.0}, {'Perlit': 0.1}, 0.5,
+                  shape=(20, 20, 3))
+REJECTED = _results('c.png', {}, {}, {}, 0.0,
+                    screen={'passed': False, 'stage': 'blank', 'reason': 'low_variance'})
+
+
+def test_totals_are_accumulated_incrementally():
+    totals = SummaryTotals()
+    for results in (FIRST, SECOND, REJECTED):
+        totals.add(results['phase_statistics'], results['image_shape'], results.get('screen'))
+    
+    assert totals.total_images == 3
+    assert totals.total_detections == 4
+    assert totals.phase_counts == {'Ferrit': 2, 'Perlit': 2}
+    assert totals.phase_areas == {'Ferrit': 30.0, 'Perlit': 60.0}
+    # Görüntü ortalaması yalnızca tespiti olan görüntüleri, tespit ortalaması tespitleri sayar
+    assert totals.average_confidence == pytest.approx(0.65)
+    assert totals.mean_detection_confidence == pytest.approx((0.8 * 3 + 0.5) / 4)
+    # Oranlar görüntü alanlarıyla ağırlıklandırılır; toplam alan 200 + 400 + 200
+    assert totals.phase_area_fractions == pytest.approx({'Ferrit': 30 / 800, 'Perlit': 60 / 800})
+    assert totals.rejected_images == 1
+    assert totals.screen_rejections == {'blank': {'low_variance': 1}}
+
+
+def test_rows_are_readable_while_running(tmp_path):
+    writer = BatchSummaryWriter(str(tmp_path), ['jsonl', 'csv'], PHASES)
+    writer.add(FIRST)
+    writer.add(REJECTED)
+    
+    with open(tmp_path / 'batch_results.jsonl', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    with open(tmp_path / 'batch_results.csv', encoding='utf-8', newline='') as f:
+        csv_rows = list(csv.DictReader(f))
+    writer.close()
+    
+    assert [row['image_name'] for row in rows] == ['a.png', 'c.png']
+    assert rows[0]['width'] == 20 and rows[0]['height'] == 10
+    assert rows[0]['count_Ferrit'] == 2 and rows[0]['count_Unknown'] == 0
+    assert rows[0]['fraction_Perlit'] == pytest.approx(0.1)
+    assert rows[1]['screen_reason'] == 'blank/low_variance'
+    assert [row['image_name'] for row in csv_rows] == ['a.png', 'c.png']
+    assert csv_rows[0]['area_Ferrit'] == '30.0'
+
+
+def test_close_finalises_spooled_text(tmp_path):
+    writer = BatchSummaryWriter(str(tmp_path), (), PHASES)
+    writer.add(FIRST)
+    writer.add(SECOND)
+    part_path = tmp_path / 'batch_summary.txt.part'
+    assert part_path.exists()
+    
+    writer.close()
+    
+    assert not part_path.exists()
+    summary = (tmp_path / 'batch_summary.txt').read_text(encoding='utf-8')
+    assert 'Toplam İşlenen Görüntü: 2' in summary
+    assert summary.index('1. a.png') < summary.index('2. b.png')
+    assert '      - Perlit: 1' in summary
+    totals = json.loads((tmp_path / 'batch_totals.json').read_text(encoding='utf-8'))
+    assert totals['total_images'] == 2 and totals['phase_counts'] == {'Ferrit': 2, 'Perlit': 2}
+
+
+def test_close_without_summary_only_removes_spool(tmp_path):
+    writer = BatchSummaryWriter(str(tmp_path), ['jsonl'], PHASES)
+    writer.add(FIRST)
+    
+    writer.close(write_summary=False)
+    
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['batch_results.jsonl']
+
+
+def test_totals_file_is_replaced_atomically(tmp_path, monkeypatch):
+    writer = BatchSummaryWriter(str(tmp_path), (), PHASES)
+    writer.add(FIRST)
+    writer.write_totals()
+    totals_path = tmp_path / 'batch_totals.json'
+    before = totals_path.read_text(encoding='utf-8')
+    
+    def failing_replace(source, target):
+        raise OSError('yer değiştirme başarısız')
+    
+    monkeypatch.setattr(batch_summary.os, 'replace', failing_replace)
+    writer.add(SECOND)
+    with pytest.raises(OSError):
+        writer.write_totals()
+    
+    # Yarıda kalan yazım mevcut dosyayı bozmaz
+    assert totals_path.read_text(encoding='utf-8') == before
+    assert json.loads(before)['total_images'] == 1
+    monkeypatch.undo()
+    writer.close()
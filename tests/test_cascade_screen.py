@@ -0,0 +1,86 @@
+"""
+cascade_screen testleri (istatistik taraması ve aday döşemeler)
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from cascade_screen import CascadeScreen
+from tiled_inference import compute_tiles
+
+
+def _textured(shape=(600, 800, 3)):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=shape, dtype=np.uint8)
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+def test_blank_image_is_rejected():
+    image = np.full((600, 800, 3), 128, dtype=np.uint8)
+    image += np.random.default_rng(1).integers(0, 3, size=image.shape, dtype=np.uint8)
+    
+    screen = CascadeScreen().screen_statistics(image)
+    
+    assert not screen['passed']
+    assert (screen['stage'], screen['reason']) == ('statistics', 'blank')
+    assert screen['measures']['contrast'] < 5.0
+
+
+def test_textured_image_passes():
+    screen = CascadeScreen(min_focus=10.0).screen_statistics(_textured())
+    
+    assert screen['passed']
+    assert screen['measures']['contrast'] > 5.0
+    assert screen['measures']['focus'] > 10.0
+
+
+def test_blurred_image_is_out_of_focus():
+    image = _textured()
+    sharp = CascadeScreen().measure(image)['focus']
+    blurred = cv2.GaussianBlur(image, (0, 0), 8)
+    
+    screen = CascadeScreen(min_contrast=0.5, min_focus=sharp / 10).screen_statistics(blurred)
+    
+    assert (screen['passed'], screen.get('reason')) == (False, 'out_of_focus')
+
+
+def test_measures_use_downscaled_gray_copy():
+    image = _textured((1024, 512, 3))
+    gray = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (128, 256),
+                      interpolation=cv2.INTER_AREA)
+    
+    measures = CascadeScreen(statistics_size=256).measure(image)
+    
+    assert measures['contrast'] == pytest.approx(float(gray.std()))
+
+
+def test_low_res_stage_rejects_images_without_detections():
+    screen = CascadeScreen(low_res_size=320)
+    passed = screen.screen_statistics(_textured())
+    
+    assert screen.screen_low_res(passed, np.empty((0, 4)))['reason'] == 'no_detections'
+    assert screen.screen_low_res(passed, np.array([[0, 0, 5, 5]]))['candidates'] == 1
+
+
+def test_candidate_tiles_intersect_boxes_with_margin():
+    tiles = compute_tiles(200, 300, 100, 0.0)
+    box = np.array([[120, 20, 180, 60]])
+    
+    without_margin = CascadeScreen(region_margin=0).candidate_tiles(tiles, box)
+    with_margin = CascadeScreen(region_margin=30).candidate_tiles(tiles, box)
+    
+    assert without_margin == [(100, 0, 200, 100)]
+    # 30 piksellik pay kutuyu (90, -10, 210, 90) yapar: sol ve sağ komşular da seçilir
+    assert with_margin == [(0, 0, 100, 100), (100, 0, 200, 100), (200, 0, 300, 100)]
+    assert CascadeScreen().candidate_tiles(tiles, np.empty((0, 4))) == []
+
+
+def test_touching_edge_does_not_select_tile():
+    tiles = compute_tiles(100, 200, 100, 0.0)
+    # Kutu döşeme sınırına (x = 100) yalnızca değiyor
+    box = np.array([[50, 10, 100, 40]])
+    
+    selected = CascadeScreen(region_margin=0).candidate_tiles(tiles, box)
+    
+    assert selected == [(0, 0, 100, 100)]
@@ -0,0 +1,35 @@
+"""
+detections testleri
+"""
+
+import numpy as np
+import pytest
+
+from detections import Detections
+
+
+PHASE_NAMES = {0: 'Ferrit', 1: 'Perlit'}
+
+
+def test_statistics_counts_and_areas():
+    detections = Detections(np.array([[0, 0, 10, 10], [0, 0, 2, 5], [5, 5, 10, 10]]),
+                            np.array([0.5, 0.7, 0.9]), np.array([1, 0, 1]), PHASE_NAMES)
+    
+    stats = detections.statistics()
+    
+    assert stats['total_detections'] == 3
+    assert list(stats['phase_counts']) == ['Perlit', 'Ferrit']
+    assert stats['phase_counts'] == {'Perlit': 2, 'Ferrit': 1}
+    assert stats['phase_areas'] == {'Perlit': 125.0, 'Ferrit': 10.0}
+    assert stats['average_confidence'] == pytest.approx(0.7)
+
+
+def test_records_roundtrip():
+    detections = Detections(np.array([[1, 2, 3, 4]]), np.array([0.5]), np.array([7]),
+                            PHASE_NAMES)
+    
+    restored = Detections.from_records(detections.tolist(), PHASE_NAMES)
+    
+    assert restored == detections
+    assert restored[0]['class_name'] == 'Unknown'
+    assert len(Detections.from_records([], PHASE_NAMES)) == 0
@@ -0,0 +1,101 @@
+"""
+image_discovery testleri (akışlı keşif, filtreler ve parçalama)
+"""
+
+import os
+
+import pytest
+
+import image_discovery
+from image_discovery import iter_image_files, shard_of
+
+
+TREE = [
+    'b.png', 'a.JPG', 'notes.txt', '.hidden.png',
+    'numune_1/x.tif', 'numune_1/y_thumb.jpg', 'numune_1/alt/z.png',
+    'numune_2/w.bmp', 'eski/old.png', 'eski/derin/older.png', 'results/out.png'
+]
+
+
+def _make_tree(root):
+    for relative_path in TREE:
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'')
+    return root
+
+
+def _relative(paths, root):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in paths]
+
+
+def test_sorted_depth_first_order(tmp_path):
+    root = _make_tree(tmp_path / 'data')
+    
+    found = _relative(iter_image_files(str(root)), root)
+    
+    # Klasör içinde önce dosyalar ada göre, sonra alt klasörler ada göre
+    assert found == ['a.JPG', 'b.png', 'eski/old.png', 'eski/derin/older.png',
+                     'numune_1/x.tif', 'numune_1/y_thumb.jpg', 'numune_1/alt/z.png',
+                     'numune_2/w.bmp', 'results/out.png']
+    assert _relative(iter_image_files(str(root), recursive=False), root) == ['a.JPG', 'b.png']
+
+
+def test_include_and_exclude_prune_directories(tmp_path, monkeypatch):
+    root = _make_tree(tmp_path / 'data')
+    visited = []
+    scandir = os.scandir
+    
+    def recording_scandir(path):
+        visited.append(os.path.relpath(path, root).replace(os.sep, '/'))
+        return scandir(path)
+    
+    monkeypatch.setattr(image_discovery.os, 'scandir', recording_scandir)
+    
+    found = _relative(iter_image_files(str(root), include=['numune_*/*'],
+                                       exclude=['eski', '*_thumb.jpg']), root)
+    
+    assert found == ['numune_1/x.tif', 'numune_1/alt/z.png', 'numune_2/w.bmp']
+    assert not any(path.startswith('eski') for path in visited)
+
+
+def test_skip_dirs_are_not_entered(tmp_path):
+    root = _make_tree(tmp_path / 'data')
+    
+    found = _relative(iter_image_files(str(root), skip_dirs=[str(root / 'results')]), root)
+    
+    assert 'results/out.png' not in found
+    assert len(found) == 8
+
+
+@pytest.mark.parametrize('num_shards', [2, 3, 5])
+def test_shards_are_disjoint_and_complete(tmp_path, num_shards):
+    root = _make_tree(tmp_path / 'data')
+    everything = set(iter_image_files(str(root)))
+    
+    shards = [set(iter_image_files(str(root), shard_index=index, num_shards=num_shards))
+              for index in range(num_shards)]
+    
+    assert set().union(*shards) == everything
+    assert sum(len(shard) for shard in shards) == len(everything)
+
+
+def test_shards_are_stable_across_roots(tmp_path):
+    first = _make_tree(tmp_path / 'makine_1' / 'arsiv')
+    second = _make_tree(tmp_path / 'baska' / 'yol')
+    
+    for index in range(3):
+        expected = [path for path in _relative(iter_image_files(str(first)), first)
+                    if shard_of(path, 3) == index]
+        assert _relative(iter_image_files(str(first), shard_index=index, num_shards=3),
+                         first) == expected
+        assert (_relative(iter_image_files(str(first), shard_index=index, num_shards=3), first)
+                == _relative(iter_image_files(str(second), shard_index=index, num_shards=3),
+                             second))
+
+
+def test_invalid_shard_is_rejected_on_call(tmp_path):
+    with pytest.raises(ValueError):
+        iter_image_files(str(tmp_path), shard_index=2, num_shards=2)
+    with pytest.raises(ValueError):
+        iter_image_files(str(tmp_path / 'yok'))
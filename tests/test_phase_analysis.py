@@ -0,0 +1,153 @@
+"""
+phase_analysis testleri (batch'li çıkarım)
+"""
+
+import json
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from phase_analysis import PhaseAnalyzer
+
+
+class StubModel:
+    """Her görüntü için genişliği kadar uzun tek kutu döndüren sahte backend"""
+    
+    def __init__(self):
+        self.calls = []
+        self.speed = {'preprocess': 0.0, 'inference': 0.0, 'postprocess': 0.0}
+    
+    def predict(self, images, conf):
+        self.calls.append(len(images))
+        return [(np.array([[0.0, 0.0, float(image.shape[1]), 1.0]]), np.array([0.9]),
+                 np.array([image.shape[1] % 5]))
+                for image in images]
+
+
+def _analyzer(tmp_path) -> PhaseAnalyzer:
+    analyzer = PhaseAnalyzer(str(tmp_path / 'model.onnx'), backend='onnxruntime')
+    analyzer.model = StubModel()
+    return analyzer
+
+
+def _write_images(tmp_path, widths):
+    paths = []
+    for index, width in enumerate(widths):
+        path = tmp_path / f'im{index}.png'
+        cv2.imwrite(str(path), np.full((8, width, 3), index, dtype=np.uint8))
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_makes_one_model_call_in_input_order(tmp_path):
+    widths = [12, 7, 20, 9, 15]
+    paths = _write_images(tmp_path, widths)
+    analyzer = _analyzer(tmp_path)
+    
+    all_results = analyzer.analyze_images(paths)
+    
+    assert analyzer.model.calls == [len(widths)]
+    assert [results['image_path'] for results in all_results] == paths
+    assert [results['image_shape'][1] for results in all_results] == widths
+    assert [float(results['detections'].boxes[0, 2]) for results in all_results] == widths
+
+
+class FailingModel(StubModel):
+    """fail_width genişliğindeki görüntüyü içeren her çağrıda hata veren sahte backend"""
+    
+    def __init__(self, fail_width):
+        super().__init__()
+        self.fail_width = fail_width
+    
+    def predict(self, images, conf):
+        if any(image.shape[1] == self.fail_width for image in images):
+            self.calls.append(len(images))
+            raise RuntimeError('bozuk görüntü')
+        return super().predict(images, conf)
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'pipeline'])
+def test_failed_batch_is_retried_per_image(tmp_path, mode):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    paths = _write_images(input_dir, [12, 7, 20, 9])
+    analyzer = _analyzer(tmp_path)
+    analyzer.model = FailingModel(fail_width=7)
+    
+    all_results = analyzer.batch_analyze(str(input_dir), str(tmp_path / 'out'),
+                                         batch_size=4, mode=mode, num_workers=1)
+    
+    assert [results['image_path'] for results in all_results] == [paths[0], paths[2], paths[3]]
+
+
+def _threshold_segmentation_model():
+    """Kırmızı kanalı 0.5'ten büyük pikselleri Perlit sayan sahte U-Net"""
+    from segmentation import SegmentationModel
+    
+    return SegmentationModel(lambda inputs: inputs[:, :1] - 0.5, out_channels=1,
+                             class_ids=[1])
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'pipeline'])
+def test_batch_results_carry_mask_path_instead_of_mask(tmp_path, mode):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    image = np.zeros((40, 30, 3), dtype=np.uint8)
+    image[:, 10:, 2] = 255
+    cv2.imwrite(str(input_dir / 'sample.png'), image)
+    analyzer = PhaseAnalyzer(str(tmp_path / 'unet.pth'), backend='unet', tile_size=16)
+    analyzer.model = _threshold_segmentation_model()
+    
+    all_results = analyzer.batch_analyze(str(input_dir), str(tmp_path / 'out'), mode=mode,
+                                         num_workers=1)
+    
+    assert 'mask' not in all_results[0]
+    mask = cv2.imread(all_results[0]['mask_path'], cv2.IMREAD_UNCHANGED)
+    assert (mask[:, :10] == 0).all() and (mask[:, 10:] == 2).all()
+
+
+def test_watch_feeds_one_pipeline(tmp_path):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    output_dir = tmp_path / 'out'
+    analyzer = _analyzer(tmp_path)
+    pipeline_calls = []
+    batch_pipeline = analyzer._batch_pipeline
+    
+    def counting_pipeline(*args, **kwargs):
+        pipeline_calls.append(args)
+        return batch_pipeline(*args, **kwargs)
+    
+    analyzer._batch_pipeline = counting_pipeline
+    stop_event = threading.Event()
+    watcher = threading.Thread(target=analyzer.watch, args=(str(input_dir), str(output_dir)),
+                               kwargs={'method': 'poll', 'settle_seconds': 0.1,
+                                       'poll_interval': 0.05, 'batch_size': 2,
+                                       'stop_event': stop_event})
+    watcher.start()
+    try:
+        results_path = output_dir / 'batch_results.jsonl'
+        for subdir, round_widths in (('a', [12, 7, 20]), ('b', [9, 15])):
+            (input_dir / subdir).mkdir()
+            paths = _write_images(input_dir / subdir, round_widths)
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                if results_path.exists():
+                    done = {json.loads(line)['image_path']
+                            for line in results_path.read_text().splitlines()}
+                    if set(paths) <= done:
+                        break
+                time.sleep(0.05)
+            else:
+                pytest.fail('izlenen görüntüler analiz edilmedi')
+    finally:
+        stop_event.set()
+        watcher.join(timeout=10)
+    
+    assert not watcher.is_alive()
+    assert len(pipeline_calls) == 1
+    assert len(results_path.read_text().splitlines()) == 5
+    assert json.loads((output_dir / 'batch_totals.json').read_text())['total_images'] == 5
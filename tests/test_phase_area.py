@@ -0,0 +1,34 @@
+"""
+phase_area testleri
+"""
+
+import numpy as np
+import pytest
+
+from phase_area import phase_area_statistics
+
+
+PHASE_NAMES = {0: 'Ferrit', 1: 'Perlit'}
+
+
+def test_union_area_does_not_double_count_overlaps():
+    boxes = np.array([[0, 0, 10, 10], [5, 0, 15, 10]])
+    
+    stats = phase_area_statistics(boxes, np.array([0, 0]), (10, 20), PHASE_NAMES)
+    
+    assert stats['phase_union_areas'] == {'Ferrit': 150.0}
+    assert stats['phase_area_fractions']['Ferrit'] == pytest.approx(0.75)
+    assert stats['covered_fraction'] == pytest.approx(0.75)
+
+
+def test_overlap_is_assigned_by_precedence():
+    boxes = np.array([[0, 0, 10, 10], [5, 0, 15, 10]])
+    class_ids = np.array([0, 1])
+    
+    default = phase_area_statistics(boxes, class_ids, (10, 20), PHASE_NAMES)
+    preferred = phase_area_statistics(boxes, class_ids, (10, 20), PHASE_NAMES,
+                                      precedence=['Perlit'], strip_height=3)
+    
+    assert default['phase_area_fractions'] == {'Ferrit': 0.5, 'Perlit': 0.25}
+    assert preferred['phase_area_fractions'] == {'Ferrit': 0.25, 'Perlit': 0.5}
+    assert preferred['phase_union_areas'] == {'Ferrit': 100.0, 'Perlit': 100.0}
@@ -0,0 +1,96 @@
+"""
+preprocessing testleri (LUT normalizasyonu, CLAHE ve thread güvenliği)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from preprocessing import Preprocessor
+
+
+def _image(seed, shape=(48, 64, 3)):
+    # Aralığın tamamını kullanmayan, düşük kontrastlı görüntü
+    rng = np.random.default_rng(seed)
+    return rng.integers(60, 180, size=shape, dtype=np.uint8)
+
+
+def _clahe(gray):
+    return cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray)
+
+
+def test_minmax_lut_matches_cv2_normalize():
+    gray = _image(0, (48, 64))
+    
+    result = Preprocessor(normalize='minmax').apply(gray)
+    
+    expected = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+    assert np.array_equal(result, expected)
+    assert result.min() == 0 and result.max() == 255
+
+
+def test_color_normalization_uses_gray_range_for_all_channels():
+    image = _image(1)
+    
+    result = Preprocessor(normalize='minmax').apply(image)
+    
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    low, high = int(gray.min()), int(gray.max())
+    lut = np.clip((np.arange(256) - low) * 255.0 / (high - low), 0, 255).round()
+    assert np.array_equal(result, cv2.LUT(image, lut.astype(np.uint8)))
+
+
+def test_flat_image_is_not_stretched():
+    image = np.full((16, 16, 3), 100, dtype=np.uint8)
+    image[0, 0] = 105
+    
+    assert np.array_equal(Preprocessor(normalize='minmax').apply(image), image)
+
+
+def test_clahe_matches_cv2():
+    gray = _image(2, (48, 64))
+    image = _image(3)
+    
+    gray_result = Preprocessor(clahe_clip_limit=2.0).apply(gray)
+    color_result = Preprocessor(clahe_clip_limit=2.0).apply(image)
+    
+    assert np.array_equal(gray_result, _clahe(gray))
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+    lab[:, :, 0] = _clahe(lab[:, :, 0])
+    assert np.array_equal(color_result, cv2.cvtColor(lab, cv2.COLOR_LAB2BGR))
+
+
+def test_grayscale_chain_matches_cv2():
+    image = _image(4)
+    
+    result = Preprocessor(denoise='gaussian', clahe_clip_limit=2.0,
+                          grayscale=True).apply(image)
+    
+    gray = cv2.GaussianBlur(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+    assert np.array_equal(result, cv2.cvtColor(_clahe(gray), cv2.COLOR_GRAY2BGR))
+
+
+def test_inplace_matches_copy():
+    preprocessor = Preprocessor.from_config('methodology')
+    image = _image(5)
+    
+    expected = preprocessor.apply(image)
+    result = preprocessor.apply(image.copy(), inplace=True)
+    
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize('preset', ['methodology', 'clahe'])
+def test_threaded_use_matches_serial(preset):
+    # Farklı boyutlar thread başına buffer'ların yeniden ayrılmasını da dener
+    images = [_image(seed, (40 + 8 * (seed % 3), 56, 3)) for seed in range(24)]
+    serial = [Preprocessor.from_config(preset).apply(image) for image in images]
+    
+    shared = Preprocessor.from_config(preset)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        threaded = list(pool.map(shared.apply, images))
+    
+    for expected, result in zip(serial, threaded):
+        assert np.array_equal(result, expected)
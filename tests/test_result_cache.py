@@ -0,0 +1,90 @@
+"""
+result_cache testleri
+"""
+
+import json
+
+import numpy as np
+
+from result_cache import ResultCache, make_cache_key
+
+
+def _entry(index: int) -> dict:
+    return {'detections': [], 'index': index, 'padding': 'x' * 80}
+
+
+def _entry_size() -> int:
+    return len(json.dumps(_entry(0)))
+
+
+def test_cache_key_depends_on_all_inputs():
+    base = make_cache_key('image', 'model', 0.25, {'tile_size': None})
+    
+    assert base == make_cache_key('image', 'model', 0.25, {'tile_size': None})
+    assert base != make_cache_key('other', 'model', 0.25, {'tile_size': None})
+    assert base != make_cache_key('image', 'other', 0.25, {'tile_size': None})
+    assert base != make_cache_key('image', 'model', 0.5, {'tile_size': None})
+    assert base != make_cache_key('image', 'model', 0.25, {'tile_size': 640})
+
+
+def test_put_get_roundtrip_with_numpy_values(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put('key', {'shape': np.array([2, 3]), 'score': np.float32(0.5)})
+    
+    assert cache.get('key') == {'shape': [2, 3], 'score': 0.5}
+    assert cache.get('missing') is None
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=_entry_size() * 5)
+    for index in range(5):
+        cache.put(f'key{index}', _entry(index))
+    # key0 okunduğu için en son kullanılan olur, key1 en eskisi kalır
+    assert cache.get('key0') is not None
+    
+    cache.put('key5', _entry(5))
+    
+    assert cache.get('key1') is None
+    assert cache.get('key0') is not None
+    assert cache.get('key5') is not None
+    stats = cache.stats()
+    assert stats['evictions'] >= 1
+    assert stats['size_bytes'] <= cache.max_bytes
+
+
+def test_running_total_tracks_replacements(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=_entry_size() * 3)
+    for _ in range(10):
+        cache.put('same', _entry(0))
+    
+    assert cache.evictions == 0
+    assert cache.stats()['size_bytes'] == _entry_size()
+
+
+def test_reopen_with_smaller_limit_evicts(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for index in range(10):
+        cache.put(f'key{index}', _entry(index))
+    cache.close()
+    
+    cache = ResultCache(str(tmp_path), max_bytes=_entry_size() * 4)
+    
+    stats = cache.stats()
+    assert stats['size_bytes'] <= cache.max_bytes
+    assert cache.get('key9') is not None
+    assert cache.get('key0') is None
+
+
+def test_access_times_are_persisted_on_close(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=_entry_size() * 3)
+    for index in range(3):
+        cache.put(f'key{index}', _entry(index))
+    cache.get('key0')
+    cache.close()
+    
+    cache = ResultCache(str(tmp_path), max_bytes=_entry_size() * 3)
+    cache.put('key3', _entry(3))
+    
+    assert cache.get('key0') is not None
+    assert cache.get('key1') is None
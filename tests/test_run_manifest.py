@@ -0,0 +1,64 @@
+"""
+run_manifest testleri (kaldığı yerden devam)
+"""
+
+import os
+from pathlib import Path
+
+from run_manifest import RunManifest
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+def test_resume_skips_done_files(tmp_path):
+    first = _write(tmp_path / 'a.png', b'a')
+    second = _write(tmp_path / 'b.png', b'b')
+    failed = _write(tmp_path / 'c.png', b'c')
+    
+    manifest = RunManifest(str(tmp_path))
+    manifest.record_success(str(first), {'image_shape': (1, 2, 3), 'value': 1})
+    manifest.record_failure(str(failed), ValueError('okunamadı'))
+    manifest.close()
+    
+    manifest = RunManifest(str(tmp_path))
+    assert manifest.pending([first, second, failed]) == [second, failed]
+    assert manifest.counts() == {'done': 1, 'failed': 1}
+
+
+def test_modified_file_is_pending_again(tmp_path):
+    image = _write(tmp_path / 'a.png', b'a')
+    manifest = RunManifest(str(tmp_path))
+    manifest.record_success(str(image), {'image_shape': (1, 1, 3)})
+    
+    _write(image, b'changed')
+    
+    assert manifest.pending([image]) == [image]
+
+
+def test_verify_hash_ignores_touched_but_identical_files(tmp_path):
+    image = _write(tmp_path / 'a.png', b'a')
+    manifest = RunManifest(str(tmp_path), verify_hash=True)
+    manifest.record_success(str(image), {'image_shape': (1, 1, 3)})
+    
+    stat = os.stat(image)
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    
+    assert manifest.pending([image]) == []
+    _write(image, b'b')
+    assert manifest.pending([image]) == [image]
+
+
+def test_results_are_returned_in_requested_order(tmp_path):
+    files = [_write(tmp_path / f'{name}.png', name.encode()) for name in ('b', 'a', 'c')]
+    manifest = RunManifest(str(tmp_path))
+    for index, image in enumerate(files):
+        manifest.record_success(str(image), {'image_shape': [4, 5, 3], 'index': index})
+    
+    results = manifest.load_results(files)
+    
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert results[0]['image_shape'] == (4, 5, 3)
+    assert [r['index'] for r in manifest.iter_results(reversed(files))] == [2, 1, 0]
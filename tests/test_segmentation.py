@@ -0,0 +1,70 @@
+"""
+segmentation testleri (döşemeli segmentasyon ve maske istatistikleri)
+"""
+
+import numpy as np
+import pytest
+import torch
+
+from segmentation import SegmentationModel, mask_statistics, segment_image
+from tiled_inference import ImageSource
+
+
+PHASE_NAMES = {0: 'Ferrit', 1: 'Perlit', 2: 'Austenit'}
+
+
+def _constant_model(channel: int) -> SegmentationModel:
+    """Her pikselde aynı kanalı seçen sahte çok sınıflı U-Net"""
+    def module(inputs):
+        logits = torch.zeros((inputs.shape[0], 4) + tuple(inputs.shape[2:]))
+        logits[:, channel] = 1.0
+        return logits
+    
+    return SegmentationModel(module, out_channels=4, class_ids=[0, 1, 2])
+
+
+def _threshold_model() -> SegmentationModel:
+    """Kırmızı kanalı 0.5'ten büyük pikselleri Perlit sayan sahte ikili U-Net"""
+    return SegmentationModel(lambda inputs: inputs[:, :1] - 0.5, out_channels=1,
+                             class_ids=[1])
+
+
+@pytest.mark.parametrize('channel', [0, 2])
+def test_constant_model_gives_uniform_mask(channel):
+    # 70 x 45 görüntü 32'lik döşemelerin katı değildir; son döşemeler kaydırılır
+    image = np.zeros((70, 45, 3), dtype=np.uint8)
+    
+    mask, histogram = segment_image(_constant_model(channel), ImageSource(image),
+                                    tile_size=32, overlap=0.25, batch_size=3)
+    
+    assert mask.shape == (70, 45)
+    assert (mask == channel).all()
+    assert np.array_equal(histogram, np.bincount(mask.ravel(), minlength=256))
+
+
+def test_pixelwise_model_has_no_tile_seams():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=(70, 45, 3), dtype=np.uint8)
+    
+    mask, histogram = segment_image(_threshold_model(), ImageSource(image),
+                                    tile_size=32, overlap=0.25, batch_size=2)
+    
+    # Kırmızı kanal BGR'de son kanaldır
+    expected = np.where(image[:, :, 2] / 255.0 > 0.5, 2, 0).astype(np.uint8)
+    assert np.array_equal(mask, expected)
+    assert np.array_equal(histogram, np.bincount(mask.ravel(), minlength=256))
+
+
+def test_mask_statistics_matches_pixel_counts():
+    mask = np.zeros((10, 20), dtype=np.uint8)
+    mask[:, :5] = 1
+    mask[:4, 5:] = 3
+    
+    stats = mask_statistics(np.bincount(mask.ravel(), minlength=256), mask.shape,
+                            PHASE_NAMES)
+    
+    assert stats['phase_areas'] == {'Ferrit': 50.0, 'Austenit': 60.0}
+    assert stats['phase_union_areas'] == stats['phase_areas']
+    assert stats['phase_area_fractions'] == {'Ferrit': 0.25, 'Austenit': 0.3}
+    assert stats['covered_fraction'] == pytest.approx(0.55)
+    assert stats['total_detections'] == 0
@@ -0,0 +1,103 @@
+"""
+sweep testleri (ASHA basamakları ve zamanlayıcı)
+"""
+
+import random
+
+import pytest
+import yaml
+
+from sweep import ASHAScheduler, load_sweep_config, rung_epochs, sample_parameters
+
+
+def test_rung_epochs_geometric():
+    assert rung_epochs(3, 27, 3) == [3, 9, 27]
+    assert rung_epochs(1, 8, 2) == [1, 2, 4, 8]
+
+
+def test_rung_epochs_rounds_and_ends_at_max():
+    assert rung_epochs(2, 20, 3) == [2, 7, 20]
+    assert rung_epochs(5, 5, 3) == [5]
+
+
+def test_scheduler_promotes_top_fraction():
+    scheduler = ASHAScheduler(num_trials=4, rungs=[1, 3], reduction_factor=2)
+    assert scheduler.next_job() == (0, 0)
+    assert scheduler.next_job() == (1, 0)
+    
+    scheduler.report(0, 0, 0.5)
+    scheduler.report(1, 0, 0.9)
+    # İki denemeden en iyisi (1) terfi eder
+    assert scheduler.next_job() == (1, 1)
+    assert scheduler.next_job() == (2, 0)
+    assert scheduler.next_job() == (3, 0)
+    
+    scheduler.report(2, 0, 0.1)
+    scheduler.report(3, 0, 0.95)
+    # En iyi ikisi 3 ve 1'dir; 1 zaten terfi etti
+    assert scheduler.next_job() == (3, 1)
+    assert scheduler.next_job() is None
+
+
+def test_scheduler_never_promotes_failed_trials():
+    scheduler = ASHAScheduler(num_trials=2, rungs=[1, 3], reduction_factor=2)
+    scheduler.next_job()
+    scheduler.next_job()
+    scheduler.report(0, 0, None)
+    scheduler.report(1, 0, None)
+    
+    assert scheduler.next_job() is None
+
+
+def test_scheduler_does_not_promote_from_last_rung():
+    scheduler = ASHAScheduler(num_trials=1, rungs=[1], reduction_factor=2)
+    assert scheduler.next_job() == (0, 0)
+    scheduler.report(0, 0, 1.0)
+    
+    assert scheduler.next_job() is None
+
+
+def test_sample_parameters_is_seeded_and_in_range():
+    space = {
+        'lr0': {'type': 'loguniform', 'low': 1e-4, 'high': 1e-1},
+        'mosaic': {'type': 'uniform', 'low': 0.0, 'high': 1.0},
+        'imgsz': [320, 640],
+        'batch': {'type': 'int', 'low': 4, 'high': 8},
+        'optimizer': 'SGD'
+    }
+    first = sample_parameters(space, random.Random(7))
+    
+    assert first == sample_parameters(space, random.Random(7))
+    assert 1e-4 <= first['lr0'] <= 1e-1
+    assert 0.0 <= first['mosaic'] <= 1.0
+    assert first['imgsz'] in (320, 640)
+    assert isinstance(first['batch'], int) and 4 <= first['batch'] <= 8
+    assert first['optimizer'] == 'SGD'
+
+
+def test_load_sweep_config_merges_defaults(tmp_path):
+    path = tmp_path / 'sweep.yaml'
+    path.write_text(yaml.safe_dump({'trials': 4, 'space': {'lr0': [0.01, 0.001]}}))
+    
+    config = load_sweep_config(str(path))
+    
+    assert config['trials'] == 4
+    assert config['reduction_factor'] == 3
+    assert config['space'] == {'lr0': [0.01, 0.001]}
+
+
+@pytest.mark.parametrize('config', [
+    {'unknown_key': 1},
+    {'space': {'lr0': []}},
+    {'space': {'lr0': {'type': 'normal', 'low': 0, 'high': 1}}},
+    {'space': {'lr0': {'type': 'loguniform', 'low': 0, 'high': 1}}},
+    {'space': {'lr0': {'type': 'uniform', 'low': 0}}},
+    {'min_epochs': 10, 'max_epochs': 5},
+    {'reduction_factor': 1}
+])
+def test_load_sweep_config_rejects_invalid(tmp_path, config):
+    path = tmp_path / 'sweep.yaml'
+    path.write_text(yaml.safe_dump(config))
+    
+    with pytest.raises(ValueError):
+        load_sweep_config(str(path))
@@ -0,0 +1,133 @@
+"""
+tiled_inference testleri
+"""
+
+import numpy as np
+import pytest
+
+from tiled_inference import ImageSource, compute_tiles, merge_tile_detections, non_max_suppression
+
+
+def test_tiles_cover_image_with_equal_size():
+    tiles = compute_tiles(1000, 1500, 640, overlap=0.2)
+    
+    assert all(x2 - x1 == 640 and y2 - y1 == 640 for x1, y1, x2, y2 in tiles)
+    covered = np.zeros((1000, 1500), dtype=bool)
+    for x1, y1, x2, y2 in tiles:
+        covered[y1:y2, x1:x2] = True
+    assert covered.all()
+    # Son döşemeler kenara hizalanır
+    assert max(x2 for _, _, x2, _ in tiles) == 1500
+    assert max(y2 for _, _, _, y2 in tiles) == 1000
+
+
+def test_tiles_respect_overlap_stride():
+    tiles = compute_tiles(100, 300, 100, overlap=0.5)
+    
+    assert [x1 for x1, _, _, _ in tiles] == [0, 50, 100, 150, 200]
+
+
+def test_small_image_is_single_tile():
+    assert compute_tiles(300, 200, 640) == [(0, 0, 200, 300)]
+
+
+@pytest.mark.parametrize('tile_size, overlap', [(0, 0.2), (640, 1.0), (640, -0.1)])
+def test_compute_tiles_rejects_invalid(tile_size, overlap):
+    with pytest.raises(ValueError):
+        compute_tiles(100, 100, tile_size, overlap)
+
+
+def test_read_tile_converts_rgb_to_bgr():
+    array = np.zeros((4, 4, 3), dtype=np.uint8)
+    array[..., 0] = 255  # RGB kırmızı
+    
+    tile = ImageSource(array, channel_order='rgb').read_tile((0, 0, 2, 2))
+    
+    assert tile.shape == (2, 2, 3)
+    assert tile[0, 0].tolist() == [0, 0, 255]
+
+
+def test_nms_suppresses_same_class_only():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [1, 1, 11, 11]], dtype=np.float32)
+    scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    class_ids = np.array([0, 0, 1])
+    
+    keep = non_max_suppression(boxes, scores, class_ids, iou_threshold=0.5)
+    
+    assert sorted(np.asarray(keep).tolist()) == [0, 2]
+
+
+def test_merge_moves_boxes_to_global_coordinates():
+    box = np.array([[10, 10, 20, 20]], dtype=np.float32)
+    score = np.array([0.9], dtype=np.float32)
+    cls = np.array([0])
+    # Aynı nesne iki örtüşen döşemede bulunur
+    tile_detections = [((0, 0, 100, 100), box + 50, score, cls),
+                       ((50, 0, 150, 100), box + [0, 50, 0, 50], score, cls)]
+    
+    boxes, scores, class_ids = merge_tile_detections(tile_detections, iou_threshold=0.5)
+    
+    assert boxes.tolist() == [[60, 60, 70, 70]]
+    assert class_ids.tolist() == [0]
+
+
+SEAM_TILES = [(0, 0, 100, 100), (60, 0, 160, 100)]
+
+
+def test_box_cut_by_seam_is_merged_with_full_box():
+    cls = np.array([0])
+    # Nesne x = 80..130 aralığında: ilk döşeme onu x = 100'de kesilmiş görür
+    cut = np.array([[80, 20, 100, 60]], dtype=np.float32)
+    full = np.array([[20, 20, 70, 60]], dtype=np.float32)
+    tile_detections = [(SEAM_TILES[0], cut, np.array([0.9], dtype=np.float32), cls),
+                       (SEAM_TILES[1], full, np.array([0.8], dtype=np.float32), cls)]
+    
+    boxes, scores, class_ids = merge_tile_detections(tile_detections, iou_threshold=0.5,
+                                                     image_size=(100, 160))
+    
+    assert boxes.tolist() == [[80, 20, 130, 60]]
+    assert scores.tolist() == pytest.approx([0.9])
+    assert class_ids.tolist() == [0]
+
+
+def test_object_cut_by_two_seams_is_merged_once():
+    cls = np.array([0])
+    tiles = SEAM_TILES + [(120, 0, 220, 100)]
+    # Nesne x = 50..170: her döşeme yalnızca bir parçasını görür
+    pieces = [np.array([[50, 10, 100, 40]]), np.array([[0, 10, 100, 40]]),
+              np.array([[0, 10, 50, 40]])]
+    tile_detections = [(tile, piece.astype(np.float32), np.array([score], dtype=np.float32), cls)
+                       for tile, piece, score in zip(tiles, pieces, [0.7, 0.9, 0.8])]
+    
+    boxes, scores, _ = merge_tile_detections(tile_detections, iou_threshold=0.5,
+                                             image_size=(100, 220))
+    
+    assert boxes.tolist() == [[50, 10, 170, 40]]
+    assert scores.tolist() == pytest.approx([0.9])
+
+def test_nested_boxes_away_from_seams_are_kept():
+    cls = np.array([0])
+    score = np.array([0.9], dtype=np.float32)
+    large = np.array([[65, 10, 95, 50]], dtype=np.float32)
+    small = np.array([[10, 20, 20, 30]], dtype=np.float32)  # global: 70..80
+    tile_detections = [(SEAM_TILES[0], large, score, cls),
+                       (SEAM_TILES[1], small, score * 0.9, cls)]
+    
+    boxes, _, _ = merge_tile_detections(tile_detections, iou_threshold=0.5,
+                                        image_size=(100, 160))
+    
+    assert len(boxes) == 2
+
+
+def test_seam_merge_keeps_classes_apart():
+    score = np.array([0.9], dtype=np.float32)
+    tile_detections = [(SEAM_TILES[0], np.array([[80, 20, 100, 60]], dtype=np.float32),
+                        score, np.array([0])),
+                       (SEAM_TILES[1], np.array([[20, 20, 70, 60]], dtype=np.float32),
+                        score, np.array([1]))]
+    
+    boxes, _, class_ids = merge_tile_detections(tile_detections, iou_threshold=0.5,
+                                                image_size=(100, 160))
+    
+    assert sorted(class_ids.tolist()) == [0, 1]
+    assert len(boxes) == 2
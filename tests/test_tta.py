@@ -0,0 +1,69 @@
+"""
+tta testleri (kutu dönüşümlerinin tersi ve kutu birleştirme)
+"""
+
+import numpy as np
+import pytest
+
+from tta import (TTA_TRANSFORMS, apply_transform, invert_boxes, resolve_transforms,
+                 weighted_box_fusion)
+
+
+def _bounding_box(image: np.ndarray) -> np.ndarray:
+    """İkili görüntüdeki dolu bölgenin xyxy kutusu"""
+    ys, xs = np.nonzero(image)
+    return np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], dtype=np.float32)
+
+
+@pytest.mark.parametrize('name', TTA_TRANSFORMS)
+def test_invert_boxes_restores_original_box(name):
+    image = np.zeros((60, 100), dtype=np.uint8)
+    image[5:20, 30:70] = 1
+    
+    transformed = apply_transform(image, name)
+    restored = invert_boxes(_bounding_box(transformed), name, image.shape)
+    
+    assert restored.tolist() == _bounding_box(image).tolist()
+
+
+def test_apply_transform_returns_contiguous_copy():
+    image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    
+    flipped = apply_transform(image, 'hflip')
+    
+    assert flipped.flags['C_CONTIGUOUS']
+    assert flipped[0].tolist() == [3, 2, 1, 0]
+
+
+def test_resolve_transforms():
+    assert resolve_transforms('rotations') == ('identity', 'rot90', 'rot180', 'rot270')
+    assert resolve_transforms(['identity', 'hflip']) == ('identity', 'hflip')
+    with pytest.raises(ValueError):
+        resolve_transforms('unknown')
+    with pytest.raises(ValueError):
+        resolve_transforms(['identity', 'shear'])
+
+
+def test_weighted_box_fusion_averages_and_penalizes_missing_views():
+    boxes = np.array([[0, 0, 10, 10], [2, 0, 12, 10], [50, 50, 60, 60]], dtype=np.float32)
+    scores = np.array([0.9, 0.9, 0.6], dtype=np.float32)
+    class_ids = np.array([0, 0, 0])
+    
+    fused_boxes, fused_scores, fused_classes = weighted_box_fusion(
+        boxes, scores, class_ids, num_views=2, iou_threshold=0.5)
+    
+    np.testing.assert_allclose(fused_boxes, [[1, 0, 11, 10], [50, 50, 60, 60]])
+    # Tek kopyada görülen kutunun skoru kopya sayısına bölünür
+    np.testing.assert_allclose(fused_scores, [0.9, 0.3], rtol=1e-6)
+    assert fused_classes.tolist() == [0, 0]
+
+
+def test_weighted_box_fusion_keeps_classes_apart():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10]], dtype=np.float32)
+    scores = np.array([0.9, 0.8], dtype=np.float32)
+    
+    fused_boxes, _, fused_classes = weighted_box_fusion(boxes, scores, np.array([0, 1]),
+                                                        num_views=1)
+    
+    assert len(fused_boxes) == 2
+    assert sorted(fused_classes.tolist()) == [0, 1]
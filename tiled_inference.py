@@ -0,0 +1,314 @@
+"""
+Büyük Görüntüler için Döşemeli (Tiled) Çıkarım Yardımcıları
+
+Bu modül büyük mikroyapı görüntülerini örtüşen döşemelere bölmek,
+döşemeleri tam çözünürlüklü görüntüyü kopyalamadan okumak ve döşeme
+sınırlarında tekrarlanan ve kesilen tespitleri birleştirmek için gerekli
+fonksiyonları içerir.
+"""
+
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+Tile = Tuple[int, int, int, int]
+
+
+class ImageSource:
+    """
+    Tam çözünürlüklü görüntüye döşeme bazında erişim sağlar
+    
+    Kaynak olarak bellekte bir numpy dizisi, np.memmap veya dilimlemeyi
+    destekleyen herhangi bir dizi benzeri nesne (ör. zarr/h5py veri seti)
+    kullanılabilir. Döşemeler okunurken yalnızca ilgili bölge kopyalanır,
+    böylece tam görüntü bellekte birden fazla kez tutulmaz.
+    """
+    
+    def __init__(self, array, channel_order: str = 'bgr',
+                 transform: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        """
+        Args:
+            array: (H, W) veya (H, W, C) boyutlu dizi benzeri kaynak
+            channel_order: Kaynağın kanal sırası ('bgr' veya 'rgb')
+            transform: Verilirse okunan her döşemeye uygulanır (ör. ön
+                işleme). Döşeme kaynağın bir görünümü olabileceğinden
+                transform girdisini değiştirmemelidir
+        """
+        if channel_order not in ('bgr', 'rgb'):
+            raise ValueError(f"Bilinmeyen kanal sırası: {channel_order}")
+        if len(array.shape) not in (2, 3):
+            raise ValueError(f"Desteklenmeyen görüntü boyutu: {array.shape}")
+        
+        self.array = array
+        self.channel_order = channel_order
+        self.transform = transform
+    
+    @classmethod
+    def open(cls, image_path: str) -> 'ImageSource':
+        """
+        Görüntü dosyasını mümkünse bellek eşlemeli (memory-mapped) açar
+        
+        .npy dosyaları ve sıkıştırılmamış TIFF dosyaları (tifffile kuruluysa)
+        diskten döşeme döşeme okunur. Diğer formatlar OpenCV ile bir kez
+        tamamen çözülür.
+        """
+        suffix = Path(image_path).suffix.lower()
+        
+        if suffix == '.npy':
+            return cls(np.load(image_path, mmap_mode='r'))
+        
+        if suffix in ('.tif', '.tiff'):
+            try:
+                import tifffile
+                return cls(tifffile.memmap(image_path, mode='r'), channel_order='rgb')
+            except ImportError:
+                # tifffile opsiyoneldir, yoksa OpenCV ile okunur
+                pass
+            except ValueError:
+                # Sıkıştırılmış veya parçalı TIFF dosyaları eşlenemez
+                pass
+        
+        import cv2
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Görüntü okunamadı: {image_path}")
+        return cls(image)
+    
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Kaynağın (H, W, 3) biçimindeki boyutu"""
+        return (self.array.shape[0], self.array.shape[1], 3)
+    
+    def read_tile(self, tile: Tile) -> np.ndarray:
+        """Döşemeyi bitişik, uint8, BGR bir dizi olarak okur (varsa transform uygulanır)"""
+        tile_image = self._read_region(tile)
+        return tile_image if self.transform is None else self.transform(tile_image)
+    
+    def _read_region(self, tile: Tile) -> np.ndarray:
+        import cv2
+        x1, y1, x2, y2 = tile
+        region = np.asarray(self.array[y1:y2, x1:x2])
+        
+        if region.dtype == np.uint16:
+            region = (region >> 8).astype(np.uint8)
+        elif region.dtype != np.uint8:
+            raise ValueError(f"Desteklenmeyen piksel tipi: {region.dtype}")
+        
+        if region.ndim == 2:
+            return cv2.cvtColor(region, cv2.COLOR_GRAY2BGR)
+        if region.shape[2] == 4:
+            code = cv2.COLOR_RGBA2BGR if self.channel_order == 'rgb' else cv2.COLOR_BGRA2BGR
+            return cv2.cvtColor(np.ascontiguousarray(region), code)
+        if self.channel_order == 'rgb':
+            return cv2.cvtColor(np.ascontiguousarray(region), cv2.COLOR_RGB2BGR)
+        return np.ascontiguousarray(region)
+
+
+def compute_tiles(height: int, width: int, tile_size: int,
+                  overlap: float = 0.2) -> List[Tile]:
+    """
+    Görüntüyü kaplayan örtüşen döşemelerin koordinatlarını hesaplar
+    
+    Son satır/sütundaki döşemeler görüntü kenarına hizalanır; böylece
+    görüntü döşemeden büyük olduğu sürece tüm döşemeler aynı boyuttadır.
+    
+    Args:
+        height: Görüntü yüksekliği
+        width: Görüntü genişliği
+        tile_size: Döşeme kenar uzunluğu (piksel)
+        overlap: Komşu döşemeler arasındaki örtüşme oranı (0 - 1)
+    
+    Returns:
+        List[Tile]: (x1, y1, x2, y2) döşeme koordinatları
+    """
+    if tile_size < 1:
+        raise ValueError(f"tile_size en az 1 olmalı: {tile_size}")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap 0 ile 1 arasında olmalı: {overlap}")
+    
+    stride = max(1, int(tile_size * (1 - overlap)))
+    
+    def starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        positions.append(length - tile_size)
+        return positions
+    
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def iter_tile_batches(source: ImageSource, tiles: List[Tile],
+                      batch_size: int) -> Iterator[Tuple[List[Tile], List[np.ndarray]]]:
+    """Döşemeleri batch_size'lık gruplar halinde tembel (lazy) olarak okur"""
+    for start in range(0, len(tiles), batch_size):
+        batch_tiles = tiles[start:start + batch_size]
+        yield batch_tiles, [source.read_tile(tile) for tile in batch_tiles]
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray,
+                        class_ids: np.ndarray, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Sınıf bazında Non-Maximum Suppression uygular
+    
+    Farklı sınıflardaki kutular birbirini bastırmaz. Her adımda en yüksek
+    skorlu kutunun kalan tüm kutularla IoU'su vektörel olarak hesaplanır.
+    
+    Args:
+        boxes: (N, 4) boyutlu xyxy kutular
+        scores: (N,) güven skorları
+        class_ids: (N,) sınıf indeksleri
+        iou_threshold: Bu değerin üzerindeki IoU'ya sahip kutular bastırılır
+    
+    Returns:
+        np.ndarray: Korunan kutuların skora göre azalan sırada indeksleri
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    # Sınıfları birbirinden ayırmak için kutuları sınıfa göre kaydır
+    offsets = class_ids.astype(np.float64)[:, None] * (float(boxes.max()) + 1.0)
+    shifted = boxes.astype(np.float64) + offsets
+    
+    x1, y1, x2, y2 = shifted.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+    
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        
+        order = rest[iou <= iou_threshold]
+    
+    return np.asarray(keep, dtype=np.int64)
+
+
+def merge_tile_detections(tile_detections: List[Tuple[Tile, np.ndarray, np.ndarray, np.ndarray]],
+                          iou_threshold: float = 0.5,
+                          image_size: Optional[Tuple[int, int]] = None,
+                          seam_threshold: float = 0.7,
+                          edge_tolerance: float = 2.0
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Döşeme koordinatlarındaki tespitleri global koordinatlara taşıyıp birleştirir
+    
+    Döşeme sınırının kestiği bir nesne, kesen döşemede kısaltılmış bir kutu
+    olarak bulunur; komşu döşemedeki tam kutuyla IoU'su düşük kaldığından
+    NMS'ten geçer. Bu yüzden NMS'ten sonra, farklı döşemelerden gelen ve
+    en az biri kendi döşemesinin iç kenarına değen aynı sınıftaki kutular
+    kesişim / küçük kutunun alanı oranı seam_threshold'u aşarsa tek kutuda
+    (ikisini kapsayan kutu, yüksek skor) birleştirilir.
+    
+    Args:
+        tile_detections: (döşeme, kutular, skorlar, sınıflar) listesi
+        iou_threshold: Döşeme sınırlarındaki tekrarlar için NMS IoU eşiği
+        image_size: (yükseklik, genişlik); verilirse kutular görüntüye kırpılır
+        seam_threshold: Kesilmiş kutuların birleştirileceği kesişim / küçük
+            alan oranı eşiği
+        edge_tolerance: Kutunun döşeme kenarına değmiş sayılacağı uzaklık (piksel)
+    
+    Returns:
+        Tuple: Birleştirilmiş (kutular, skorlar, sınıflar)
+    """
+    boxes_list, scores_list, classes_list, tiles_list, cut_list = [], [], [], [], []
+    if image_size is not None:
+        height, width = image_size
+    else:
+        height = max((tile[3] for tile, *_ in tile_detections), default=0)
+        width = max((tile[2] for tile, *_ in tile_detections), default=0)
+    
+    for tile_index, ((x1, y1, x2, y2), boxes, scores, class_ids) in enumerate(tile_detections):
+        if len(boxes) == 0:
+            continue
+        global_boxes = boxes + np.array([x1, y1, x1, y1], dtype=boxes.dtype)
+        # Görüntü kenarı olmayan döşeme kenarlarına değen kutular kesilmiş olabilir
+        cut = np.zeros(len(boxes), dtype=bool)
+        if x1 > 0:
+            cut |= global_boxes[:, 0] <= x1 + edge_tolerance
+        if y1 > 0:
+            cut |= global_boxes[:, 1] <= y1 + edge_tolerance
+        if x2 < width:
+            cut |= global_boxes[:, 2] >= x2 - edge_tolerance
+        if y2 < height:
+            cut |= global_boxes[:, 3] >= y2 - edge_tolerance
+        boxes_list.append(global_boxes)
+        scores_list.append(scores)
+        classes_list.append(class_ids)
+        tiles_list.append(np.full(len(boxes), tile_index))
+        cut_list.append(cut)
+    
+    if not boxes_list:
+        return (np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32),
+                np.empty(0, dtype=np.int64))
+    
+    boxes = np.concatenate(boxes_list)
+    scores = np.concatenate(scores_list)
+    class_ids = np.concatenate(classes_list)
+    
+    if image_size is not None:
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+    
+    keep = non_max_suppression(boxes, scores, class_ids, iou_threshold)
+    return _merge_seam_boxes(boxes[keep], scores[keep], class_ids[keep],
+                             np.concatenate(tiles_list)[keep],
+                             np.concatenate(cut_list)[keep], seam_threshold)
+
+
+def _merge_seam_boxes(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                      tile_ids: np.ndarray, cut: np.ndarray,
+                      threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Döşeme sınırında kesilmiş kutuları komşu döşemelerdeki kutularla birleştirir
+    
+    Her kesilmiş kutu farklı döşemelerden gelen aynı sınıftaki kutularla
+    karşılaştırılır; eşiği aşan kutular aynı gruba alınır (bir nesneyi
+    birden fazla sınır kesebileceğinden gruplar geçişlidir). Her grup,
+    üyelerini kapsayan kutu ve en yüksek skorla tek tespite indirgenir.
+    Kutular skora göre azalan sırada verilir ve bu sıra korunur.
+    """
+    cut_indices = np.flatnonzero(cut)
+    if cut_indices.size == 0:
+        return boxes, scores, class_ids
+    
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    # Birleşim-bul (union-find); grubun kökü en yüksek skorlu (en küçük indeksli) kutudur
+    parent = np.arange(len(boxes))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i in cut_indices:
+        box = boxes[i]
+        partners = np.flatnonzero((class_ids == class_ids[i]) & (tile_ids != tile_ids[i]))
+        inter_w = np.clip(np.minimum(box[2], boxes[partners, 2]) -
+                          np.maximum(box[0], boxes[partners, 0]), 0, None)
+        inter_h = np.clip(np.minimum(box[3], boxes[partners, 3]) -
+                          np.maximum(box[1], boxes[partners, 1]), 0, None)
+        smaller = np.maximum(np.minimum(areas[i], areas[partners]), 1e-9)
+        for j in partners[inter_w * inter_h / smaller > threshold]:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    roots = np.array([find(i) for i in range(len(boxes))])
+    merged = boxes.copy()
+    np.minimum.at(merged[:, 0], roots, boxes[:, 0])
+    np.minimum.at(merged[:, 1], roots, boxes[:, 1])
+    np.maximum.at(merged[:, 2], roots, boxes[:, 2])
+    np.maximum.at(merged[:, 3], roots, boxes[:, 3])
+    keep = roots == np.arange(len(boxes))
+    return merged[keep], scores[keep], class_ids[keep]
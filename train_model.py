@@ -7,10 +7,44 @@ Bu script metalik malzeme faz tespiti için YOLO modelini eğitir.
 import os
 import argparse
 from pathlib import Path
+from typing import Dict, Optional, Union
 from ultralytics import YOLO
 import yaml
 
 
+# model.train'e verilen varsayılan hiperparametreler (sweep ile değiştirilebilir)
+DEFAULT_HYPERPARAMETERS = {
+    'patience': 50,
+    'optimizer': 'AdamW',
+    'lr0': 0.01,
+    'lrf': 0.001,
+    'momentum': 0.937,
+    'weight_decay': 0.0005,
+    'warmup_epochs': 3,
+    'warmup_momentum': 0.8,
+    'box': 7.5,
+    'cls': 0.5,
+    'dfl': 1.5,
+    'pose': 12.0,      # YOLO v8 keypoint detection loss weight
+    'kobj': 2.0,       # YOLO v8 objectness loss weight
+    'label_smoothing': 0.0,
+    'nbs': 64,
+    'hsv_h': 0.015,
+    'hsv_s': 0.7,
+    'hsv_v': 0.4,
+    'degrees': 0.0,
+    'translate': 0.1,
+    'scale': 0.5,
+    'shear': 0.0,
+    'perspective': 0.0,
+    'flipud': 0.0,
+    'fliplr': 0.5,
+    'mosaic': 1.0,
+    'mixup': 0.0,
+    'copy_paste': 0.0
+}
+
+
 def create_yolo_dataset_config(data_dir: str, output_file: str = 'dataset.yaml'):
     """
     YOLO formatında veri seti konfigürasyon dosyası oluşturur
@@ -43,7 +77,9 @@ def create_yolo_dataset_config(data_dir: str, output_file: str = 'dataset.yaml')
 
 def train_model(data_config: str, epochs: int = 100, batch_size: int = 16,
                 img_size: int = 640, model_name: str = 'yolov8n.pt',
-                device: str = '0'):
+                device: str = '0', cache: Union[bool, str] = False,
+                hyperparameters: Optional[Dict] = None, project: str = 'runs/train',
+                name: str = 'phase_detection'):
     """
     YOLO modelini eğitir
     
@@ -54,7 +90,15 @@ def train_model(data_config: str, epochs: int = 100, batch_size: int = 16,
         img_size: Görüntü boyutu
         model_name: Başlangıç model adı (yolov8n.pt, yolov8s.pt, vb.)
         device: Cihaz (0 = GPU, cpu = CPU)
+        cache: Görüntü önbelleği ('ram', 'disk' veya False); önbellekte
+            görüntüler her epoch'ta diskten tekrar çözülmez
+        hyperparameters: DEFAULT_HYPERPARAMETERS üzerine yazılacak
+            model.train parametreleri (ör. {'lr0': 0.001, 'mosaic': 0.0})
+        project: Eğitim çıktılarının klasörü
+        name: Çalıştırma adı (çıktılar project/name altına yazılır)
     """
+    hyperparameters = dict(DEFAULT_HYPERPARAMETERS, **(hyperparameters or {}))
+    
     print("=" * 60)
     print("YOLO Model Eğitimi Başlıyor")
     print("=" * 60)
@@ -63,6 +107,11 @@ def train_model(data_config: str, epochs: int = 100, batch_size: int = 16,
     print(f"Batch Size: {batch_size}")
     print(f"Image Size: {img_size}")
     print(f"Device: {device}")
+    print(f"Cache: {cache or 'yok'}")
+    # Yalnızca varsayılandan farklı hiperparametreler yazdırılır
+    for key, value in sorted(hyperparameters.items()):
+        if key not in DEFAULT_HYPERPARAMETERS or value != DEFAULT_HYPERPARAMETERS[key]:
+            print(f"{key}: {value}")
     print("=" * 60)
     
     # Model yükle
@@ -75,45 +124,19 @@ def train_model(data_config: str, epochs: int = 100, batch_size: int = 16,
         batch=batch_size,
         imgsz=img_size,
         device=device,
-        patience=50,
+        cache=cache,
         save=True,
-        project='runs/train',
-        name='phase_detection',
+        project=project,
+        name=name,
         exist_ok=True,
         pretrained=True,
-        optimizer='AdamW',
-        lr0=0.01,
-        lrf=0.001,
-        momentum=0.937,
-        weight_decay=0.0005,
-        warmup_epochs=3,
-        warmup_momentum=0.8,
-        box=7.5,
-        cls=0.5,
-        dfl=1.5,
-        pose=12.0,      # YOLO v8 keypoint detection loss weight
-        kobj=2.0,       # YOLO v8 objectness loss weight
-        label_smoothing=0.0,
-        nbs=64,
-        hsv_h=0.015,
-        hsv_s=0.7,
-        hsv_v=0.4,
-        degrees=0.0,
-        translate=0.1,
-        scale=0.5,
-        shear=0.0,
-        perspective=0.0,
-        flipud=0.0,
-        fliplr=0.5,
-        mosaic=1.0,
-        mixup=0.0,
-        copy_paste=0.0
+        **hyperparameters
     )
     
     print("\n" + "=" * 60)
     print("Eğitim Tamamlandı!")
     print("=" * 60)
-    print(f"En iyi model: runs/train/phase_detection/weights/best.pt")
+    print(f"En iyi model: {project}/{name}/weights/best.pt")
     
     return results
 
@@ -148,14 +171,18 @@ def export_model(model_path: str, format: str = 'onnx'):
     
     Args:
         model_path: Model dosyası yolu
-        format: Dışa aktarma formatı (onnx, torchscript, tflite, vb.)
+        format: Dışa aktarma formatı (onnx, torchscript, openvino, tflite, vb.)
+    
+    Returns:
+        str: Dışa aktarılan modelin yolu
     """
     print(f"\nModel {format} formatına dışa aktarılıyor...")
     
     model = YOLO(model_path)
-    model.export(format=format)
+    exported_path = model.export(format=format)
     
-    print(f"Model başarıyla dışa aktarıldı!")
+    print(f"Model başarıyla dışa aktarıldı: {exported_path}")
+    return exported_path
 
 
 def main():
@@ -214,14 +241,81 @@ def main():
     parser.add_argument(
         '--export',
         type=str,
-        choices=['onnx', 'torchscript', 'tflite'],
+        choices=['onnx', 'torchscript', 'openvino', 'tflite'],
         help='Modeli belirtilen formata dışa aktar'
     )
     
+    parser.add_argument(
+        '--preprocess',
+        type=str,
+        help='Ön işleme hazır ayarı (methodology, clahe) veya JSON dosyası; '
+             'eğitim ön işlenmiş kopyalar üzerinde yapılır'
+    )
+    
+    parser.add_argument(
+        '--preprocess-dir',
+        type=str,
+        default='data/preprocessed',
+        help='Ön işlenmiş veri setinin yazılacağı dizin'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        type=str,
+        default='none',
+        choices=['auto', 'ram', 'disk', 'none'],
+        help='Çözülmüş görüntü önbelleği (varsayılan: kapalı); auto kullanılabilir '
+             'belleğe göre ram veya disk seçer. disk ve auto veri seti '
+             'görüntülerinin yanına .npy dosyaları yazabilir'
+    )
+    
+    parser.add_argument(
+        '--int8-calib',
+        type=str,
+        help='ONNX modelini bu klasördeki görüntülerle INT8 kuantize et'
+    )
+    
+    parser.add_argument(
+        '--sweep',
+        type=str,
+        help='Tek eğitim yerine bu YAML arama uzayıyla hiperparametre taraması '
+             'yap (bkz. models/sweep.yaml)'
+    )
+    
+    parser.add_argument(
+        '--sweep-output',
+        type=str,
+        default='runs/sweep',
+        help='Tarama denemelerinin ve leaderboard\'un yazılacağı dizin'
+    )
+    
     args = parser.parse_args()
     
+    # INT8 kuantizasyon ONNX dışa aktarımının bir adımıdır
+    if args.int8_calib and (args.export != 'onnx' or args.sweep):
+        parser.error('--int8-calib yalnızca --export onnx ile (tarama dışında) kullanılabilir')
+    
+    # Görüntüler çıkarımdaki PhaseAnalyzer ile aynı ön işlemeden geçirilir
+    data_dir = args.data
+    preprocessor = None
+    if args.preprocess:
+        from preprocessing import Preprocessor, preprocess_dataset
+        preprocessor = Preprocessor.from_config(args.preprocess)
+        preprocess_dataset(args.data, args.preprocess_dir, preprocessor)
+        data_dir = args.preprocess_dir
+    
     # Veri seti konfigürasyonu oluştur
-    config_file = create_yolo_dataset_config(args.data)
+    config_file = create_yolo_dataset_config(data_dir)
+    
+    # Tarama denemeleri cihaz ve epoch ayarlarını sweep YAML'ından alır
+    if args.sweep:
+        from sweep import run_sweep
+        run_sweep(args.sweep, config_file, data_dir, args.sweep_output, args.cache)
+        return
+    
+    # CPU ile eğitimde darboğaz görüntülerin her epoch'ta yeniden çözülmesidir
+    from dataset_cache import resolve_cache_mode
+    cache = resolve_cache_mode(args.cache, data_dir, args.img_size)
     
     # Modeli eğit
     train_model(
@@ -230,19 +324,31 @@ def main():
         batch_size=args.batch_size,
         img_size=args.img_size,
         model_name=args.model,
-        device=args.device
+        device=args.device,
+        cache=cache
     )
     
     # En iyi model yolu
     best_model = 'runs/train/phase_detection/weights/best.pt'
     
+    # Ön işleme ayarları modelin yanına kaydedilir
+    preprocess_config = None
+    if preprocessor is not None and os.path.exists(best_model):
+        preprocess_config = os.path.join(os.path.dirname(best_model), 'preprocessing.json')
+        preprocessor.save(preprocess_config)
+    
     # Doğrulama
     if args.validate and os.path.exists(best_model):
         validate_model(best_model, config_file)
     
     # Dışa aktarma
     if args.export and os.path.exists(best_model):
-        export_model(best_model, args.export)
+        exported_path = export_model(best_model, args.export)
+        
+        # INT8 kuantizasyon (yalnızca ONNX)
+        if args.int8_calib and args.export == 'onnx':
+            from inference_backends import quantize_onnx_model
+            quantize_onnx_model(exported_path, args.int8_calib, imgsz=args.img_size)
     
     print("\n" + "=" * 60)
     print("İşlemler Tamamlandı!")
@@ -252,6 +358,10 @@ def main():
     print(f"   cp {best_model} models/yolov8_phase_detection.pt")
     print(f"2. Modeli test edin:")
     print(f"   python phase_analysis.py")
+    if preprocess_config:
+        print(f"3. Çıkarımda aynı ön işlemeyi kullanın:")
+        print(f"   cp {preprocess_config} models/preprocessing.json")
+        print(f"   PhaseAnalyzer(..., preprocessor='models/preprocessing.json')")
 
 
 if __name__ == "__main__":
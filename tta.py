@@ -0,0 +1,166 @@
+"""
+Test-Time Augmentation (TTA) ve Ağırlıklı Kutu Birleştirme
+
+Mikroyapı görüntülerinin tercih edilen bir yönü olmadığından görüntünün
+yansıtılmış ve 90°'nin katları kadar döndürülmüş kopyaları da aynı
+etiketleri taşır. Bu modül bu dönüşümleri, kopyalarda bulunan kutuların
+orijinal yönelime geri taşınmasını ve kopyaların tespitlerinin vektörel
+Weighted Box Fusion (WBF) ile birleştirilmesini içerir.
+
+Doğruluk / gecikme dengesi: Her dönüşüm modele giden görüntü sayısını bir
+artırır. Kopyalar tek bir batch'te işlendiğinden çağrı başına sabit
+maliyetler (model çağrısı, ön/son işleme kurulumu) bir kez ödenir, ancak
+ağın hesaplama maliyeti kopya sayısıyla doğrusal büyür: 'flips' (3 kopya)
+yaklaşık 3 kat, 'dihedral' (8 kopya) yaklaşık 8 kat çıkarım süresi
+demektir. Karşılığında küçük ve sınırdaki fazlarda kaçırma oranı düşer,
+kutu koordinatları kopyaların ortalaması olduğundan daha kararlı olur ve
+yalnızca bir kopyada görülen düşük güvenli tespitlerin skoru düşürülür.
+"""
+
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+
+TTA_TRANSFORMS = ('identity', 'hflip', 'vflip', 'rot90', 'rot180', 'rot270',
+                  'transpose', 'transverse')
+
+TTA_PRESETS: Dict[str, Tuple[str, ...]] = {
+    'flips': ('identity', 'hflip', 'vflip'),
+    'rotations': ('identity', 'rot90', 'rot180', 'rot270'),
+    'dihedral': TTA_TRANSFORMS
+}
+
+
+def resolve_transforms(tta: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    """Hazır ayar adını veya dönüşüm listesini doğrulanmış bir demete dönüştürür"""
+    transforms = TTA_PRESETS[tta] if isinstance(tta, str) and tta in TTA_PRESETS else tta
+    if isinstance(transforms, str):
+        raise ValueError(f"Bilinmeyen TTA ayarı: {tta}")
+    transforms = tuple(transforms)
+    for name in transforms:
+        if name not in TTA_TRANSFORMS:
+            raise ValueError(f"Bilinmeyen TTA dönüşümü: {name}")
+    if not transforms:
+        raise ValueError("TTA için en az bir dönüşüm verilmeli")
+    return transforms
+
+
+def apply_transform(image: np.ndarray, name: str) -> np.ndarray:
+    """Görüntüye dönüşümü uygular (sonuç C-bitişik bir kopyadır)"""
+    if name == 'identity':
+        return image
+    if name == 'hflip':
+        transformed = image[:, ::-1]
+    elif name == 'vflip':
+        transformed = image[::-1]
+    elif name == 'rot90':
+        transformed = np.rot90(image, 1)
+    elif name == 'rot180':
+        transformed = image[::-1, ::-1]
+    elif name == 'rot270':
+        transformed = np.rot90(image, 3)
+    elif name == 'transpose':
+        transformed = image.swapaxes(0, 1)
+    elif name == 'transverse':
+        transformed = np.rot90(image, 2).swapaxes(0, 1)
+    else:
+        raise ValueError(f"Bilinmeyen TTA dönüşümü: {name}")
+    # OpenCV tabanlı ön işleme negatif adımlı görünümleri kabul etmez
+    return np.ascontiguousarray(transformed)
+
+
+def invert_boxes(boxes: np.ndarray, name: str, image_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Dönüştürülmüş görüntüde bulunan xyxy kutuları orijinal koordinatlara taşır
+    
+    Args:
+        boxes: (N, 4) dönüştürülmüş görüntü koordinatlarındaki kutular
+        name: Uygulanan dönüşüm
+        image_shape: Orijinal görüntünün boyutu (yükseklik, genişlik, ...)
+    """
+    if name == 'identity' or len(boxes) == 0:
+        return boxes
+    height, width = image_shape[:2]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    if name == 'hflip':
+        columns = (width - x2, y1, width - x1, y2)
+    elif name == 'vflip':
+        columns = (x1, height - y2, x2, height - y1)
+    elif name == 'rot180':
+        columns = (width - x2, height - y2, width - x1, height - y1)
+    elif name == 'rot90':
+        # np.rot90: orijinal (x, y) noktası (y, W - x) noktasına gider
+        columns = (width - y2, x1, width - y1, x2)
+    elif name == 'rot270':
+        # Orijinal (x, y) noktası (H - y, x) noktasına gider
+        columns = (y1, height - x2, y2, height - x1)
+    elif name == 'transpose':
+        columns = (y1, x1, y2, x2)
+    elif name == 'transverse':
+        # Orijinal (x, y) noktası (H - y, W - x) noktasına gider
+        columns = (width - y2, height - x2, width - y1, height - x1)
+    else:
+        raise ValueError(f"Bilinmeyen TTA dönüşümü: {name}")
+    return np.stack(columns, axis=1).astype(boxes.dtype, copy=False)
+
+
+def weighted_box_fusion(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        num_views: int, iou_threshold: float = 0.55
+                        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Farklı kopyalardan gelen tespitleri sınıf bazında Weighted Box Fusion ile birleştirir
+    
+    En yüksek skorlu atanmamış kutu bir küme açar; aynı sınıftaki ve bu kutuyla
+    IoU'su eşiği aşan tüm atanmamış kutular (kalan kutularla vektörel IoU
+    hesabıyla) kümeye katılır. Kümenin kutusu skor ağırlıklı ortalama, skoru
+    ise toplam skorun max(küme boyutu, num_views)'e bölümüdür; böylece
+    kopyaların yalnızca bir kısmında görülen tespitlerin skoru azalır.
+    
+    Args:
+        boxes: (N, 4) orijinal koordinatlardaki xyxy kutular
+        scores: (N,) güven skorları
+        class_ids: (N,) sınıf indeksleri
+        num_views: Birleştirilen kopya (dönüşüm) sayısı
+        iou_threshold: Kutuların aynı kümeye katılması için IoU eşiği
+    
+    Returns:
+        Tuple: Birleştirilmiş (kutular, skorlar, sınıflar), skora göre azalan sırada
+    """
+    if len(boxes) == 0:
+        return (np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32),
+                np.empty(0, dtype=np.int64))
+    
+    boxes = boxes.astype(np.float64)
+    scores = scores.astype(np.float64)
+    # Sınıfları birbirinden ayırmak için kutuları sınıfa göre kaydır
+    offsets = class_ids.astype(np.float64)[:, None] * (float(boxes.max()) + 1.0)
+    shifted = boxes + offsets
+    x1, y1, x2, y2 = shifted.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+    
+    fused_boxes, fused_scores, fused_classes = [], [], []
+    while order.size > 0:
+        i = order[0]
+        inter_w = np.clip(np.minimum(x2[i], x2[order]) - np.maximum(x1[i], x1[order]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[order]) - np.maximum(y1[i], y1[order]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / np.maximum(areas[i] + areas[order] - inter, 1e-9)
+        
+        # order[0] kutunun kendisidir (IoU = 1) ve her zaman kümeye girer
+        member_mask = iou > iou_threshold
+        member_mask[0] = True
+        members = order[member_mask]
+        weights = scores[members]
+        fused_boxes.append((boxes[members] * weights[:, None]).sum(axis=0) /
+                           max(weights.sum(), 1e-12))
+        fused_scores.append(weights.sum() / max(len(members), num_views))
+        fused_classes.append(class_ids[i])
+        order = order[~member_mask]
+    
+    fused_scores = np.asarray(fused_scores)
+    ranking = np.argsort(-fused_scores, kind='stable')
+    return (np.asarray(fused_boxes, dtype=np.float32)[ranking],
+            fused_scores.astype(np.float32)[ranking],
+            np.asarray(fused_classes, dtype=np.int64)[ranking])
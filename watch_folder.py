@@ -0,0 +1,365 @@
+"""
+Klasör İzleme (Watch-Folder) Modu
+
+Bu modül mikroskopların görüntü bıraktığı bir klasör ağacını sürekli
+izleyen FolderWatcher sınıfını ve PhaseAnalyzer.watch() için komut satırı
+arayüzünü içerir. inotify_simple kuruluysa (Linux) çekirdek bildirimleri
+kullanılır; aksi halde her turda yalnızca değiştirilme zamanı değişen
+klasörler yeniden listelenir, ağacın tamamı tekrar taranmaz.
+
+Bir dosyanın yazılmasının bittiği şöyle anlaşılır:
+- inotify: dosya kapatıldığında (CLOSE_WRITE) veya klasöre taşındığında (MOVED_TO)
+- yoklama ve başlangıç taraması: boyutu ve değiştirilme zamanı
+  settle_seconds boyunca değişmediğinde
+
+Not: inotify yalnızca yerel çekirdekte yapılan yazmaları görür. Başka bir
+makinenin yazdığı SMB/NFS paylaşımları için method='poll' kullanılmalıdır.
+"""
+
+import argparse
+import os
+import signal
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from image_discovery import IMAGE_EXTENSIONS
+
+
+WATCH_METHODS = ('auto', 'inotify', 'poll')
+
+
+class FolderWatcher:
+    """
+    Bir klasör ağacına eklenen ve yazılması tamamlanan görüntüleri bildirir
+    
+    existing_files() ağaçta hâlihazırda bulunan görüntüleri döndürürken
+    klasörleri izlemeye alır; sonraki değişiklikler changes() ile alınır.
+    Aynı dosya birden fazla kez bildirilebilir (ör. yeniden yazıldığında),
+    tekrarların ayıklanması çağırana aittir.
+    """
+    
+    def __init__(self, root: str, extensions: Iterable[str] = IMAGE_EXTENSIONS,
+                 exclude: Iterable[str] = (), method: str = 'auto',
+                 settle_seconds: float = 2.0):
+        """
+        Args:
+            root: İzlenecek klasör
+            extensions: İzlenecek dosya uzantıları (büyük/küçük harf duyarsız)
+            exclude: İzlenmeyecek klasörler (ör. root içindeki çıktı klasörü)
+            method: 'inotify', 'poll' veya 'auto' (inotify varsa inotify)
+            settle_seconds: Yoklamada bir dosyanın yazılmış sayılması için
+                boyutunun ve değiştirilme zamanının değişmeden kalması
+                gereken süre
+        """
+        if method not in WATCH_METHODS:
+            raise ValueError(f"Bilinmeyen izleme yöntemi: {method}")
+        # inotify_simple opsiyoneldir ve yalnızca izleme başlatılırken içe aktarılır
+        inotify = None
+        if method != 'poll':
+            try:
+                import inotify_simple as inotify
+            except ImportError:
+                if method == 'inotify':
+                    raise ImportError("inotify_simple kurulu değil: pip install inotify_simple")
+        if method == 'auto':
+            method = 'inotify' if inotify is not None else 'poll'
+        if not os.path.isdir(root):
+            raise ValueError(f"İzlenecek klasör bulunamadı: {root}")
+        
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.exclude = {os.path.abspath(path) for path in exclude}
+        self.method = method
+        self.settle_seconds = settle_seconds
+        
+        # Yoklama: klasör -> (değiştirilme zamanı, klasördeki girdi adları)
+        self._dirs: Dict[str, Tuple[int, Set[str]]] = {}
+        # Yazılması sürüyor olabilecek dosyalar: yol -> (boyut/zaman imzası, imzanın görüldüğü an)
+        self._settling: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+        
+        self._inotify = None
+        self._watches: Dict[int, str] = {}
+        if method == 'inotify':
+            self._inotify = inotify.INotify()
+            self._flags = inotify.flags
+            self._mask = (self._flags.CREATE | self._flags.CLOSE_WRITE |
+                          self._flags.MOVED_TO)
+    
+    def _is_image(self, name: str) -> bool:
+        return not name.startswith('.') and name.lower().endswith(self.extensions)
+    
+    def existing_files(self) -> Iterator[str]:
+        """Ağaçtaki mevcut görüntüleri döndürür ve klasörleri izlemeye alır"""
+        return self._scan(self.root)
+    
+    def _scan(self, directory: str) -> Iterator[str]:
+        """Klasörü özyinelemeli olarak tarar, izlemeye alır ve görüntüleri döndürür"""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if current in self.exclude:
+                continue
+            try:
+                # İzleme listelemeden önce başlatılır; arada eklenen dosyalar kaçmaz
+                if self._inotify is not None:
+                    self._watches[self._inotify.add_watch(current, self._mask)] = current
+                    mtime_ns = None
+                else:
+                    mtime_ns = os.stat(current).st_mtime_ns
+                with os.scandir(current) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    subdirs.append(entry.path)
+                elif self._is_image(entry.name):
+                    yield entry.path
+            
+            if mtime_ns is not None:
+                self._dirs[current] = (mtime_ns, {entry.name for entry in entries})
+            stack.extend(reversed(subdirs))
+    
+    def track(self, path: str):
+        """Dosyayı, yazılması bitene kadar beklenecek dosyalara ekler"""
+        self._settling.setdefault(path, (None, time.time()))
+    
+    def changes(self, timeout: float = 1.0) -> List[str]:
+        """
+        Yazılması tamamlanan görüntüleri döndürür
+        
+        inotify'da en fazla timeout saniye olay beklenir; yoklamada timeout
+        saniye beklendikten sonra değişen klasörler listelenir.
+        """
+        if self._inotify is not None:
+            ready = self._inotify_changes(timeout)
+        else:
+            time.sleep(timeout)
+            ready = []
+            for path in self._poll_changes():
+                self.track(path)
+        return ready + self._settled()
+    
+    def _inotify_changes(self, timeout: float) -> List[str]:
+        ready = []
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & self._flags.Q_OVERFLOW:
+                # Çekirdek kuyruğu taştıysa olaylar kaybolmuş olabilir; ağaç yeniden taranır
+                print("inotify kuyruğu taştı, klasör yeniden taranıyor.")
+                for path in self._scan(self.root):
+                    self.track(path)
+                continue
+            if event.mask & self._flags.IGNORED:
+                self._watches.pop(event.wd, None)
+                continue
+            
+            directory = self._watches.get(event.wd)
+            if directory is None or not event.name or event.name.startswith('.'):
+                continue
+            path = os.path.join(directory, event.name)
+            if event.mask & self._flags.ISDIR:
+                # Yeni klasördeki dosyalar izleme başlamadan yazılmış olabilir
+                for image_path in self._scan(path):
+                    self.track(image_path)
+            elif (event.mask & (self._flags.CLOSE_WRITE | self._flags.MOVED_TO)
+                  and self._is_image(event.name)):
+                self._settling.pop(path, None)
+                ready.append(path)
+        return ready
+    
+    def _poll_changes(self) -> List[str]:
+        """Değiştirilme zamanı değişen klasörlerdeki yeni görüntüleri döndürür"""
+        found = []
+        now_ns = time.time_ns()
+        settle_ns = int(self.settle_seconds * 1e9)
+        for directory, (mtime_ns, names) in list(self._dirs.items()):
+            try:
+                current_mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                del self._dirs[directory]
+                continue
+            # Zaman çözünürlüğü kaba olan dosya sistemlerinde aynı zaman damgası
+            # içinde eklenen dosyalar kaçmasın diye yeni değişen klasörler tekrar listelenir
+            if current_mtime_ns == mtime_ns and now_ns - current_mtime_ns > settle_ns:
+                continue
+            
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in names or entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    found.extend(self._scan(entry.path))
+                elif self._is_image(entry.name):
+                    found.append(entry.path)
+            self._dirs[directory] = (current_mtime_ns, {entry.name for entry in entries})
+        return found
+    
+    def _settled(self) -> List[str]:
+        """Boyutu ve değiştirilme zamanı settle_seconds boyunca değişmeyen dosyalar"""
+        ready = []
+        now = time.time()
+        for path, (signature, since) in list(self._settling.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._settling[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._settling[path] = (current, now)
+            elif now - since >= self.settle_seconds:
+                del self._settling[path]
+                ready.append(path)
+        return ready
+    
+    def close(self):
+        """inotify tanımlayıcısını kapatır"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Klasörü izleyerek eklenen görüntüleri geldikçe analiz et'
+    )
+    
+    parser.add_argument(
+        'input_dir',
+        type=str,
+        help='İzlenecek klasör (alt klasörler dahil)'
+    )
+    
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='results/',
+        help='Çıktı klasörü'
+    )
+    
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='models/yolov8_phase_detection.pt',
+        help='Model dosyası'
+    )
+    
+    parser.add_argument(
+        '--conf',
+        type=float,
+        default=0.5,
+        help='Güven eşiği'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=8,
+        help='Tek model çağrısındaki maksimum görüntü sayısı'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Okuma ve çizim/yazma aşamalarının her biri için thread sayısı'
+    )
+    
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=64,
+        help='Analiz bekleyen maksimum görüntü sayısı (backpressure)'
+    )
+    
+    parser.add_argument(
+        '--method',
+        type=str,
+        default='auto',
+        choices=list(WATCH_METHODS),
+        help='İzleme yöntemi (ağ paylaşımları için poll)'
+    )
+    
+    parser.add_argument(
+        '--settle',
+        type=float,
+        default=2.0,
+        help='Dosyanın yazılmış sayılması için değişmeden geçmesi gereken süre (s)'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=1.0,
+        help='Yoklama aralığı (s)'
+    )
+    
+    parser.add_argument(
+        '--summary-formats',
+        type=str,
+        nargs='*',
+        default=['jsonl'],
+        choices=['jsonl', 'csv', 'parquet'],
+        help='Görüntü başına satır eklenecek özet formatları'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='Sonuç önbelleği klasörü'
+    )
+    
+    parser.add_argument(
+        '--preprocess',
+        type=str,
+        help='Ön işleme hazır ayarı (methodology, clahe) veya eğitimde yazılan '
+             'preprocessing.json dosyası'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        action='store_true',
+        help='Aşama sürelerini ölç ve metrics.prom/metrics.json yaz'
+    )
+    
+    args = parser.parse_args()
+    
+    from phase_analysis import PhaseAnalyzer
+    
+    analyzer = PhaseAnalyzer(model_path=args.model, confidence_threshold=args.conf,
+                             cache_dir=args.cache_dir, collect_metrics=args.metrics,
+                             preprocessor=args.preprocess)
+    # İlk görüntü model yükleme maliyetini ödemesin diye model önceden ısıtılır
+    print(f"Model ısıtıldı: {analyzer.warmup(args.batch_size):.2f} s")
+    
+    # SIGTERM (ör. systemd stop) de Ctrl+C gibi özetleri kapatarak çıkar
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    
+    analyzer.watch(args.input_dir, args.output, batch_size=args.batch_size,
+                   num_workers=args.workers, queue_size=args.queue_size,
+                   method=args.method, settle_seconds=args.settle,
+                   poll_interval=args.poll_interval,
+                   summary_formats=tuple(args.summary_formats),
+                   stop_event=stop_event)
+
+
+if __name__ == "__main__":
+    main()